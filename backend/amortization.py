@@ -0,0 +1,94 @@
+import numpy as np
+
+# Closed-form amortization for a fixed-rate loan paid monthly in arrears:
+# each month the balance accrues interest at rate r and then the payment c
+# comes off, so after t months
+#
+#     B_t = B (1 + r)^t - c ((1 + r)^t - 1) / r        (B - c t when r == 0)
+#
+# Every function takes NumPy arrays (or scalars) and broadcasts, so a grid of
+# extra-payment scenarios is solved in a handful of array operations instead
+# of simulating each scenario month by month.
+
+# Payoff horizon: a loan not paid off within this many months never is
+MAX_MONTHS = 1200
+
+def balance_after(balance, rate, payment, months):
+    """Balance after ``months`` payments of ``payment``; negative once it would be paid off."""
+    balance, rate, payment, months = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (balance, rate, payment, months)))
+    growth = np.power(1 + rate, months)
+    safe_rate = np.where(rate > 0, rate, 1.0)
+    annuity = np.where(rate > 0, (growth - 1) / safe_rate, months)
+    return balance * growth - payment * annuity
+
+def months_to_payoff(balance, rate, payment):
+    """Number of payments (the last one possibly partial) that clear ``balance``.
+
+    MAX_MONTHS where the payment does not cover the interest or the term is longer.
+    """
+    balance, rate, payment = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (balance, rate, payment)))
+    covers = payment > balance * rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(covers, 1 - rate * balance / np.where(payment > 0, payment, 1.0), 1.0)
+        exact = np.where(
+            rate > 0,
+            -np.log(np.where(ratio > 0, ratio, 1.0)) / np.log1p(np.where(rate > 0, rate, 1.0)),
+            balance / np.where(payment > 0, payment, 1.0)
+        )
+    # Tolerance so that float error does not add an extra (empty) payment
+    months = np.ceil(exact - 1e-9)
+    months = np.where(covers & (balance > 0), months, np.where(balance > 0, MAX_MONTHS, 0))
+    return np.minimum(months, MAX_MONTHS).astype(int)
+
+def total_paid(balance, rate, payment, months):
+    """Sum of the ``months`` payments that clear ``balance``, the last one being just the remainder."""
+    months = np.asarray(months)
+    before_last = balance_after(balance, rate, payment, np.maximum(months - 1, 0))
+    last = np.minimum(before_last * (1 + np.asarray(rate, dtype=float)), payment)
+    return np.where(months > 0, payment * np.maximum(months - 1, 0) + last, 0.0)
+
+def schedule(balance: float, rate: float, payment: float) -> dict:
+    """Month-by-month schedule as arrays: payment, interest, principal and balance after each payment."""
+    months = int(months_to_payoff(balance, rate, payment))
+    t = np.arange(1, months + 1)
+    opening = balance_after(balance, rate, payment, t - 1)
+    interest = opening * rate
+    payments = np.minimum(np.full(months, payment), opening + interest)
+    principal = payments - interest
+    return {
+        "payment": payments,
+        "interest": interest,
+        "principal": principal,
+        "balance": np.maximum(opening - principal, 0.0),
+    }
+
+def scenario_grid(balance: float, rate: float, payment: float, extras, starts) -> dict:
+    """Payoff months and total interest for every (extra, start) pair.
+
+    ``extras`` are extra amounts added to every payment from month
+    ``starts`` on (1 = the first projected payment). Results are arrays of
+    shape (len(extras), len(starts)).
+    """
+    extras = np.asarray(extras, dtype=float)[:, None]
+    starts = np.asarray(starts, dtype=int)[None, :]
+
+    base_months = months_to_payoff(balance, rate, payment)
+    base_paid = total_paid(balance, rate, payment, base_months)
+
+    # Regular payments until the extra starts, then the larger payment on what is left
+    before = np.minimum(starts - 1, base_months)
+    remaining = balance_after(balance, rate, payment, before)
+    boosted = payment + extras
+    after = months_to_payoff(remaining, rate, boosted)
+    paid = payment * before + total_paid(remaining, rate, boosted, after)
+
+    months = np.where(starts - 1 >= base_months, base_months, before + after)
+    paid = np.where(starts - 1 >= base_months, base_paid, paid)
+    months = np.broadcast_to(months, (extras.shape[0], starts.shape[1]))
+    paid = np.broadcast_to(paid, months.shape)
+    return {
+        "months": months,
+        "interest": paid - balance,
+        "base_months": int(base_months),
+        "base_interest": float(base_paid - balance),
+    }
@@ -0,0 +1,33 @@
+import argparse
+from datetime import datetime
+from database import SessionLocal, begin_write, engine
+from migrate import run_migrations
+from crud import archive
+
+# Move old years of the expenses and incomes out of the live tables into the
+# year-partitioned archive (see crud/archive.py). The API keeps serving
+# archived rows; editing one moves it back until the next run. An interrupted
+# run is finished by running it again.
+# Usage: python archive_ledgers.py --before 2020 [--ledger expenses]
+#        python archive_ledgers.py --keep-years 3
+
+parser = argparse.ArgumentParser(description="Archive ledger years older than a cutoff")
+group = parser.add_mutually_exclusive_group(required=True)
+group.add_argument("--before", type=int, help="archive the years before this one")
+group.add_argument("--keep-years", type=int, help="keep this many years live, counting the current one")
+parser.add_argument("--ledger", choices=list(archive.MODELS), action="append")
+args = parser.parse_args()
+
+cutoff = args.before if args.before is not None else datetime.now().year - args.keep_years + 1
+run_migrations(engine)
+
+with SessionLocal() as db:
+    for ledger in args.ledger or archive.MODELS:
+        for year in archive.live_years(db, ledger):
+            if year >= cutoff:
+                break
+            db.rollback()
+            # Each year is moved in a transaction of its own
+            begin_write(db)
+            count = archive.archive_year(db, ledger, year)
+            print(f"{ledger} {year}: archived {count} rows")
@@ -0,0 +1,55 @@
+import logging
+import os
+import secrets
+from datetime import datetime, timedelta
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from passlib.context import CryptContext
+from sqlalchemy.orm import Session
+from database import get_db, get_session
+import tenancy
+
+logger = logging.getLogger(__name__)
+
+# Tokens are signed with JWT_SECRET. Without it a random key is generated,
+# so tokens stop working on restart and are not shared between workers.
+JWT_SECRET = os.getenv("JWT_SECRET")
+if not JWT_SECRET:
+    logger.warning("JWT_SECRET is not set; using a random key for this process")
+    JWT_SECRET = secrets.token_urlsafe(32)
+JWT_ALGORITHM = "HS256"
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", str(60 * 24)))
+
+# passlib's bcrypt backend fails with bcrypt 4.1+, so hashes use PBKDF2-SHA256
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+def create_access_token(user_id: int) -> str:
+    expires = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    return jwt.encode({"sub": str(user_id), "exp": expires}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    """User id from the bearer token. The signature is trusted, so no database lookup is needed."""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        raise HTTPException(
+            status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+# Session dependencies for authenticated routes: the request's session, scoped to the user
+def get_user_session(db=Depends(get_session), user_id: int = Depends(get_current_user_id)):
+    tenancy.scope(db, user_id)
+    return db
+
+def get_user_db(db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)) -> Session:
+    tenancy.scope(db, user_id)
+    return db
@@ -0,0 +1,473 @@
+import argparse
+import asyncio
+import calendar
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Load test of every API endpoint against a seeded synthetic history.
+#
+# The app runs in-process behind httpx's ASGI transport, so the numbers
+# cover routing, validation, the database and serialization but not the
+# network. Each endpoint is driven on its own by --concurrency workers
+# sending --requests requests; p50/p95/p99 latency, throughput and SQL
+# statements per request are reported. Results can be stored as a baseline
+# and later runs compared against it: the script exits with status 1 when
+# an endpoint's p95 grew by more than --tolerance or it issues more queries.
+#
+# Usage: python benchmarks/api.py [--years 10] [--rows-per-month 200] [--concurrency 8] [--requests 200]
+#        [--endpoint /expenses] [--save-baseline | --baseline benchmarks/api_baseline.json] [--output results.json]
+#
+# The database is a temporary SQLite file unless DATABASE_URL is set; set
+# DATABASE_ASYNC or SQLITE_WRITE_QUEUE to benchmark those modes.
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_baseline.json")
+PASSWORD = "benchmark-password"
+WORDS = ["coffee", "market", "fuel", "online", "pharmacy", "grocery", "transit", "store", "deli", "books"]
+SOURCES = ["Salary", "Freelance", "Investment Returns"]
+LEDGERS = ("expenses", "incomes", "savings", "investments", "car_loans")
+
+class Endpoint:
+    """One route to drive. ``request(i)`` returns the i-th request's (url, httpx keyword arguments)."""
+
+    def __init__(self, method: str, path: str, request=None, status: int = 200, share: float = 1.0):
+        self.method = method
+        self.path = path
+        self.request = request or (lambda i: (path, {}))
+        self.status = status
+        self.share = share  # fraction of --requests sent to this endpoint
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+def _month_name(month: int) -> str:
+    return calendar.month_name[month]
+
+def _expense(rng: random.Random, date: datetime) -> dict:
+    return {
+        "amount": round(rng.uniform(1, 300), 2),
+        "date": date,
+        "description": f"{rng.choice(WORDS)} {rng.choice(WORDS)} #{rng.randrange(1000)}",
+    }
+
+def seed(db, years: int, rows_per_month: int, spare: int, rng: random.Random) -> dict:
+    """Synthetic history for one user: ``years`` of monthly ledgers ending this month.
+
+    ``spare`` extra rows of every deletable kind are created for the delete
+    endpoints to consume (six times as many ledger rows, for the bulk
+    deletes). Returns the ids the endpoints use.
+    """
+    from schemas.user import UserCreate
+    from schemas.expense import ExpenseCreate, CategoryCreate
+    from schemas.income import IncomeCreate
+    from schemas.investment_and_saving import SavingCreate, InvestmentCreate
+    from schemas.car_loan import CarLoanCreate
+    from schemas.budget import BudgetCreate
+    from schemas.category_rule import CategoryRuleCreate
+    from schemas.recurring import RecurringTransactionCreate
+    from crud import user as crud_user
+    from crud import expense as crud_expense
+    from crud import income as crud_income
+    from crud import investment_and_saving as crud_ias
+    from crud import car_loan as crud_car_loan
+    from crud import budget as crud_budget
+    from crud import category_rule as crud_category_rule
+    from crud import recurring as crud_recurring
+    from crud import import_job as crud_import_job
+    import tenancy
+
+    user = crud_user.create_user(db, UserCreate(email=f"bench-{rng.randrange(10 ** 9)}@example.com", password=PASSWORD))
+    tenancy.scope(db, user.id)
+
+    categories = [crud_expense.create_category(db, CategoryCreate(name=word)).id for word in WORDS]
+    spare_categories = [
+        crud_expense.create_category(db, CategoryCreate(name=f"spare {i}")).id for i in range(spare)
+    ]
+    rules = [
+        crud_category_rule.create_rule(db, CategoryRuleCreate(category_id=categories[i % len(categories)], pattern=f"#{i}")).id
+        for i in range(50 + spare)
+    ]
+
+    now = datetime.now()
+    months = [
+        (year, month)
+        for year in range(now.year - years + 1, now.year + 1)
+        for month in range(1, 13)
+        if (year, month) <= (now.year, now.month)
+    ][-years * 12:]
+    ids = {ledger: [] for ledger in LEDGERS}
+    balance, rate, payment = 60000.0, 0.045 / 12, 550.0
+    interest_ytd = 0.0
+    for year, month in months:
+        def day():
+            return datetime(year, month, rng.randint(1, 28), rng.randrange(24), rng.randrange(60))
+
+        ids["expenses"] += crud_expense.create_expenses(db, [
+            ExpenseCreate(**_expense(rng, day()), category_ids=rng.sample(categories, rng.randint(0, 2)))
+            for _ in range(rows_per_month)
+        ])
+        ids["incomes"] += crud_income.create_incomes(db, [
+            IncomeCreate(amount=round(rng.uniform(100, 5000), 2), date=day(), description="income", source=rng.choice(SOURCES))
+            for _ in range(max(rows_per_month // 10, 1))
+        ])
+        ids["savings"] += crud_ias.create_savings(db, [
+            SavingCreate(amount=round(rng.uniform(10, 500), 2), date=day(), description="saving")
+            for _ in range(max(rows_per_month // 20, 1))
+        ])
+        ids["investments"] += crud_ias.create_investments(db, [
+            InvestmentCreate(amount=round(rng.uniform(10, 1000), 2), date=day(), description="investment")
+            for _ in range(max(rows_per_month // 20, 1))
+        ])
+        finance = balance * rate
+        interest_ytd = finance if month == 1 else interest_ytd + finance
+        ending = balance + finance - payment
+        ids["car_loans"] += crud_car_loan.create_car_loans(db, [CarLoanCreate(
+            month=_month_name(month), year=year, principal_balance=balance, payoff_balance=balance + finance,
+            amount_paid=payment, principal=payment - finance, finance=finance, ending_balance=ending,
+            interest_ytd=interest_ytd
+        )])
+        balance = ending
+        for category_id in categories[:3]:
+            crud_budget.set_budget(db, BudgetCreate(category_id=category_id, year=year, month=month, amount=1000))
+
+    # Rows for the delete endpoints, dated before the history so they do not disturb it
+    old = datetime(months[0][0] - 1, 1, 1)
+    spares = {
+        "expenses": crud_expense.create_expenses(db, [ExpenseCreate(**_expense(rng, old)) for _ in range(6 * spare)]),
+        "incomes": crud_income.create_incomes(db, [IncomeCreate(amount=1, date=old) for _ in range(6 * spare)]),
+        "savings": crud_ias.create_savings(db, [SavingCreate(amount=1, date=old) for _ in range(6 * spare)]),
+        "investments": crud_ias.create_investments(db, [InvestmentCreate(amount=1, date=old) for _ in range(6 * spare)]),
+        "car_loans": crud_car_loan.create_car_loans(db, [CarLoanCreate(
+            month="January", year=old.year - 1, principal_balance=1, payoff_balance=1, amount_paid=1,
+            principal=1, finance=0, ending_balance=0
+        ) for _ in range(6 * spare)]),
+        "categories": spare_categories,
+        "category_rules": rules[50:],
+        "budgets": [
+            crud_budget.set_budget(db, BudgetCreate(category_id=categories[3 + i % 7], year=old.year - i // 84, month=1 + i % 12, amount=1)).id
+            for i in range(spare)
+        ],
+    }
+    recurring = [
+        crud_recurring.create_recurring(db, RecurringTransactionCreate(
+            ledger="expenses", amount=9.99, description="subscription", frequency="monthly",
+            start_date=old, active=i < 5
+        )).id
+        for i in range(5 + spare)
+    ]
+    spares["recurring"] = recurring[5:]
+    job = crud_import_job.create_import_job(db, filename="seed.csv", format="csv", total_bytes=0)
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "categories": categories,
+        "rules": rules[:50],
+        "recurring": recurring[:5],
+        "import_job": job.id,
+        "ids": ids,
+        "spares": spares,
+        "start": datetime(*months[0], 1),
+        "end": now,
+    }
+
+def endpoints(data: dict, rng: random.Random, requests: int) -> list:
+    """Every route of the API with a request generator; routes missing here are reported by check_coverage()."""
+    ids, spares = data["ids"], data["spares"]
+    start, end = data["start"].isoformat(), data["end"].isoformat()
+    mid = datetime.fromtimestamp((data["start"].timestamp() + data["end"].timestamp()) / 2)
+    year_ago = datetime(data["end"].year - 1, data["end"].month, 1).isoformat()
+    csv_body = "Date,Amount,Description\n" + "".join(
+        f"2020-01-{1 + i % 28:02d},{-(i + 1)}.00,imported {i}\n" for i in range(20)
+    )
+    counter = itertools.count()
+
+    def pick(ledger):
+        return lambda i: rng.choice(ids[ledger])
+
+    def spare(kind):
+        it = iter(spares[kind][:requests])
+        return lambda i: next(it)
+
+    def updatable(kind):
+        # Car loan updates go to spare rows, like their PUT, so the seeded months stay as they are
+        if kind != "car_loans":
+            return pick(kind)
+        pool = spares[kind][:requests]
+        return lambda i: rng.choice(pool)
+
+    def spare_chunks(kind, size=10):
+        it = iter(spares[kind][requests:])
+        return lambda i: list(itertools.islice(it, size))
+
+    def body(method, path, make, **kwargs):
+        return Endpoint(method, path, lambda i: (path, {"json": make(i)}), **kwargs)
+
+    def by_id(method, path, prefix, choose, make=None, **kwargs):
+        def request(i):
+            options = {"json": make(i)} if make else {}
+            return f"{prefix}/{choose(i)}", options
+        return Endpoint(method, path, request, **kwargs)
+
+    def entry(i):
+        return {"amount": round(rng.uniform(1, 300), 2), "date": mid.isoformat(), "description": f"{rng.choice(WORDS)} {i}"}
+
+    def car_loan(i):
+        return {
+            "month": "January", "year": 1900 + i % 50, "principal_balance": 1, "payoff_balance": 1,
+            "amount_paid": 1, "principal": 1, "finance": 0, "ending_balance": 0
+        }
+
+    result = [
+        Endpoint("GET", "/"),
+        Endpoint("GET", "/metrics"),
+        Endpoint("POST", "/auth/register", lambda i: ("/auth/register", {
+            "json": {"email": f"bench-{next(counter)}-{rng.randrange(10 ** 9)}@example.com", "password": PASSWORD}
+        }), share=0.25),
+        Endpoint("POST", "/auth/token", lambda i: ("/auth/token", {
+            "data": {"username": data["email"], "password": PASSWORD}
+        }), share=0.25),
+        Endpoint("GET", "/auth/me"),
+        Endpoint("POST", "/categories/", lambda i: ("/categories/", {"json": {"name": f"bench {next(counter)}"}})),
+        Endpoint("GET", "/categories/"),
+        by_id("DELETE", "/categories/{category_id}", "/categories", spare("categories")),
+        body("POST", "/category-rules/", lambda i: {"category_id": rng.choice(data["categories"]), "pattern": f"bench {i}"}),
+        Endpoint("GET", "/category-rules/"),
+        Endpoint("GET", "/category-rules/match", lambda i: ("/category-rules/match", {
+            "params": {"description": f"{rng.choice(WORDS)} #{rng.randrange(100)}", "amount": 25}
+        })),
+        by_id("PUT", "/category-rules/{rule_id}", "/category-rules", lambda i: rng.choice(data["rules"]),
+              lambda i: {"category_id": rng.choice(data["categories"]), "pattern": f"#{rng.randrange(100)}"}),
+        by_id("DELETE", "/category-rules/{rule_id}", "/category-rules", spare("category_rules")),
+    ]
+
+    for ledger, prefix, id_name in (
+        ("expenses", "/expenses", "expense_id"),
+        ("incomes", "/incomes", "income_id"),
+        ("savings", "/savings", "saving_id"),
+        ("investments", "/investments", "investment_id"),
+        ("car_loans", "/car-loans", "car_loan_id"),
+    ):
+        make = car_loan if ledger == "car_loans" else entry
+        result += [
+            body("POST", f"{prefix}/", make),
+            Endpoint("GET", f"{prefix}/", lambda i, prefix=prefix: (f"{prefix}/", {"params": {"limit": 100}})),
+            by_id("GET", f"{prefix}/{{{id_name}}}", prefix, pick(ledger)),
+            by_id("PUT", f"{prefix}/{{{id_name}}}", prefix, pick(ledger) if ledger != "car_loans" else spare(ledger), make),
+            by_id("DELETE", f"{prefix}/{{{id_name}}}", prefix, spare(ledger)),
+            body("POST", f"{prefix}/bulk", lambda i, make=make: [make(i * 10 + j) for j in range(10)]),
+            body("POST", f"{prefix}/bulk-update", lambda i, make=make, choose=updatable(ledger): [
+                {**make(i * 10 + j), "id": choose(i)} for j in range(10)
+            ]),
+            body("POST", f"{prefix}/bulk-delete", (lambda chunk: lambda i: {"ids": chunk(i)})(spare_chunks(ledger)), share=0.5),
+        ]
+
+    result += [
+        Endpoint("GET", "/car-loans/projection", lambda i: ("/car-loans/projection", {
+            "params": {"extra_payments": [50, 100, 200], "extra_starts": [year_ago, end]}
+        })),
+        Endpoint("GET", "/car-loans/stats/summary"),
+        Endpoint("GET", "/summary/monthly", lambda i: ("/summary/monthly", {"params": {"start_date": start}})),
+        body("POST", "/budgets/", lambda i: {
+            "category_id": rng.choice(data["categories"]), "year": 1800 + i, "month": 1 + i % 12, "amount": 100
+        }),
+        Endpoint("GET", "/budgets/", lambda i: ("/budgets/", {"params": {"year": data["end"].year}})),
+        Endpoint("GET", "/budgets/status", lambda i: ("/budgets/status", {"params": {"start_date": year_ago}})),
+        by_id("DELETE", "/budgets/{budget_id}", "/budgets", spare("budgets")),
+        body("POST", "/recurring/", lambda i: {
+            "ledger": "incomes", "amount": 100, "frequency": "monthly", "start_date": end, "active": False
+        }),
+        Endpoint("GET", "/recurring/"),
+        Endpoint("POST", "/recurring/run"),
+        by_id("GET", "/recurring/{recurring_id}", "/recurring", lambda i: rng.choice(data["recurring"])),
+        by_id("PUT", "/recurring/{recurring_id}", "/recurring", lambda i: rng.choice(data["recurring"]), lambda i: {
+            "ledger": "expenses", "amount": 9.99, "description": "subscription", "frequency": "monthly",
+            "start_date": data["start"].isoformat()
+        }),
+        by_id("DELETE", "/recurring/{recurring_id}", "/recurring", spare("recurring")),
+        Endpoint("GET", "/search", lambda i: ("/search", {"params": {"q": rng.choice(WORDS)[:4]}})),
+        Endpoint("GET", "/sync", share=0.1),
+        Endpoint("POST", "/imports/", lambda i: ("/imports/", {
+            "files": {"file": (f"statement{i}.csv", csv_body, "text/csv")}
+        }), status=202, share=0.25),
+        Endpoint("GET", "/imports/"),
+        by_id("GET", "/imports/{job_id}", "/imports", lambda i: data["import_job"]),
+        by_id("GET", "/export/{ledger}", "/export", lambda i: rng.choice(LEDGERS), share=0.1),
+    ]
+    return result
+
+def check_coverage(app, specs: list) -> list:
+    """Routes of the app without an Endpoint, so new routes cannot silently go unbenchmarked."""
+    from fastapi.routing import APIRoute
+
+    covered = {spec.name for spec in specs}
+    return [
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in sorted(route.methods)
+        if f"{method} {route.path}" not in covered
+    ]
+
+class QueryCounter:
+    """Counts SQL statements executed by any engine in the process."""
+
+    def __init__(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        self.count = 0
+        event.listen(Engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values), max(1, math.ceil(p / 100 * len(values)))) - 1]
+
+async def drive(client, spec: Endpoint, requests: int, concurrency: int, queries: QueryCounter) -> dict:
+    latencies, errors = [], []
+    pending = iter(range(requests))
+
+    async def worker():
+        for i in pending:
+            url, options = spec.request(i)
+            started = time.perf_counter()
+            response = await client.request(spec.method, url, **options)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != spec.status:
+                errors.append(f"{response.status_code} {response.text[:200]}")
+
+    before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": requests / elapsed,
+        "queries": (queries.count - before) / requests,
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of ``results`` against ``baseline``: p95 beyond the tolerance, more queries, new errors."""
+    regressions = []
+    for name, result in results["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if base is None:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs {base['p95_ms']:.2f} ms baseline")
+        if result["queries"] > base["queries"] + 0.5:
+            regressions.append(f"{name}: {result['queries']:.1f} queries/request vs {base['queries']:.1f} baseline")
+        if result["errors"] and not base["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors ({result['first_error']})")
+    return regressions
+
+def _print(results: dict, baseline: dict = None):
+    header = f"{'endpoint':<38} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>9} {'queries':>8} {'errors':>6}"
+    if baseline:
+        header += f" {'p95 vs base':>11}"
+    print(header)
+    for name, r in results["endpoints"].items():
+        line = (f"{name:<38} {r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} "
+                f"{r['throughput']:9.1f} {r['queries']:8.1f} {r['errors']:6}")
+        base = (baseline or {}).get("endpoints", {}).get(name)
+        if base:
+            line += f" {(r['p95_ms'] / base['p95_ms'] - 1) * 100 if base['p95_ms'] else 0.0:+10.0f}%"
+        print(line)
+
+async def run(args) -> int:
+    import httpx
+
+    rng = random.Random(args.seed)
+    import main as app_module
+    import auth
+    from database import SessionLocal
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        data = seed(db, args.years, args.rows_per_month, args.requests, rng)
+    print(f"seeded {args.years} years x {args.rows_per_month} expenses/month in {time.perf_counter() - started:.1f}s")
+
+    specs = endpoints(data, rng, args.requests)
+    missing = check_coverage(app_module.app, specs)
+    if missing:
+        print("routes without a benchmark: " + ", ".join(missing))
+    if args.endpoint:
+        specs = [spec for spec in specs if any(part in spec.name for part in args.endpoint)]
+
+    queries = QueryCounter()
+    results = {
+        "settings": {
+            "years": args.years, "rows_per_month": args.rows_per_month,
+            "concurrency": args.concurrency, "requests": args.requests,
+        },
+        "endpoints": {},
+    }
+    headers = {"Authorization": f"Bearer {auth.create_access_token(data['user_id'])}"}
+    transport = httpx.ASGITransport(app=app_module.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers, timeout=None) as client:
+        for spec in specs:
+            requests = max(int(args.requests * spec.share), args.concurrency)
+            results["endpoints"][spec.name] = await drive(client, spec, requests, args.concurrency, queries)
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["settings"] != results["settings"]:
+            print(f"baseline was recorded with {baseline['settings']}; comparison is not like for like")
+    _print(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    failed = [f"{name}: {r['errors']} errors ({r['first_error']})" for name, r in results["endpoints"].items() if r["errors"]]
+    if baseline:
+        failed = compare(results, baseline, args.tolerance)
+    for line in failed:
+        print("REGRESSION " + line if baseline else "ERROR " + line)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test every API endpoint against a seeded database")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--rows-per-month", type=int, default=200, help="expenses per month; incomes, savings and investments scale with it")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--endpoint", action="append", help="only endpoints whose 'METHOD /path' contains this")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 growth over the baseline (0.25 = 25%%)")
+    parser.add_argument("--output", help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before the app is imported: database.py reads these at import time
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+        os.environ.setdefault("RECURRING_INTERVAL", "0")
+        os.environ.setdefault("JWT_SECRET", "benchmark")
+        os.environ.setdefault("SLOW_QUERY_MS", "0")  # lock waits under load would flood the output
+        sys.exit(asyncio.run(run(args)))
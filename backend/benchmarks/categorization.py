@@ -0,0 +1,66 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from categorizer import Matcher, Rule, merchant_text
+
+# Throughput of the compiled categorization matcher against checking the
+# rules one at a time, for a statement-import sized batch of descriptions.
+# Usage: python benchmarks/categorization.py [--rows 50000] [--rules 500]
+
+WORDS = ["coffee", "market", "fuel", "online", "pharmacy", "grocery", "transit", "store", "deli", "books"]
+
+def _rules(count: int, rng: random.Random):
+    rules = []
+    for i in range(count):
+        kind = ("contains", "contains", "merchant", "regex")[i % 4]
+        pattern = f"{rng.choice(WORDS)}{i}" if kind != "regex" else rf"\b{rng.choice(WORDS)}\s*#{i}\b"
+        rules.append(Rule(i % 40, kind, pattern, None, 100.0 if i % 5 == 0 else None))
+    return rules
+
+def _naive(rules, description: str, amount: float):
+    text = description.lower()
+    found = set()
+    for rule in rules:
+        if rule.max_amount is not None and amount > rule.max_amount:
+            continue
+        if rule.kind == "regex":
+            matched = re.search(rule.pattern, description, re.IGNORECASE)
+        elif rule.kind == "merchant":
+            matched = merchant_text(rule.pattern) in merchant_text(description)
+        else:
+            matched = rule.pattern.lower() in text
+        if matched:
+            found.add(rule.category_id)
+    return sorted(found)
+
+def _time(label: str, rows: int, call):
+    start = time.perf_counter()
+    result = call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / rows * 1e6:7.2f} us/row")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--rules", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rules = _rules(args.rules, rng)
+    expenses = [
+        (f"{rng.choice(WORDS).upper()}{rng.randrange(args.rules)} {rng.choice(WORDS)} #{rng.randrange(args.rules)} "
+         f"REF {rng.randrange(10 ** 8)}", rng.uniform(1, 200))
+        for _ in range(args.rows)
+    ]
+
+    matcher = _time("compile", args.rows, lambda: Matcher(rules))
+    compiled = _time("compiled matcher", args.rows, lambda: [matcher.match(d, a) for d, a in expenses])
+    naive = _time("rule by rule", args.rows, lambda: [_naive(rules, d, a) for d, a in expenses])
+    print("results agree:", compiled == naive)
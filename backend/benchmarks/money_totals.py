@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, extract, func, insert, select, text
+from database import apply_sqlite_pragmas
+from migrate import run_migrations
+from models.expense import Expense
+from money import from_cents
+
+# Exactness of money aggregation: sums over a large expenses table stored as
+# integer cents (the Cents column type) must match the exact total to the
+# cent, overall and per month. The same amounts summed from a REAL column
+# show the drift the old Float columns had; SUM timings are printed for
+# both. Exits with status 1 if a cents total is off.
+# Usage: python benchmarks/money_totals.py [--rows 1000000] [--months 120]
+
+BATCH = 50000
+
+def _time(label: str, call):
+    start = time.perf_counter()
+    result = call()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--months", type=int, default=120)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rows = [(2015 + m // 12, m % 12 + 1, rng.randrange(1, 100000)) for m in (rng.randrange(args.months) for _ in range(args.rows))]
+    exact_total = sum(cents for _, _, cents in rows)
+    exact_months = defaultdict(int)
+    for year, month, cents in rows:
+        exact_months[(year, month)] += cents
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        apply_sqlite_pragmas(engine)
+        run_migrations(engine)
+
+        with engine.begin() as conn:
+            def load():
+                for i in range(0, len(rows), BATCH):
+                    conn.execute(insert(Expense), [
+                        {"date": datetime(y, m, 1), "amount": from_cents(c)} for y, m, c in rows[i:i + BATCH]
+                    ])
+            _time(f"insert {args.rows} rows", load)
+            # Same rows with the amount as a float, like the old Float column
+            conn.execute(text("CREATE TABLE expenses_float AS SELECT id, date, description, amount / 100.0 AS amount FROM expenses"))
+
+        with engine.connect() as conn:
+            total = _time("SUM cents", lambda: conn.execute(select(func.sum(Expense.amount))).scalar())
+            float_total = _time("SUM float", lambda: conn.execute(text("SELECT SUM(amount) FROM expenses_float")).scalar())
+            year, month = extract("year", Expense.date), extract("month", Expense.date)
+            months = _time("monthly SUM cents", lambda: conn.execute(
+                select(year, month, func.sum(Expense.amount)).group_by(year, month)
+            ).all())
+
+    expected = from_cents(exact_total)
+    month_errors = [(y, m) for y, m, value in months if value != from_cents(exact_months[(int(y), int(m))])]
+    print(f"exact total                  {expected}")
+    print(f"cents total                  {total}  ({'exact' if total == expected else 'OFF'})")
+    print(f"float total                  {float_total!r}  (off by {abs(float_total - float(expected)):.2e})")
+    print(f"months off by a cent or more {len(month_errors)} of {len(months)}")
+    print(f"sum of monthly totals        {'exact' if sum(value for *_, value in months) == expected else 'OFF'}")
+    sys.exit(0 if total == expected and not month_errors else 1)
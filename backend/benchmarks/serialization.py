@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from migrate import run_migrations
+from responses import FastJSONResponse
+from schemas.expense import ExpenseCreate, CategoryCreate, Expense as ExpenseSchema
+from schemas.income import IncomeCreate, Income as IncomeSchema
+from crud import expense as crud_expense
+from crud import income as crud_income
+
+# Per-row cost of the list endpoints: the response_model path (ORM objects ->
+# from_attributes schemas -> FastAPI response validation -> JSONResponse)
+# against the column-tuple path (plain dicts -> FastJSONResponse).
+# Usage: python benchmarks/serialization.py [--rows 1000] [--repeat 20]
+
+def _seed(db, rows: int):
+    categories = [crud_expense.create_category(db, CategoryCreate(name=f"category {i}")).id for i in range(5)]
+    start = datetime(2024, 1, 1)
+    crud_expense.create_expenses(db, [
+        ExpenseCreate(
+            amount=1 + i % 100, date=start + timedelta(hours=i), description=f"expense {i}",
+            category_ids=categories[:i % 3]
+        )
+        for i in range(rows)
+    ])
+    crud_income.create_incomes(db, [
+        IncomeCreate(amount=1 + i % 100, date=start + timedelta(hours=i), description=f"income {i}", source="Salary")
+        for i in range(rows)
+    ])
+
+def _response_model_path(db, fn, schema, rows: int) -> bytes:
+    field = create_model_field(name="Response", type_=List[schema], mode="serialization")
+    items = [schema.model_validate(item) for item in fn(db, limit=rows)]
+    content = asyncio.run(serialize_response(field=field, response_content=items))
+    return JSONResponse(content).body
+
+def _fast_path(db, fn, rows: int) -> bytes:
+    return FastJSONResponse(fn(db, limit=rows)).body
+
+def _time(label: str, rows: int, repeat: int, call):
+    call()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = call()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<32} {elapsed * 1000:8.2f} ms/request  {elapsed / rows * 1e6:7.2f} us/row  {len(body):>9} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        run_migrations(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            _seed(db, args.rows)
+
+        for name, fn, rows_fn, schema in (
+            ("expenses", crud_expense.get_expenses, crud_expense.get_expense_rows, ExpenseSchema),
+            ("incomes", crud_income.get_incomes, crud_income.get_income_rows, IncomeSchema),
+        ):
+            with Session() as db:
+                _time(f"{name}: response_model", args.rows, args.repeat,
+                      lambda: _response_model_path(db, fn, schema, args.rows))
+            with Session() as db:
+                _time(f"{name}: column tuples + orjson", args.rows, args.repeat,
+                      lambda: _fast_path(db, rows_fn, args.rows))
+        engine.dispose()
@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from database import apply_sqlite_pragmas, begin_write
+from migrate import run_migrations
+from write_queue import WriteQueue
+from schemas.expense import ExpenseCreate
+from crud.expense import create_expense
+
+# Concurrent write throughput on SQLite: default settings vs the tuned
+# profile (WAL + pragmas) vs the tuned profile with the group-commit queue.
+# Usage: python benchmarks/sqlite_writes.py [--threads 8] [--writes 200]
+
+def _expense(i: int) -> ExpenseCreate:
+    return ExpenseCreate(amount=1 + i % 100, date=datetime(2024, 1 + i % 12, 1), description=f"bench {i}")
+
+def _run(threads: int, writes: int, write) -> tuple:
+    errors = []
+
+    def worker(offset):
+        for i in range(writes):
+            try:
+                write(offset * writes + i)
+            except SQLAlchemyError as e:
+                errors.append(e)
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, len(errors)
+
+def scenario(name: str, threads: int, writes: int, tuned: bool, queued: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+        if tuned:
+            apply_sqlite_pragmas(engine)
+        run_migrations(engine)
+
+        if queued:
+            queue = WriteQueue(engine)
+
+            def write(i):
+                queue.run(lambda session: create_expense(session, _expense(i)).id)
+        else:
+            Session = sessionmaker(bind=engine, autoflush=False)
+
+            def write(i):
+                with Session() as session:
+                    if tuned:
+                        begin_write(session)
+                    create_expense(session, _expense(i))
+
+        elapsed, errors = _run(threads, writes, write)
+        total = threads * writes - errors
+        print(f"{name:<22} {total:>6} writes  {elapsed:7.2f}s  {total / elapsed:9.1f} writes/s  {errors} errors")
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="writes per thread")
+    args = parser.parse_args()
+
+    scenario("default (rollback)", args.threads, args.writes, tuned=False, queued=False)
+    scenario("WAL + pragmas", args.threads, args.writes, tuned=True, queued=False)
+    scenario("WAL + write queue", args.threads, args.writes, tuned=True, queued=True)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Response cache for read endpoints that are hit on every screen load but
+# change rarely (categories, car-loan summary, monthly summary).
+#
+# Entries are grouped in namespaces. Every namespace has a version counter
+# that is part of each entry's key; write routes bump the version, which
+# makes all entries of that namespace unreachable at once. A reader that
+# loaded data before a write finished stores it under the old version, so
+# it can never be served afterwards.
+
+# memory:// for the in-process cache, redis://host:port/db for any Redis-compatible server
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # seconds; 0 disables caching
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+# Namespaces
+CATEGORIES = "categories"
+CAR_LOANS = "car_loans"
+SUMMARY = "summary"
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+class RedisBackend:
+    """Redis, Valkey, KeyDB or any other server speaking the Redis protocol.
+
+    Shared between worker processes. Requires the redis package; eviction is
+    left to the server's maxmemory-policy.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self.client.set(key, value, ex=ttl)
+
+    def counter(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+class ResponseCache:
+    def __init__(self, backend, ttl: int, prefix: str = "finance-tracker"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def version(self, namespace: str) -> int:
+        return self.backend.counter(f"{self.prefix}:{namespace}:version")
+
+    def get(self, namespace: str, version: int, key: str) -> Optional[bytes]:
+        if self.ttl <= 0:
+            return None
+        return self.backend.get(f"{self.prefix}:{namespace}:{version}:{key}")
+
+    def set(self, namespace: str, version: int, key: str, value: bytes):
+        if self.ttl > 0:
+            self.backend.set(f"{self.prefix}:{namespace}:{version}:{key}", value, self.ttl)
+
+    def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            self.backend.incr(f"{self.prefix}:{namespace}:version")
+
+def etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def _backend(url: str):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    return MemoryBackend(CACHE_MAX_ENTRIES)
+
+cache = ResponseCache(_backend(CACHE_URL), CACHE_TTL)
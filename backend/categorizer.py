@@ -0,0 +1,201 @@
+import re
+from collections import deque
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Rule matching for automatic expense categorization.
+#
+# A Matcher is built once from all the rules and then categorizes any number
+# of descriptions. Literal patterns ("contains" and "merchant" rules) go into
+# Aho-Corasick automata, so each description is scanned once however many
+# rules there are. Python regexes cannot be merged without trying every one
+# at every position, so "regex" rules add a literal their matches must
+# contain to the same automaton and are only run when that literal occurs.
+
+class Rule(NamedTuple):
+    category_id: int
+    kind: str  # "contains", "merchant" or "regex"
+    pattern: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+def merchant_text(text: str) -> str:
+    """Lowercase words only, space padded: 'AMZN Mktp US*2K3' -> ' amzn mktp us k '"""
+    return " " + _NON_LETTERS.sub(" ", text.lower()).strip() + " "
+
+class _Automaton:
+    """Aho-Corasick automaton: finds every pattern occurring in a text in one pass."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+        for word, value in patterns:
+            node = 0
+            for char in word:
+                nxt = self.goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                node = nxt
+            self.out[node] += (value,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fail = self.fail[node]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(char, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def __bool__(self):
+        return len(self.goto) > 1
+
+    def find(self, text: str, found: Set[int]):
+        goto, fail, out = self.goto, self.fail, self.out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+
+# Characters with a meaning of their own outside character classes
+_SPECIAL = set(".^$*+?{}[]|()\\")
+_QUANTIFIERS = set("*+?{")
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Index just past the character class starting at pattern[i] == '['"""
+    i += 1
+    if i < len(pattern) and pattern[i] == "^":
+        i += 1
+    if i < len(pattern) and pattern[i] == "]":
+        i += 1  # a leading ] is a literal
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Index just past the group starting at pattern[i] == '('"""
+    depth = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+def required_literal(pattern: str) -> Optional[str]:
+    """Longest run of plain characters every match of ``pattern`` must contain, lowercased.
+
+    Only the top level of the pattern is considered, so anything inside
+    groups, classes or repeats is ignored, and a top-level alternation means
+    nothing is required. Escapes other than escaped punctuation end a run.
+    Returns None when there is no run of at least two characters to filter on.
+    """
+    try:
+        if re.compile(pattern).flags & re.VERBOSE:
+            return None  # whitespace and comments are not literal
+    except (re.error, TypeError):
+        return None
+    runs, run = [], []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            run.append(pattern[i + 1])
+            i += 2
+        elif char not in _SPECIAL:
+            run.append(char)
+            i += 1
+        elif char == "|":
+            return None
+        else:
+            if char in _QUANTIFIERS and run:
+                run.pop()  # the quantified character may be absent or repeated
+            runs.append(run)
+            run = []
+            if char == "(":
+                i = _skip_group(pattern, i)
+            elif char == "[":
+                i = _skip_class(pattern, i)
+            elif char == "{":
+                end = pattern.find("}", i)
+                i = end + 1 if end >= 0 else len(pattern)
+            else:
+                i += 2 if char == "\\" else 1
+    runs.append(run)
+    best = max(runs, key=len)
+    return "".join(best).lower() if len(best) >= 2 else None
+
+class Matcher:
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        literals, merchants = [], []
+        # Rules without a pattern match on amount alone
+        self.amount_only = []
+        # Regex rules: checked when their required literal occurs, or always if they have none
+        self.regexes = {}
+        self.unfiltered = []
+        for index, rule in enumerate(self.rules):
+            if not rule.pattern:
+                self.amount_only.append(index)
+            elif rule.kind == "regex":
+                self.regexes[index] = re.compile(rule.pattern, re.IGNORECASE)
+                literal = required_literal(rule.pattern)
+                if literal:
+                    literals.append((literal, index))
+                else:
+                    self.unfiltered.append(index)
+            elif rule.kind == "merchant":
+                alias = merchant_text(rule.pattern)
+                if alias.strip():
+                    merchants.append((alias, index))
+            else:
+                literals.append((rule.pattern.lower(), index))
+        self.literals = _Automaton(literals)
+        self.merchants = _Automaton(merchants)
+
+    def _candidates(self, text: str) -> Set[int]:
+        found = set(self.amount_only)
+        if self.literals:
+            self.literals.find(text.lower(), found)
+        if self.merchants:
+            self.merchants.find(merchant_text(text), found)
+        if self.regexes:
+            found.update(self.unfiltered)
+            found = {
+                index for index in found
+                if index not in self.regexes or self.regexes[index].search(text)
+            }
+        return found
+
+    def match(self, description: Optional[str], amount: float) -> List[int]:
+        """Category ids of every rule matching the expense, in ascending order."""
+        category_ids = set()
+        for index in self._candidates(description or ""):
+            rule = self.rules[index]
+            if rule.min_amount is not None and amount < rule.min_amount:
+                continue
+            if rule.max_amount is not None and amount > rule.max_amount:
+                continue
+            category_ids.add(rule.category_id)
+        return sorted(category_ids)
@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import functools
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Union
+from database import write_queue, begin_write
+import tenancy
+import metrics
+from cache import cache, CATEGORIES, CAR_LOANS, SUMMARY
+from crud import expense as crud_expense
+from crud import income as crud_income
+from crud import investment_and_saving as crud_ias
+from crud import car_loan as crud_car_loan
+from crud import summary as crud_summary
+from crud import import_job as crud_import_job
+from crud import sync as crud_sync
+from crud import budget as crud_budget
+from crud import search as crud_search
+from crud import category_rule as crud_category_rule
+from crud import recurring as crud_recurring
+from schemas import expense as schemas_expense
+from schemas import income as schemas_income
+from schemas import investment_and_saving as schemas_ias
+from schemas import car_loan as schemas_car_loan
+from schemas import import_job as schemas_import_job
+from schemas import budget as schemas_budget
+from schemas import category_rule as schemas_category_rule
+from schemas import recurring as schemas_recurring
+
+# Async variants of the CRUD functions.
+#
+# Each variant runs the synchronous CRUD function unchanged: on an
+# AsyncSession through run_sync (no thread, the driver is async), on a plain
+# Session in the threadpool. ORM results are converted to their response
+# schema inside that call, while lazy loads are still possible.
+#
+# Writes begin their transaction with begin_write(). With SQLITE_WRITE_QUEUE
+# enabled they skip the request's session and go through the group-commit
+# write queue instead. Once a write has run, the response cache namespaces it
+# affects are invalidated.
+#
+# Time spent in the call outside SQL counts as the request's "orm" phase
+# (see metrics.py); write queue jobs run in a copy of the request's context
+# so their queries are attributed to it.
+
+DbSession = Union[Session, AsyncSession]
+
+def _to_schema(result, schema):
+    if schema is None or result is None or isinstance(result, (bool, int, dict)):
+        return result
+    if isinstance(result, list):
+        return [item if isinstance(item, int) else schema.model_validate(item) for item in result]
+    return schema.model_validate(result)
+
+async def run(db: DbSession, fn, *args, schema=None, write=False, invalidates=(), **kwargs):
+    # Write queue jobs get a session of their own: carry the request's user over
+    user_id = tenancy.current_user_id(db)
+
+    def call(session: Session):
+        tenancy.scope(session, user_id)
+        with metrics.phase("orm"):
+            return _to_schema(fn(session, *args, **kwargs), schema)
+
+    def write_call(session: Session):
+        begin_write(session)
+        return call(session)
+
+    try:
+        if write and write_queue is not None:
+            return await asyncio.wrap_future(write_queue.submit(functools.partial(contextvars.copy_context().run, call)))
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(write_call if write else call)
+        return await run_in_threadpool(write_call if write else call, db)
+    finally:
+        cache.invalidate(*invalidates)
+
+def _variant(fn, schema=None, write=False, invalidates=()):
+    async def variant(db: DbSession, *args, **kwargs):
+        return await run(db, fn, *args, schema=schema, write=write, invalidates=invalidates, **kwargs)
+
+    variant.__name__ = fn.__name__
+    variant.__doc__ = fn.__doc__
+    return variant
+
+# Expenses and categories
+get_expense = _variant(crud_expense.get_expense_or_archived, schemas_expense.Expense)
+get_expenses = _variant(crud_expense.get_expenses, schemas_expense.Expense)
+get_expense_rows = _variant(crud_expense.get_expense_rows)
+create_expense = _variant(crud_expense.create_expense, schemas_expense.Expense, write=True, invalidates=(SUMMARY,))
+create_expenses = _variant(crud_expense.create_expenses, write=True, invalidates=(SUMMARY,))
+update_expense = _variant(crud_expense.update_expense, schemas_expense.Expense, write=True, invalidates=(SUMMARY,))
+delete_expense = _variant(crud_expense.delete_expense, write=True, invalidates=(SUMMARY,))
+update_expenses = _variant(crud_expense.update_expenses, write=True, invalidates=(SUMMARY,))
+delete_expenses = _variant(crud_expense.delete_expenses, write=True, invalidates=(SUMMARY,))
+get_category = _variant(crud_expense.get_category, schemas_expense.Category)
+get_categories = _variant(crud_expense.get_categories, schemas_expense.Category)
+create_category = _variant(crud_expense.create_category, schemas_expense.Category, write=True, invalidates=(CATEGORIES,))
+delete_category = _variant(crud_expense.delete_category, write=True, invalidates=(CATEGORIES, SUMMARY))
+
+# Categorization rules
+get_category_rules = _variant(crud_category_rule.get_rules, schemas_category_rule.CategoryRule)
+create_category_rule = _variant(crud_category_rule.create_rule, schemas_category_rule.CategoryRule, write=True)
+update_category_rule = _variant(crud_category_rule.update_rule, schemas_category_rule.CategoryRule, write=True)
+delete_category_rule = _variant(crud_category_rule.delete_rule, write=True)
+categorize = _variant(crud_category_rule.categorize)
+
+# Incomes
+get_income = _variant(crud_income.get_income_or_archived, schemas_income.Income)
+get_incomes = _variant(crud_income.get_incomes, schemas_income.Income)
+get_income_rows = _variant(crud_income.get_income_rows)
+create_income = _variant(crud_income.create_income, schemas_income.Income, write=True, invalidates=(SUMMARY,))
+create_incomes = _variant(crud_income.create_incomes, write=True, invalidates=(SUMMARY,))
+update_income = _variant(crud_income.update_income, schemas_income.Income, write=True, invalidates=(SUMMARY,))
+delete_income = _variant(crud_income.delete_income, write=True, invalidates=(SUMMARY,))
+update_incomes = _variant(crud_income.update_incomes, write=True, invalidates=(SUMMARY,))
+delete_incomes = _variant(crud_income.delete_incomes, write=True, invalidates=(SUMMARY,))
+
+# Savings and investments
+get_saving = _variant(crud_ias.get_saving, schemas_ias.Saving)
+get_savings = _variant(crud_ias.get_savings, schemas_ias.Saving)
+get_saving_rows = _variant(crud_ias.get_saving_rows)
+create_saving = _variant(crud_ias.create_saving, schemas_ias.Saving, write=True, invalidates=(SUMMARY,))
+create_savings = _variant(crud_ias.create_savings, write=True, invalidates=(SUMMARY,))
+update_saving = _variant(crud_ias.update_saving, schemas_ias.Saving, write=True, invalidates=(SUMMARY,))
+delete_saving = _variant(crud_ias.delete_saving, write=True, invalidates=(SUMMARY,))
+update_savings = _variant(crud_ias.update_savings, write=True, invalidates=(SUMMARY,))
+delete_savings = _variant(crud_ias.delete_savings, write=True, invalidates=(SUMMARY,))
+get_investment = _variant(crud_ias.get_investment, schemas_ias.Investment)
+get_investments = _variant(crud_ias.get_investments, schemas_ias.Investment)
+get_investment_rows = _variant(crud_ias.get_investment_rows)
+create_investment = _variant(crud_ias.create_investment, schemas_ias.Investment, write=True, invalidates=(SUMMARY,))
+create_investments = _variant(crud_ias.create_investments, write=True, invalidates=(SUMMARY,))
+update_investment = _variant(crud_ias.update_investment, schemas_ias.Investment, write=True, invalidates=(SUMMARY,))
+delete_investment = _variant(crud_ias.delete_investment, write=True, invalidates=(SUMMARY,))
+update_investments = _variant(crud_ias.update_investments, write=True, invalidates=(SUMMARY,))
+delete_investments = _variant(crud_ias.delete_investments, write=True, invalidates=(SUMMARY,))
+
+# Car loans
+get_car_loan = _variant(crud_car_loan.get_car_loan, schemas_car_loan.CarLoan)
+get_car_loans = _variant(crud_car_loan.get_car_loans, schemas_car_loan.CarLoan)
+get_car_loan_rows = _variant(crud_car_loan.get_car_loan_rows)
+create_car_loan = _variant(crud_car_loan.create_car_loan, schemas_car_loan.CarLoan, write=True, invalidates=(CAR_LOANS,))
+create_car_loans = _variant(crud_car_loan.create_car_loans, write=True, invalidates=(CAR_LOANS,))
+update_car_loan = _variant(crud_car_loan.update_car_loan, schemas_car_loan.CarLoan, write=True, invalidates=(CAR_LOANS,))
+delete_car_loan = _variant(crud_car_loan.delete_car_loan, write=True, invalidates=(CAR_LOANS,))
+update_car_loans = _variant(crud_car_loan.update_car_loans, write=True, invalidates=(CAR_LOANS,))
+delete_car_loans = _variant(crud_car_loan.delete_car_loans, write=True, invalidates=(CAR_LOANS,))
+get_latest_car_loan = _variant(crud_car_loan.get_latest_car_loan, schemas_car_loan.CarLoan)
+get_car_loan_stats = _variant(crud_car_loan.get_car_loan_stats)
+get_car_loan_projection = _variant(crud_car_loan.get_projection)
+
+# Budgets
+get_budgets = _variant(crud_budget.get_budgets, schemas_budget.Budget)
+set_budget = _variant(crud_budget.set_budget, schemas_budget.Budget, write=True)
+delete_budget = _variant(crud_budget.delete_budget, write=True)
+get_budget_status = _variant(crud_budget.get_budget_status)
+
+# Recurring transactions
+get_recurring = _variant(crud_recurring.get_recurring, schemas_recurring.RecurringTransaction)
+get_recurrings = _variant(crud_recurring.get_recurrings, schemas_recurring.RecurringTransaction)
+create_recurring = _variant(crud_recurring.create_recurring, schemas_recurring.RecurringTransaction, write=True)
+update_recurring = _variant(crud_recurring.update_recurring, schemas_recurring.RecurringTransaction, write=True)
+delete_recurring = _variant(crud_recurring.delete_recurring, write=True)
+materialize_due = _variant(crud_recurring.materialize_due, write=True, invalidates=(SUMMARY,))
+
+# Summaries, imports and sync
+get_monthly_summary = _variant(crud_summary.get_monthly_summary)
+get_import_job = _variant(crud_import_job.get_import_job, schemas_import_job.ImportJob)
+get_import_jobs = _variant(crud_import_job.get_import_jobs, schemas_import_job.ImportJob)
+get_changes = _variant(crud_sync.get_changes)
+search = _variant(crud_search.search)
@@ -0,0 +1,430 @@
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, PrimaryKeyConstraint, String, Table, extract, func, insert, select, text
+)
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+from datetime import datetime
+from money import Cents
+from models.archive import ArchivedYear
+from models.expense import Expense, Category, expense_category
+from models.income import Income
+from crud import pagination
+from database import begin_write
+import tenancy
+
+# Year-partitioned archive for old expenses and incomes.
+#
+# Archiving a year moves its rows out of the live tables into a partition of
+# their own, so the live tables and their indexes only hold recent data. On
+# PostgreSQL the partitions are attached to natively range-partitioned
+# <ledger>_archive tables (created by migration 0012); on SQLite they are
+# tables in the archive database that database.py attaches to every
+# connection. Archived years are recorded in archived_years. Expense
+# categories move along into an expense_category partition per year.
+#
+# Archived rows keep their ids and stay visible to the read functions: list
+# pages, single rows, date-ranged summaries, search, full syncs and exports
+# add the partitions overlapping the requested dates. The monthly rollups and
+# search index entries are kept as they are, so unbounded summaries and
+# budgets cover archived years without reading them. Updating or deleting an
+# archived row first moves it back to the live table (restore_rows()), where
+# the usual write path takes over; the next archive run moves it out again.
+# The ledger tables use AUTOINCREMENT on SQLite (migration 0013), so archived
+# ids are never handed out again.
+#
+# On SQLite rows move between two database files, which WAL does not commit
+# atomically: archive_year() copies first and deletes after, in separate
+# transactions, so an interrupted run leaves rows in both places, with the
+# live copy winning. Running archive_year() again for the year finishes the
+# move (see archive_ledgers.py).
+
+MODELS = {"expenses": Expense, "incomes": Income}
+
+# Attached database name on SQLite
+SCHEMA = "archive"
+
+# Rows moved per statement when archiving
+BATCH = 5000
+
+_metadata = MetaData()
+
+class Partition(NamedTuple):
+    year: int
+    rows: Table
+    links: Optional[Table]  # expense_category rows of the archived expenses
+
+def _row_columns(ledger: str) -> list:
+    columns = [
+        Column("id", Integer, nullable=False),
+        Column("user_id", Integer),
+        Column("date", DateTime, nullable=False),
+        Column("amount", Cents, nullable=False),
+        Column("description", String),
+        # Kept so that re-importing a statement skips archived rows
+        Column("import_hash", String),
+        Column("updated_at", DateTime),
+    ]
+    if ledger == "incomes":
+        columns.append(Column("source", String))
+    return columns
+
+def _link_columns() -> list:
+    # date decides the partition on PostgreSQL
+    return [
+        Column("expense_id", Integer, nullable=False),
+        Column("category_id", Integer, nullable=False),
+        Column("date", DateTime, nullable=False),
+    ]
+
+def parent_tables() -> List[Table]:
+    """The partitioned PostgreSQL tables; a partition's key must be part of the primary key."""
+    return [
+        Table(
+            f"{ledger}_archive", _metadata, *_row_columns(ledger),
+            PrimaryKeyConstraint("id", "date"),
+            Index(f"ix_{ledger}_archive_user_id_date", "user_id", "date"),
+            Index(f"ix_{ledger}_archive_user_id_import_hash", "user_id", "import_hash"),
+            postgresql_partition_by="RANGE (date)", keep_existing=True
+        )
+        for ledger in MODELS
+    ] + [
+        Table(
+            "expense_category_archive", _metadata, *_link_columns(),
+            Index("ix_expense_category_archive_expense_id", "expense_id"),
+            Index("ix_expense_category_archive_category_id", "category_id"),
+            postgresql_partition_by="RANGE (date)", keep_existing=True
+        )
+    ]
+
+_partitions: Dict[tuple, Partition] = {}
+
+def _partition(dialect: str, ledger: str, year: int) -> Partition:
+    key = (dialect, ledger, year)
+    if key not in _partitions:
+        schema = SCHEMA if dialect == "sqlite" else None
+        name = f"{ledger}_archive_{year}"
+        rows = Table(
+            name, _metadata, *_row_columns(ledger), PrimaryKeyConstraint("id"),
+            Index(f"ix_{name}_user_id_date", "user_id", "date"),
+            Index(f"ix_{name}_user_id_import_hash", "user_id", "import_hash"), schema=schema, keep_existing=True
+        )
+        links = None
+        if ledger == "expenses":
+            links_name = f"expense_category_archive_{year}"
+            links = Table(
+                links_name, _metadata, *_link_columns(),
+                Index(f"ix_{links_name}_expense_id", "expense_id"),
+                Index(f"ix_{links_name}_category_id", "category_id"), schema=schema, keep_existing=True
+            )
+        _partitions[key] = Partition(year, rows, links)
+    return _partitions[key]
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def archived_years(db: Session, ledger: str) -> List[int]:
+    """Archived years of ``ledger``, newest first. Looked up once per session."""
+    if ledger not in MODELS:
+        return []
+    years = db.info.get("archived_years")
+    if years is None:
+        years = {name: [] for name in MODELS}
+        for name, year in db.query(ArchivedYear.ledger, ArchivedYear.year).order_by(ArchivedYear.year.desc()):
+            years.setdefault(name, []).append(year)
+        db.info["archived_years"] = years
+    return years[ledger]
+
+def partitions(
+    db: Session,
+    ledger: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> List[Partition]:
+    """Partitions of ``ledger`` that can hold rows between ``start_date`` and ``end_date``, newest first"""
+    dialect = _dialect(db)
+    return [
+        _partition(dialect, ledger, year) for year in archived_years(db, ledger)
+        if (start_date is None or year >= start_date.year) and (end_date is None or year <= end_date.year)
+    ]
+
+def filter_rows(db: Session, stmt, table: Table, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+    """Restrict ``stmt`` to the session's user and the dates; partitions are plain tables, so tenancy does not apply."""
+    user_id = tenancy.current_user_id(db)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    if start_date:
+        stmt = stmt.where(table.c.date >= start_date)
+    if end_date:
+        stmt = stmt.where(table.c.date <= end_date)
+    return stmt
+
+def merge_page(
+    db: Session,
+    parts: List[Partition],
+    rows: list,
+    columns: Sequence,
+    skip: int,
+    limit: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    after: Optional[tuple] = None,
+    category_ids: Optional[List[int]] = None
+) -> list:
+    """Page ``skip``..``skip + limit`` of live and archived rows, newest first by (date, id).
+
+    ``rows`` are the first skip + limit live rows as tuples of ``columns``.
+    Partitions are read newest first, each for at most skip + limit rows,
+    and the rest are skipped as soon as the page is full of newer rows.
+    """
+    keys = [column.key for column in columns]
+    date_at, id_at = keys.index("date"), keys.index("id")
+    need = skip + limit
+    rows = list(rows)
+    for part in parts:
+        if len(rows) >= need and rows[need - 1][date_at] is not None \
+                and rows[need - 1][date_at] >= datetime(part.year + 1, 1, 1):
+            break
+        table = part.rows
+        stmt = filter_rows(db, select(*(table.c[key] for key in keys)), table, start_date, end_date)
+        if category_ids:
+            stmt = stmt.where(table.c.id.in_(
+                select(part.links.c.expense_id).where(part.links.c.category_id.in_(category_ids))
+            ))
+        stmt = pagination.after(stmt, (table.c.date, table.c.id), after)
+        rows += db.execute(stmt.order_by(table.c.date.desc(), table.c.id.desc()).limit(need)).all()
+        # Rows without a date sort last, as in the live query
+        rows.sort(key=lambda row: (row[date_at] is not None, row[date_at] or datetime.min, row[id_at]), reverse=True)
+        del rows[need:]
+    return rows[skip:]
+
+def category_rows(db: Session, parts: List[Partition], expense_ids: List[int]) -> list:
+    """(expense_id, category id, name, description) for archived expenses"""
+    result = []
+    for part in parts:
+        result += db.query(part.links.c.expense_id, Category.id, Category.name, Category.description).join(
+            Category, Category.id == part.links.c.category_id
+        ).filter(part.links.c.expense_id.in_(expense_ids)).all()
+    return result
+
+def _shape(db: Session, part: Partition, rows: list) -> List[dict]:
+    """Partition rows as dicts shaped like the ledger's response schema"""
+    result = [{key: value for key, value in row.items() if key not in ("user_id", "import_hash")} for row in rows]
+    if part.links is not None and result:
+        categories: Dict[int, list] = {}
+        for expense_id, category_id, name, description in category_rows(db, [part], [row["id"] for row in result]):
+            categories.setdefault(expense_id, []).append({"id": category_id, "name": name, "description": description})
+        for row in result:
+            row["category_ids"] = []
+            row["categories"] = categories.get(row["id"], [])
+    return result
+
+def get_row(db: Session, ledger: str, row_id: int) -> Optional[dict]:
+    """An archived row by id, shaped like the ledger's response schema"""
+    for part in partitions(db, ledger):
+        row = db.execute(filter_rows(db, select(part.rows), part.rows).where(part.rows.c.id == row_id)).mappings().first()
+        if row is not None:
+            return _shape(db, part, [row])[0]
+    return None
+
+def get_rows(db: Session, ledger: str) -> List[dict]:
+    """Every archived row of the ledger by id within each year, shaped like the ledger's response schema"""
+    result = []
+    for part in reversed(partitions(db, ledger)):
+        rows = db.execute(filter_rows(db, select(part.rows), part.rows).order_by(part.rows.c.id)).mappings().all()
+        result += _shape(db, part, rows)
+    return result
+
+def import_hashes(db: Session, ledger: str, hashes: List[str]) -> set:
+    """Which of ``hashes`` the session's user already has in the ledger, live or archived"""
+    if not hashes:
+        return set()
+    model = MODELS[ledger]
+    found = {h for (h,) in db.query(model.import_hash).filter(model.import_hash.in_(hashes))}
+    for part in partitions(db, ledger):
+        table = part.rows
+        stmt = filter_rows(db, select(table.c.import_hash), table).where(table.c.import_hash.in_(hashes))
+        found.update(db.execute(stmt).scalars())
+    return found
+
+def restore_rows(db: Session, ledger: str, ids: List[int]) -> List[int]:
+    """Move archived rows back to the live table, with their categories. Returns the ids moved. Does not commit.
+
+    The rows are already counted in the rollups and the search index, so
+    nothing else changes; links to categories deleted since are dropped.
+    Rows keep their import hash and get a new updated_at.
+
+    On SQLite the main database commits before the attached archive, so a
+    restore interrupted between the two leaves the row in both places; the
+    next archive_year() for the year drops the archived copy.
+    """
+    if not ids or not archived_years(db, ledger):
+        return []
+    live = MODELS[ledger].__table__
+    restored = []
+    now = datetime.utcnow()
+    for part in partitions(db, ledger):
+        rows = db.execute(filter_rows(db, select(part.rows), part.rows).where(part.rows.c.id.in_(ids))).mappings().all()
+        if not rows:
+            continue
+        moved = [row["id"] for row in rows]
+        db.execute(live.insert(), [{**row, "updated_at": now} for row in rows])
+        if part.links is not None:
+            db.execute(insert(expense_category).from_select(
+                ["expense_id", "category_id"],
+                select(part.links.c.expense_id, part.links.c.category_id).where(
+                    part.links.c.expense_id.in_(moved), part.links.c.category_id.in_(select(Category.id))
+                )
+            ))
+            db.execute(part.links.delete().where(part.links.c.expense_id.in_(moved)))
+        db.execute(part.rows.delete().where(part.rows.c.id.in_(moved)))
+        db.query(ArchivedYear).filter(ArchivedYear.ledger == ledger, ArchivedYear.year == part.year).update(
+            {ArchivedYear.row_count: ArchivedYear.row_count - len(moved)}, synchronize_session=False
+        )
+        restored += moved
+    return restored
+
+def grouped_totals(
+    db: Session,
+    part: Partition,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    by_category: bool = False,
+    by_user: bool = False
+) -> list:
+    """Monthly sums of a partition: rows of ([user_id,] year, month, [category_id,] total, count)"""
+    table = part.rows
+    year, month = extract("year", table.c.date), extract("month", table.c.date)
+    keys = [table.c.user_id] if by_user else []
+    keys += [year, month]
+    stmt = select(*keys)
+    if by_category:
+        keys.append(part.links.c.category_id)
+        # Categories deleted since the year was archived no longer count
+        stmt = select(*keys).join(part.links, part.links.c.expense_id == table.c.id).where(
+            part.links.c.category_id.in_(select(Category.id))
+        )
+    stmt = filter_rows(db, stmt.add_columns(func.sum(table.c.amount), func.count(table.c.id)), table, start_date, end_date)
+    return db.execute(stmt.group_by(*keys)).all()
+
+def iter_rows(
+    db: Session,
+    ledger: str,
+    keys: List[str],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> Iterator[List[Dict]]:
+    """Archived rows as batches of dicts of ``keys``, oldest year first and by id within a year.
+
+    Expenses get the names of their categories under "categories", like crud.export.
+    """
+    for part in reversed(partitions(db, ledger, start_date, end_date)):
+        table = part.rows
+        stmt = filter_rows(db, select(*(table.c[key] for key in keys)), table, start_date, end_date).order_by(table.c.id)
+        for batch in db.execute(stmt.execution_options(yield_per=batch_size)).partitions():
+            rows = [dict(row._mapping) for row in batch]
+            if part.links is not None:
+                names: Dict[int, List[str]] = {}
+                for expense_id, _, name, _ in category_rows(db, [part], [row["id"] for row in rows]):
+                    names.setdefault(expense_id, []).append(name)
+                for row in rows:
+                    row["categories"] = names.get(row["id"], [])
+            yield rows
+
+def live_years(db: Session, ledger: str) -> List[int]:
+    """Years with rows in the live table, oldest first"""
+    model = MODELS[ledger]
+    year = extract("year", model.date)
+    return [int(y) for (y,) in db.query(year).filter(model.date.isnot(None)).distinct().order_by(year)]
+
+def create_partition(db: Session, ledger: str, year: int) -> Partition:
+    dialect = _dialect(db)
+    part = _partition(dialect, ledger, year)
+    conn = db.connection()
+    if dialect == "postgresql":
+        for table, parent in ((part.rows, f"{ledger}_archive"), (part.links, "expense_category_archive")):
+            if table is not None:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {table.name} PARTITION OF {parent} "
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                ))
+    else:
+        part.rows.create(bind=conn, checkfirst=True)
+        if part.links is not None:
+            part.links.create(bind=conn, checkfirst=True)
+    return part
+
+def _drop_copies(db: Session, part: Partition, ids) -> None:
+    """Delete the partition rows ``ids`` (a list or a select of ids) and their links"""
+    if part.links is not None:
+        db.execute(part.links.delete().where(part.links.c.expense_id.in_(ids)))
+    db.execute(part.rows.delete().where(part.rows.c.id.in_(ids)))
+
+def archive_year(db: Session, ledger: str, year: int) -> int:
+    """Move the ledger's rows dated in ``year`` into its archive partition and commit.
+
+    Returns the number of rows moved. Running it again for the same year
+    moves rows added or restored since. The rollups and search index are
+    left untouched.
+
+    On SQLite the partition is in the attached database, and a transaction
+    writing to both files is not atomic in WAL mode. The move is made of
+    transactions that each write to one of them: copy the rows, replacing
+    earlier copies; delete the live rows that still match their copy and
+    register the year; drop the copies of rows changed meanwhile. If a run
+    is interrupted, rows are left in both places, never in neither, and
+    running it again for the year finishes the move.
+    """
+    model = MODELS[ledger]
+    live = model.__table__
+    split = _dialect(db) == "sqlite"
+    query = db.query(model.id).filter(model.date >= datetime(year, 1, 1), model.date < datetime(year + 1, 1, 1))
+    ids = [row_id for (row_id,) in query.order_by(model.id)]
+
+    part = create_partition(db, ledger, year)
+    # Copies left by an interrupted run or restore: the live row wins
+    _drop_copies(db, part, select(live.c.id))
+    keys = [column.name for column in part.rows.columns]
+    for i in range(0, len(ids), BATCH):
+        chunk = ids[i:i + BATCH]
+        db.execute(insert(part.rows).from_select(keys, select(*(live.c[key] for key in keys)).where(live.c.id.in_(chunk))))
+        if part.links is not None:
+            db.execute(insert(part.links).from_select(
+                ["expense_id", "category_id", "date"],
+                select(expense_category.c.expense_id, expense_category.c.category_id, live.c.date).join(
+                    live, live.c.id == expense_category.c.expense_id
+                ).where(expense_category.c.expense_id.in_(chunk))
+            ))
+    if split:
+        db.commit()
+        begin_write(db)
+
+    # Rows updated or deleted since they were copied stay where they are
+    moved = []
+    for i in range(0, len(ids), BATCH):
+        chunk = [row_id for (row_id,) in db.execute(
+            select(live.c.id).join(part.rows, part.rows.c.id == live.c.id).where(
+                live.c.id.in_(ids[i:i + BATCH]), live.c.updated_at.is_not_distinct_from(part.rows.c.updated_at)
+            )
+        )]
+        if part.links is not None:
+            db.execute(expense_category.delete().where(expense_category.c.expense_id.in_(chunk)))
+        db.execute(live.delete().where(live.c.id.in_(chunk)))
+        moved += chunk
+    stale = sorted(set(ids) - set(moved))
+
+    entry = db.query(ArchivedYear).filter(ArchivedYear.ledger == ledger, ArchivedYear.year == year).first()
+    if entry is None:
+        entry = ArchivedYear(ledger=ledger, year=year, row_count=0)
+        db.add(entry)
+    entry.row_count = db.execute(select(func.count()).select_from(part.rows)).scalar() - len(stale)
+    entry.archived_at = datetime.utcnow()
+    if split:
+        db.commit()
+        begin_write(db)
+
+    for i in range(0, len(stale), BATCH):
+        _drop_copies(db, part, stale[i:i + BATCH])
+    db.commit()
+    db.info.pop("archived_years", None)
+    return len(moved)
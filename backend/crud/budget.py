@@ -0,0 +1,121 @@
+import calendar
+from sqlalchemy import and_, func, tuple_
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from datetime import datetime
+from models.budget import Budget
+from models.expense import Category
+from models.rollup import MonthlyRollup
+from schemas.budget import BudgetCreate
+
+def get_budget(db: Session, budget_id: int) -> Optional[Budget]:
+    return db.query(Budget).filter(Budget.id == budget_id).first()
+
+def get_budgets(
+    db: Session,
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    category_id: Optional[int] = None
+) -> List[Budget]:
+    query = db.query(Budget)
+    if year is not None:
+        query = query.filter(Budget.year == year)
+    if month is not None:
+        query = query.filter(Budget.month == month)
+    if category_id is not None:
+        query = query.filter(Budget.category_id == category_id)
+    return query.order_by(Budget.year, Budget.month, Budget.category_id).all()
+
+def set_budget(db: Session, budget: BudgetCreate) -> Optional[Budget]:
+    """Create the category's budget for the month, or replace its amount.
+
+    Returns None if the category does not exist.
+    """
+    if db.query(Category.id).filter(Category.id == budget.category_id).first() is None:
+        return None
+    db_budget = db.query(Budget).filter(
+        Budget.category_id == budget.category_id,
+        Budget.year == budget.year,
+        Budget.month == budget.month
+    ).first()
+    if db_budget is None:
+        db_budget = Budget(**budget.model_dump())
+        db.add(db_budget)
+    else:
+        db_budget.amount = budget.amount
+    db.commit()
+    db.refresh(db_budget)
+    return db_budget
+
+def delete_budget(db: Session, budget_id: int) -> bool:
+    db_budget = get_budget(db, budget_id)
+    if not db_budget:
+        return False
+    db.delete(db_budget)
+    db.commit()
+    return True
+
+def delete_category_budgets(db: Session, category_id: int):
+    """Does not commit; called when the category itself is deleted."""
+    db.query(Budget).filter(Budget.category_id == category_id).delete(synchronize_session=False)
+
+def _days_elapsed(year: int, month: int, days_in_month: int, now: datetime) -> int:
+    if (year, month) < (now.year, now.month):
+        return days_in_month
+    if (year, month) == (now.year, now.month):
+        return now.day
+    return 0
+
+def get_budget_status(
+    db: Session,
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    now: Optional[datetime] = None
+) -> List[dict]:
+    """Actual vs budget for every budget from month ``start`` to ``end`` (inclusive (year, month) pairs).
+
+    Spending comes from the per-category monthly rollups, joined to the
+    budgets in a single query, so the cost does not depend on the number of
+    expenses. The current month is projected to month end at its burn rate so far.
+    """
+    now = now or datetime.now()
+    rows = db.query(
+        Budget.id, Budget.category_id, Category.name, Budget.year, Budget.month, Budget.amount,
+        func.coalesce(MonthlyRollup.total, 0)
+    ).outerjoin(
+        Category, Category.id == Budget.category_id
+    ).outerjoin(
+        MonthlyRollup, and_(
+            MonthlyRollup.ledger == "expenses",
+            MonthlyRollup.category_id == Budget.category_id,
+            MonthlyRollup.year == Budget.year,
+            MonthlyRollup.month == Budget.month
+        )
+    ).filter(
+        tuple_(Budget.year, Budget.month) >= tuple_(*start),
+        tuple_(Budget.year, Budget.month) <= tuple_(*end)
+    ).order_by(Budget.year, Budget.month, Budget.category_id).all()
+
+    status = []
+    for budget_id, category_id, name, year, month, amount, spent in rows:
+        days_in_month = calendar.monthrange(year, month)[1]
+        days_elapsed = _days_elapsed(year, month, days_in_month, now)
+        burn_rate = spent / days_elapsed if days_elapsed else 0
+        projected = max(spent, burn_rate * days_in_month)
+        status.append({
+            "budget_id": budget_id,
+            "category_id": category_id,
+            "category_name": name,
+            "year": year,
+            "month": month,
+            "budget": amount,
+            "spent": spent,
+            "remaining": amount - spent,
+            "percent_used": spent / amount * 100 if amount else 0,
+            "days_elapsed": days_elapsed,
+            "days_in_month": days_in_month,
+            "burn_rate": burn_rate,
+            "projected": projected,
+            "projected_overspend": max(0, projected - amount),
+        })
+    return status
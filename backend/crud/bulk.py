@@ -0,0 +1,35 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import Any, Callable, List, Tuple
+from crud import sync
+import tenancy
+
+# Set-based helpers for the bulk endpoints. None of them commits: callers
+# update rollups and commit once for the whole batch. Deletes leave sync
+# tombstones.
+
+def insert_rows(db: Session, model, rows: List[dict]) -> List[int]:
+    """Insert rows with one executemany and return their ids in input order"""
+    if not rows:
+        return []
+    rows = tenancy.owned_rows(db, model, rows)
+    result = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars())
+
+def delete_rows(db: Session, model, ids: List[int], *columns) -> list:
+    """Delete rows by id and return (id, *columns) for each row that existed"""
+    if not ids:
+        return []
+    rows = db.query(model.id, *columns).filter(model.id.in_(ids)).all()
+    if rows:
+        db.query(model).filter(model.id.in_([row[0] for row in rows])).delete(synchronize_session=False)
+        sync.record_deletes(db, model, [row[0] for row in rows])
+    return rows
+
+def update_rows(db: Session, update: Callable, items: List[Tuple[int, Any]]) -> List[int]:
+    """Apply a ledger's single-row ``update(db, id, data, commit=False)`` to each (id, data) item.
+
+    Returns the ids that existed. Updates touch different columns, rollups
+    and index entries per ledger, so they are not set-based.
+    """
+    return [row_id for row_id, data in items if update(db, row_id, data, commit=False) is not None]
@@ -1,83 +1,260 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+from decimal import Decimal
+import amortization
 from models.car_loan import CarLoan
 from schemas.car_loan import CarLoanCreate
+from crud import pagination
+from crud import bulk
+from crud import sync
+from crud import fast_rows
+
+MONTHS = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4,
+    'May': 5, 'June': 6, 'July': 7, 'August': 8,
+    'September': 9, 'October': 10, 'November': 11, 'December': 12
+}
+
+def get_period(year: int, month_number: Optional[int]) -> Optional[int]:
+    """Months since year 0, so (year, month) pairs sort and compare as one integer"""
+    if month_number is None:
+        return None
+    return year * 12 + month_number - 1
+
+def _set_period(db_car_loan: CarLoan):
+    db_car_loan.month_number = MONTHS.get(db_car_loan.month)
+    db_car_loan.period = get_period(db_car_loan.year, db_car_loan.month_number)
 
 def create_car_loan(db: Session, car_loan: CarLoanCreate) -> CarLoan:
     db_car_loan = CarLoan(**car_loan.dict())
+    _set_period(db_car_loan)
     db.add(db_car_loan)
     db.commit()
     db.refresh(db_car_loan)
     return db_car_loan
 
+# Newest month first; PostgreSQL would put a NULL period first otherwise
+NEWEST_FIRST = (CarLoan.period.desc().nulls_last(), CarLoan.id.desc())
+
 def get_car_loans(
     db: Session, 
     skip: int = 0, 
     limit: int = 100,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    after: Optional[Tuple[int, int]] = None,
+    columns: Optional[tuple] = None
 ) -> List[CarLoan]:
-    query = db.query(CarLoan)
+    """Car loans newest month first; with ``columns``, plain tuples of those columns instead of models."""
+    query = db.query(*columns) if columns else db.query(CarLoan)
     
     if start_date:
-        query = query.filter(
-            (CarLoan.year > start_date.year) | 
-            ((CarLoan.year == start_date.year) & (CarLoan.month >= start_date.strftime('%B')))
-        )
+        query = query.filter(CarLoan.period >= get_period(start_date.year, start_date.month))
     
     if end_date:
-        query = query.filter(
-            (CarLoan.year < end_date.year) | 
-            ((CarLoan.year == end_date.year) & (CarLoan.month <= end_date.strftime('%B')))
-        )
+        query = query.filter(CarLoan.period <= get_period(end_date.year, end_date.month))
+    
+    # Rows whose month name was not recognized have no period: they come last
+    query = pagination.after(query, (CarLoan.period, CarLoan.id), after, nulls_last=True)
     
-    # Sort by year desc, then by month number desc
-    return query.order_by(CarLoan.year.desc(), _get_month_order()).offset(skip).limit(limit).all()
+    # Newest month first
+    return query.order_by(*NEWEST_FIRST).offset(skip).limit(limit).all()
+
+# Fields of schemas.car_loan.CarLoan, in order
+ROW_COLUMNS = (
+    CarLoan.month, CarLoan.year, CarLoan.principal_balance, CarLoan.payoff_balance, CarLoan.amount_paid,
+    CarLoan.principal, CarLoan.finance, CarLoan.ending_balance, CarLoan.interest_ytd, CarLoan.id
+)
+
+def get_car_loan_rows(db: Session, **kwargs) -> List[dict]:
+    """get_car_loans() as plain dicts, for FastJSONResponse"""
+    return fast_rows.as_dicts(ROW_COLUMNS, get_car_loans(db, columns=ROW_COLUMNS, **kwargs))
 
 def get_car_loan(db: Session, car_loan_id: int) -> Optional[CarLoan]:
     return db.query(CarLoan).filter(CarLoan.id == car_loan_id).first()
 
-def update_car_loan(db: Session, car_loan_id: int, car_loan: CarLoanCreate) -> Optional[CarLoan]:
+def update_car_loan(db: Session, car_loan_id: int, car_loan: CarLoanCreate, commit: bool = True) -> Optional[CarLoan]:
     db_car_loan = db.query(CarLoan).filter(CarLoan.id == car_loan_id).first()
     if db_car_loan:
         for key, value in car_loan.dict().items():
             setattr(db_car_loan, key, value)
-        db.commit()
-        db.refresh(db_car_loan)
+        _set_period(db_car_loan)
+        if commit:
+            db.commit()
+            db.refresh(db_car_loan)
     return db_car_loan
 
 def delete_car_loan(db: Session, car_loan_id: int) -> bool:
     db_car_loan = db.query(CarLoan).filter(CarLoan.id == car_loan_id).first()
     if db_car_loan:
+        sync.record_deletes(db, CarLoan, [car_loan_id])
         db.delete(db_car_loan)
         db.commit()
         return True
     return False
 
+def create_car_loans(db: Session, car_loans: List[CarLoanCreate]) -> List[int]:
+    rows = []
+    for car_loan in car_loans:
+        month_number = MONTHS.get(car_loan.month)
+        rows.append({
+            **car_loan.dict(),
+            "month_number": month_number,
+            "period": get_period(car_loan.year, month_number),
+        })
+    ids = bulk.insert_rows(db, CarLoan, rows)
+    db.commit()
+    return ids
+
+def update_car_loans(db: Session, car_loans: List[Tuple[int, CarLoanCreate]]) -> List[int]:
+    updated = bulk.update_rows(db, update_car_loan, car_loans)
+    db.commit()
+    return updated
+
+def delete_car_loans(db: Session, car_loan_ids: List[int]) -> List[int]:
+    rows = bulk.delete_rows(db, CarLoan, car_loan_ids)
+    db.commit()
+    return [row[0] for row in rows]
+
 def get_latest_car_loan(db: Session) -> Optional[CarLoan]:
-    return db.query(CarLoan).order_by(CarLoan.year.desc(), _get_month_order()).first()
+    return db.query(CarLoan).order_by(*NEWEST_FIRST).first()
+
+def get_total_interest_paid(db: Session) -> Decimal:
+    return db.query(func.coalesce(func.sum(CarLoan.finance), 0)).scalar()
 
-def get_total_interest_paid(db: Session) -> float:
-    result = db.query(CarLoan.finance).all()
-    return sum(row[0] for row in result if row[0] is not None)
+def get_total_principal_paid(db: Session) -> Decimal:
+    return db.query(func.coalesce(func.sum(CarLoan.principal), 0)).scalar()
 
-def get_total_principal_paid(db: Session) -> float:
-    result = db.query(CarLoan.principal).all()
-    return sum(row[0] for row in result if row[0] is not None)
+def get_total_payments(db: Session) -> Decimal:
+    return db.query(func.coalesce(func.sum(CarLoan.amount_paid), 0)).scalar()
 
-def get_total_payments(db: Session) -> float:
-    result = db.query(CarLoan.amount_paid).all()
-    return sum(row[0] for row in result if row[0] is not None)
+def get_car_loan_stats(db: Session) -> dict:
+    """Totals, per-year breakdown and latest balance in a single query"""
+    latest_balance = (
+        db.query(CarLoan.ending_balance)
+        .order_by(*NEWEST_FIRST)
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = db.query(
+        CarLoan.year,
+        func.sum(CarLoan.finance),
+        func.sum(CarLoan.principal),
+        func.sum(CarLoan.amount_paid),
+        func.count(CarLoan.id),
+        latest_balance,
+    ).group_by(CarLoan.year).order_by(CarLoan.year).all()
 
-def _get_month_order():
-    """Helper function to get month order for sorting"""
-    from sqlalchemy import case
-    return case(
+    years = [
         {
-            'January': 1, 'February': 2, 'March': 3, 'April': 4,
-            'May': 5, 'June': 6, 'July': 7, 'August': 8,
-            'September': 9, 'October': 10, 'November': 11, 'December': 12
-        },
-        value=CarLoan.month
-    ).desc() 
\ No newline at end of file
+            "year": year,
+            "interest_paid": interest or 0,
+            "principal_paid": principal or 0,
+            "total_payments": payments or 0,
+            "payment_count": count,
+            "average_payment": (payments or 0) / count if count else 0,
+        }
+        for year, interest, principal, payments, count, _ in rows
+    ]
+    total_payments = sum(y["total_payments"] for y in years)
+    payment_count = sum(y["payment_count"] for y in years)
+
+    return {
+        "latest_balance": (rows[0][5] or 0) if rows else 0,
+        "total_interest_paid": sum(y["interest_paid"] for y in years),
+        "total_principal_paid": sum(y["principal_paid"] for y in years),
+        "total_payments": total_payments,
+        "payment_count": payment_count,
+        "average_payment": total_payments / payment_count if payment_count else 0,
+        "years": years,
+    }
+
+def row_sort_key(row: dict) -> Tuple[Optional[int], int]:
+    """Pagination key of rows from get_car_loan_rows(), matching NEWEST_FIRST"""
+    return (get_period(row["year"], MONTHS.get(row["month"])), row["id"])
+
+def _year_month(period: int) -> Tuple[int, int]:
+    return period // 12, period % 12 + 1
+
+def get_projection(
+    db: Session,
+    annual_rate: Optional[float] = None,
+    payment: Optional[float] = None,
+    extra_payments: Optional[List[float]] = None,
+    extra_starts: Optional[List[Tuple[int, int]]] = None,
+    include_schedule: bool = True
+) -> Optional[dict]:
+    """Amortization of the balance left after the latest month, and extra-payment scenarios.
+
+    The rate defaults to the latest month's interest over its starting
+    balance and the payment to its amount paid. Each extra payment is tried
+    from each (year, month) in ``extra_starts`` (default: the first projected
+    month). Returns None without car loan data; raises ValueError if the
+    payment does not cover the interest.
+    """
+    latest = get_latest_car_loan(db)
+    if latest is None:
+        return None
+    # Projections are estimates, computed in floating point
+    balance = max(float(latest.ending_balance), 0.0)
+    if annual_rate is not None:
+        rate = annual_rate / 100 / 12
+    else:
+        rate = float(latest.finance / latest.principal_balance) if latest.principal_balance else 0.0
+    payment = float(latest.amount_paid) if payment is None else payment
+    if balance > 0 and payment <= balance * rate:
+        raise ValueError("Payment does not cover the monthly interest")
+    if any(extra < 0 for extra in extra_payments or ()):
+        raise ValueError("Extra payments cannot be negative")
+
+    # Month of the first projected payment
+    first = (latest.period if latest.period is not None else get_period(latest.year, 12)) + 1
+    starts = [get_period(year, month) for year, month in extra_starts or []] or [first]
+    extras = extra_payments or []
+    grid = amortization.scenario_grid(balance, rate, payment, extras or [0.0], [max(s - first, 0) + 1 for s in starts])
+    base_months, base_interest = grid["base_months"], grid["base_interest"]
+
+    schedule = []
+    if include_schedule:
+        rows = amortization.schedule(balance, rate, payment)
+        for i, (paid, interest, principal, left) in enumerate(zip(
+            rows["payment"].tolist(), rows["interest"].tolist(), rows["principal"].tolist(), rows["balance"].tolist()
+        )):
+            year, month = _year_month(first + i)
+            schedule.append({
+                "year": year, "month": month, "payment": paid, "interest": interest, "principal": principal, "balance": left
+            })
+
+    scenarios = []
+    for i, extra in enumerate(extras):
+        for j, start in enumerate(starts):
+            months = int(grid["months"][i, j])
+            interest = float(grid["interest"][i, j])
+            start_year, start_month = _year_month(max(start, first))
+            payoff_year, payoff_month = _year_month(first + months - 1)
+            scenarios.append({
+                "extra_payment": extra,
+                "start_year": start_year,
+                "start_month": start_month,
+                "months": months,
+                "payoff_year": payoff_year,
+                "payoff_month": payoff_month,
+                "total_interest": interest,
+                "interest_saved": base_interest - interest,
+                "months_saved": base_months - months,
+            })
+
+    payoff_year, payoff_month = _year_month(first + base_months - 1)
+    return {
+        "balance": balance,
+        "annual_rate": rate * 12 * 100,
+        "payment": payment,
+        "months": base_months,
+        "payoff_year": payoff_year,
+        "payoff_month": payoff_month,
+        "total_interest": base_interest,
+        "schedule": schedule,
+        "scenarios": scenarios,
+    }
@@ -0,0 +1,105 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from categorizer import Matcher, Rule
+from models.category_rule import CategoryRule
+from models.expense import Category
+from schemas.category_rule import CategoryRuleCreate
+import tenancy
+
+def get_rule(db: Session, rule_id: int) -> Optional[CategoryRule]:
+    return db.query(CategoryRule).filter(CategoryRule.id == rule_id).first()
+
+def get_rules(db: Session, category_id: Optional[int] = None) -> List[CategoryRule]:
+    query = db.query(CategoryRule)
+    if category_id is not None:
+        query = query.filter(CategoryRule.category_id == category_id)
+    return query.order_by(CategoryRule.id).all()
+
+def _category_exists(db: Session, category_id: int) -> bool:
+    return db.query(Category.id).filter(Category.id == category_id).first() is not None
+
+def create_rule(db: Session, rule: CategoryRuleCreate) -> Optional[CategoryRule]:
+    """Returns None if the category does not exist."""
+    if not _category_exists(db, rule.category_id):
+        return None
+    db_rule = CategoryRule(**rule.model_dump())
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+def update_rule(db: Session, rule_id: int, rule: CategoryRuleCreate) -> Optional[CategoryRule]:
+    """Returns None if the rule or the category does not exist."""
+    db_rule = get_rule(db, rule_id)
+    if not db_rule or not _category_exists(db, rule.category_id):
+        return None
+    for key, value in rule.model_dump().items():
+        setattr(db_rule, key, value)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+def delete_rule(db: Session, rule_id: int) -> bool:
+    db_rule = get_rule(db, rule_id)
+    if not db_rule:
+        return False
+    db.delete(db_rule)
+    db.commit()
+    return True
+
+def delete_category_rules(db: Session, category_id: int):
+    """Does not commit; called when the category itself is deleted."""
+    db.query(CategoryRule).filter(CategoryRule.category_id == category_id).delete(synchronize_session=False)
+
+# The compiled matchers are cached per process, per user and with or without
+# the category names, and rebuilt when the stamp changes. The stamp is cheap
+# to read and changes on every create, update or delete of the user's rules
+# or categories, from this process or any other. No lock is held while
+# rebuilding: with an AsyncSession the queries yield to the event loop, and a
+# request waiting on the lock there would block the loop. Concurrent rebuilds
+# just repeat work.
+_matchers: Dict[Tuple[Optional[int], bool], Tuple[Tuple, Matcher]] = {}
+
+def _stamp(db: Session) -> Tuple:
+    return tuple(db.execute(select(*(
+        select(column).scalar_subquery() for column in (
+            func.count(CategoryRule.id), func.max(CategoryRule.id), func.max(CategoryRule.updated_at),
+            func.count(Category.id), func.max(Category.id)
+        )
+    ))).one())
+
+def get_matcher(db: Session, category_names: bool = False) -> Matcher:
+    """The session user's rules compiled into a Matcher.
+
+    With ``category_names``, category names count as "contains" rules too,
+    which is how statement imports have always categorized expenses.
+    """
+    key = (tenancy.current_user_id(db), category_names)
+    stamp = _stamp(db)
+    cached = _matchers.get(key)
+    if cached is None or cached[0] != stamp:
+        rules = [
+            Rule(category_id, kind, pattern, min_amount, max_amount)
+            for category_id, kind, pattern, min_amount, max_amount in db.query(
+                CategoryRule.category_id, CategoryRule.kind, CategoryRule.pattern,
+                CategoryRule.min_amount, CategoryRule.max_amount
+            ).order_by(CategoryRule.id)
+        ]
+        if category_names:
+            rules += [
+                Rule(category_id, "contains", name)
+                for category_id, name in db.query(Category.id, Category.name).order_by(Category.id)
+                if name
+            ]
+        cached = _matchers[key] = (stamp, Matcher(rules))
+    return cached[1]
+
+def categorize(
+    db: Session,
+    expenses: List[Tuple[Optional[str], float]],
+    category_names: bool = False
+) -> List[List[int]]:
+    """Category ids for each (description, amount), from the rules (and category names, see get_matcher())."""
+    matcher = get_matcher(db, category_names)
+    return [matcher.match(description, amount) for description, amount in expenses]
@@ -1,11 +1,30 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Tuple
 from datetime import datetime
-from models.expense import Expense, Category
+from models.expense import Expense, Category, expense_category
 from schemas.expense import ExpenseCreate, CategoryCreate
+from crud import rollup
+from crud import pagination
+from crud import bulk
+from crud import sync
+from crud import budget
+from crud import search
+from crud import category_rule
+from crud import archive
 
 def get_expense(db: Session, expense_id: int) -> Optional[Expense]:
-    return db.query(Expense).filter(Expense.id == expense_id).first()
+    return db.query(Expense).options(selectinload(Expense.categories)).filter(Expense.id == expense_id).first()
+
+def get_expense_or_archived(db: Session, expense_id: int):
+    """get_expense(), falling back to the archive partitions as a plain dict"""
+    return get_expense(db, expense_id) or archive.get_row(db, "expenses", expense_id)
+
+def _get_for_write(db: Session, expense_id: int) -> Optional[Expense]:
+    """get_expense(), moving an archived expense back to the live table first"""
+    db_expense = get_expense(db, expense_id)
+    if db_expense is None and archive.restore_rows(db, "expenses", [expense_id]):
+        db_expense = get_expense(db, expense_id)
+    return db_expense
 
 def get_expenses(
     db: Session,
@@ -13,9 +32,20 @@ def get_expenses(
     limit: int = 100,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    category_ids: Optional[List[int]] = None
+    category_ids: Optional[List[int]] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[tuple] = None
 ) -> List[Expense]:
-    query = db.query(Expense)
+    """Expenses newest first; with ``columns``, plain tuples of those columns instead of models.
+
+    Tuples include archived expenses from the partitions overlapping the
+    dates; models only come from the live table.
+    """
+    if columns:
+        query = db.query(*columns)
+    else:
+        # Load categories for the whole page in one extra query instead of one per row
+        query = db.query(Expense).options(selectinload(Expense.categories))
     
     if start_date:
         query = query.filter(Expense.date >= start_date)
@@ -24,11 +54,42 @@ def get_expenses(
     if category_ids:
         query = query.filter(Expense.categories.any(Category.id.in_(category_ids)))
     
-    return query.offset(skip).limit(limit).all()
+    query = pagination.after(query, (Expense.date, Expense.id), after)
+    query = query.order_by(Expense.date.desc(), Expense.id.desc())
+    parts = archive.partitions(db, "expenses", start_date, end_date) if columns else []
+    if not parts:
+        return query.offset(skip).limit(limit).all()
+    return archive.merge_page(
+        db, parts, query.limit(skip + limit).all(), columns, skip, limit, start_date, end_date, after, category_ids
+    )
+
+ROW_COLUMNS = (Expense.amount, Expense.description, Expense.date, Expense.id)
+
+def get_expense_rows(db: Session, **kwargs) -> List[dict]:
+    """get_expenses() as plain dicts shaped like schemas.expense.Expense, for FastJSONResponse"""
+    page = get_expenses(db, columns=ROW_COLUMNS, **kwargs)
+    categories = {}
+    if page:
+        links = db.query(expense_category.c.expense_id, Category.id, Category.name, Category.description).join(
+            Category, Category.id == expense_category.c.category_id
+        ).filter(expense_category.c.expense_id.in_([row[3] for row in page])).all()
+        years = {row[2].year for row in page if row[2]}
+        parts = [part for part in archive.partitions(db, "expenses") if part.year in years]
+        if parts:
+            links += archive.category_rows(db, parts, [row[3] for row in page])
+        for expense_id, category_id, name, description in links:
+            categories.setdefault(expense_id, []).append({"name": name, "description": description, "id": category_id})
+    # category_ids is an input-only field; the schema always returns it empty
+    return [
+        {"amount": amount, "description": description, "date": date, "category_ids": [], "id": expense_id,
+         "categories": categories.get(expense_id, [])}
+        for amount, description, date, expense_id in page
+    ]
 
 def create_expense(db: Session, expense: ExpenseCreate) -> Expense:
-    # Get categories
-    categories = db.query(Category).filter(Category.id.in_(expense.category_ids)).all()
+    # Get categories; without any, the categorization rules pick them
+    category_ids = expense.category_ids or category_rule.categorize(db, [(expense.description, expense.amount)])[0]
+    categories = db.query(Category).filter(Category.id.in_(category_ids)).all()
     
     # Create expense
     db_expense = Expense(
@@ -39,6 +100,9 @@ def create_expense(db: Session, expense: ExpenseCreate) -> Expense:
     )
     
     db.add(db_expense)
+    db.flush()
+    rollup.record(db, "expenses", db_expense.date, db_expense.amount, [c.id for c in categories])
+    search.index_rows(db, "expenses", [(db_expense.id, db_expense.description)])
     db.commit()
     db.refresh(db_expense)
     return db_expense
@@ -46,12 +110,18 @@ def create_expense(db: Session, expense: ExpenseCreate) -> Expense:
 def update_expense(
     db: Session,
     expense_id: int,
-    expense: ExpenseCreate
+    expense: ExpenseCreate,
+    commit: bool = True
 ) -> Optional[Expense]:
-    db_expense = get_expense(db, expense_id)
+    db_expense = _get_for_write(db, expense_id)
     if not db_expense:
         return None
     
+    rollup.record(
+        db, "expenses", db_expense.date, db_expense.amount,
+        [c.id for c in db_expense.categories], sign=-1
+    )
+    
     # Update basic fields
     db_expense.amount = expense.amount
     db_expense.date = expense.date
@@ -60,20 +130,101 @@ def update_expense(
     # Update categories
     categories = db.query(Category).filter(Category.id.in_(expense.category_ids)).all()
     db_expense.categories = categories
+    # A change to the categories alone does not touch the expenses row
+    db_expense.updated_at = datetime.utcnow()
+    rollup.record(db, "expenses", db_expense.date, db_expense.amount, [c.id for c in categories])
+    search.index_rows(db, "expenses", [(expense_id, db_expense.description)], replace=True)
     
-    db.commit()
-    db.refresh(db_expense)
+    if commit:
+        db.commit()
+        db.refresh(db_expense)
     return db_expense
 
 def delete_expense(db: Session, expense_id: int) -> bool:
-    db_expense = get_expense(db, expense_id)
+    db_expense = _get_for_write(db, expense_id)
     if not db_expense:
         return False
     
+    rollup.record(
+        db, "expenses", db_expense.date, db_expense.amount,
+        [c.id for c in db_expense.categories], sign=-1
+    )
+    sync.record_deletes(db, Expense, [expense_id])
+    search.remove_rows(db, "expenses", [expense_id])
     db.delete(db_expense)
     db.commit()
     return True
 
+def create_expenses(
+    db: Session,
+    expenses: List[ExpenseCreate],
+    import_hashes: Optional[List[str]] = None,
+    match_category_names: bool = False,
+    commit: bool = True
+) -> List[int]:
+    """Insert the expenses in bulk and return their ids; with ``commit=False`` the caller commits."""
+    # Expenses without categories get them from the categorization rules
+    uncategorized = [i for i, expense in enumerate(expenses) if not expense.category_ids]
+    matched = dict(zip(uncategorized, category_rule.categorize(
+        db, [(expenses[i].description, expenses[i].amount) for i in uncategorized], match_category_names
+    ))) if uncategorized else {}
+    requested_ids = [matched.get(i, expense.category_ids) for i, expense in enumerate(expenses)]
+
+    requested = {category_id for ids in requested_ids for category_id in ids}
+    known = {row[0] for row in db.query(Category.id).filter(Category.id.in_(requested)).all()} if requested else set()
+    category_ids = [[c for c in set(ids) if c in known] for ids in requested_ids]
+
+    ids = bulk.insert_rows(db, Expense, [
+        {
+            "amount": expense.amount,
+            "date": expense.date,
+            "description": expense.description,
+            "import_hash": import_hashes[i] if import_hashes else None
+        }
+        for i, expense in enumerate(expenses)
+    ])
+    links = [
+        {"expense_id": expense_id, "category_id": category_id}
+        for expense_id, categories in zip(ids, category_ids)
+        for category_id in categories
+    ]
+    if links:
+        db.execute(expense_category.insert(), links)
+
+    rollup.record_many(db, "expenses", [
+        (expense.date, expense.amount, categories)
+        for expense, categories in zip(expenses, category_ids)
+    ])
+    search.index_rows(db, "expenses", zip(ids, [expense.description for expense in expenses]))
+    if commit:
+        db.commit()
+    return ids
+
+def update_expenses(db: Session, expenses: List[Tuple[int, ExpenseCreate]]) -> List[int]:
+    updated = bulk.update_rows(db, update_expense, expenses)
+    db.commit()
+    return updated
+
+def delete_expenses(db: Session, expense_ids: List[int]) -> List[int]:
+    archive.restore_rows(db, "expenses", expense_ids)
+    # The association table is not scoped to a user, so only touch links of expenses the session can see
+    expense_ids = [row[0] for row in db.query(Expense.id).filter(Expense.id.in_(expense_ids)).all()] if expense_ids else []
+    links = db.query(expense_category.c.expense_id, expense_category.c.category_id).filter(
+        expense_category.c.expense_id.in_(expense_ids)
+    ).all() if expense_ids else []
+    db.execute(expense_category.delete().where(expense_category.c.expense_id.in_(expense_ids)))
+
+    rows = bulk.delete_rows(db, Expense, expense_ids, Expense.date, Expense.amount)
+    categories = {}
+    for expense_id, category_id in links:
+        categories.setdefault(expense_id, []).append(category_id)
+    rollup.record_many(
+        db, "expenses", [(date, amount, categories.get(expense_id, [])) for expense_id, date, amount in rows], sign=-1
+    )
+    search.remove_rows(db, "expenses", [row[0] for row in rows])
+    db.commit()
+    return [row[0] for row in rows]
+
 # Category CRUD operations
 def get_category(db: Session, category_id: int) -> Optional[Category]:
     return db.query(Category).filter(Category.id == category_id).first()
@@ -93,6 +244,14 @@ def delete_category(db: Session, category_id: int) -> bool:
     if not db_category:
         return False
     
+    rollup.delete_category(db, category_id)
+    budget.delete_category_budgets(db, category_id)
+    category_rule.delete_category_rules(db, category_id)
+    # Expenses in the category lose it, so they count as changed for sync
+    db.query(Expense).filter(Expense.categories.any(Category.id == category_id)).update(
+        {Expense.updated_at: datetime.utcnow()}, synchronize_session=False
+    )
+    sync.record_deletes(db, Category, [category_id])
     db.delete(db_category)
     db.commit()
     return True 
\ No newline at end of file
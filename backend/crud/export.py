@@ -0,0 +1,76 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime
+from models.expense import Expense, Category, expense_category
+from models.income import Income
+from models.investment_and_saving import Saving, Investment
+from models.car_loan import CarLoan
+from crud import archive
+
+# Ledger name -> (model, exported columns)
+EXPORTS = {
+    "expenses": (Expense, [Expense.id, Expense.date, Expense.amount, Expense.description]),
+    "incomes": (Income, [Income.id, Income.date, Income.amount, Income.description, Income.source]),
+    "savings": (Saving, [Saving.id, Saving.date, Saving.amount, Saving.description]),
+    "investments": (Investment, [Investment.id, Investment.date, Investment.amount, Investment.description]),
+    "car_loans": (CarLoan, [
+        CarLoan.id, CarLoan.year, CarLoan.month, CarLoan.principal_balance, CarLoan.payoff_balance,
+        CarLoan.amount_paid, CarLoan.principal, CarLoan.finance, CarLoan.ending_balance, CarLoan.interest_ytd
+    ]),
+}
+
+def get_columns(ledger: str) -> List[str]:
+    columns = [column.key for column in EXPORTS[ledger][1]]
+    if ledger == "expenses":
+        columns.append("categories")
+    return columns
+
+def get_column_types(ledger: str) -> Dict[str, type]:
+    """Python type of each exported column; categories is a list of names"""
+    types = {column.key: column.type.python_type for column in EXPORTS[ledger][1]}
+    if ledger == "expenses":
+        types["categories"] = list
+    return types
+
+def _expense_categories(db: Session, expense_ids: List[int]) -> Dict[int, List[str]]:
+    rows = db.query(expense_category.c.expense_id, Category.name).join(
+        Category, Category.id == expense_category.c.category_id
+    ).filter(expense_category.c.expense_id.in_(expense_ids)).all()
+    result: Dict[int, List[str]] = {}
+    for expense_id, name in rows:
+        result.setdefault(expense_id, []).append(name)
+    return result
+
+def iter_rows(
+    db: Session,
+    ledger: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> Iterator[List[Dict]]:
+    """Yield the ledger as lists of up to ``batch_size`` row dicts, in id order.
+
+    Archived rows follow the live ones, oldest archived year first.
+
+    Rows are fetched with yield_per, which uses a server-side cursor where
+    the driver supports one, so memory is bounded by the batch size.
+    """
+    model, columns = EXPORTS[ledger]
+    stmt = select(*columns).order_by(model.id)
+    if hasattr(model, "date"):
+        if start_date:
+            stmt = stmt.where(model.date >= start_date)
+        if end_date:
+            stmt = stmt.where(model.date <= end_date)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        rows = [dict(row._mapping) for row in partition]
+        if ledger == "expenses":
+            categories = _expense_categories(db, [row["id"] for row in rows])
+            for row in rows:
+                row["categories"] = categories.get(row["id"], [])
+        yield rows
+    if ledger in archive.MODELS:
+        yield from archive.iter_rows(db, ledger, [column.key for column in columns], start_date, end_date, batch_size)
@@ -0,0 +1,17 @@
+from typing import List, Sequence, Tuple
+from datetime import datetime
+
+# Column-tuple read path for the list endpoints.
+#
+# Selecting plain columns skips building ORM objects, and the resulting
+# dicts are encoded directly by responses.FastJSONResponse instead of being
+# validated through the response schema row by row. Column lists follow the
+# field order of the matching response schema, so both paths produce the
+# same JSON.
+
+def as_dicts(columns: Sequence, rows) -> List[dict]:
+    keys = [column.key for column in columns]
+    return [dict(zip(keys, row)) for row in rows]
+
+def date_key(row: dict) -> Tuple[datetime, int]:
+    return (row["date"], row["id"])
@@ -0,0 +1,16 @@
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from models.import_job import ImportJob
+
+def create_import_job(db: Session, filename: Optional[str], format: str, total_bytes: Optional[int] = None) -> ImportJob:
+    db_job = ImportJob(filename=filename, format=format, status="pending", total_bytes=total_bytes)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_import_job(db: Session, job_id: int) -> Optional[ImportJob]:
+    return db.query(ImportJob).filter(ImportJob.id == job_id).first()
+
+def get_import_jobs(db: Session, skip: int = 0, limit: int = 100) -> List[ImportJob]:
+    return db.query(ImportJob).order_by(ImportJob.id.desc()).offset(skip).limit(limit).all()
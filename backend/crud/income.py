@@ -1,8 +1,15 @@
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from models.income import Income
 from schemas.income import IncomeCreate
+from crud import rollup
+from crud import pagination
+from crud import bulk
+from crud import sync
+from crud import fast_rows
+from crud import search
+from crud import archive
 
 def create_income(db: Session, income: IncomeCreate) -> Income:
     db_income = Income(
@@ -12,6 +19,9 @@ def create_income(db: Session, income: IncomeCreate) -> Income:
         source=income.source
     )
     db.add(db_income)
+    db.flush()
+    rollup.record(db, "incomes", db_income.date, db_income.amount)
+    search.index_rows(db, "incomes", [(db_income.id, search.document(db_income.description, db_income.source))])
     db.commit()
     db.refresh(db_income)
     return db_income
@@ -21,33 +31,104 @@ def get_incomes(
     skip: int = 0,
     limit: int = 100,
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[tuple] = None
 ) -> List[Income]:
-    query = db.query(Income)
+    """Incomes newest first; with ``columns``, plain tuples of those columns instead of models.
+
+    Tuples include archived incomes from the partitions overlapping the
+    dates; models only come from the live table.
+    """
+    query = db.query(*columns) if columns else db.query(Income)
     
     if start_date:
         query = query.filter(Income.date >= start_date)
     if end_date:
         query = query.filter(Income.date <= end_date)
     
-    return query.order_by(Income.date.desc()).offset(skip).limit(limit).all()
+    query = pagination.after(query, (Income.date, Income.id), after)
+    query = query.order_by(Income.date.desc(), Income.id.desc())
+    parts = archive.partitions(db, "incomes", start_date, end_date) if columns else []
+    if not parts:
+        return query.offset(skip).limit(limit).all()
+    return archive.merge_page(db, parts, query.limit(skip + limit).all(), columns, skip, limit, start_date, end_date, after)
+
+# Fields of schemas.income.Income, in order
+ROW_COLUMNS = (Income.amount, Income.description, Income.date, Income.source, Income.id)
+
+def get_income_rows(db: Session, **kwargs) -> List[dict]:
+    """get_incomes() as plain dicts, for FastJSONResponse"""
+    return fast_rows.as_dicts(ROW_COLUMNS, get_incomes(db, columns=ROW_COLUMNS, **kwargs))
 
 def get_income(db: Session, income_id: int) -> Optional[Income]:
     return db.query(Income).filter(Income.id == income_id).first()
 
-def update_income(db: Session, income_id: int, income: IncomeCreate) -> Optional[Income]:
+def get_income_or_archived(db: Session, income_id: int):
+    """get_income(), falling back to the archive partitions as a plain dict"""
+    return get_income(db, income_id) or archive.get_row(db, "incomes", income_id)
+
+def _get_for_write(db: Session, income_id: int) -> Optional[Income]:
+    """get_income(), moving an archived income back to the live table first"""
     db_income = get_income(db, income_id)
+    if db_income is None and archive.restore_rows(db, "incomes", [income_id]):
+        db_income = get_income(db, income_id)
+    return db_income
+
+def update_income(db: Session, income_id: int, income: IncomeCreate, commit: bool = True) -> Optional[Income]:
+    db_income = _get_for_write(db, income_id)
     if db_income:
+        rollup.record(db, "incomes", db_income.date, db_income.amount, sign=-1)
         for key, value in income.dict().items():
             setattr(db_income, key, value)
-        db.commit()
-        db.refresh(db_income)
+        rollup.record(db, "incomes", db_income.date, db_income.amount)
+        search.index_rows(
+            db, "incomes", [(income_id, search.document(db_income.description, db_income.source))], replace=True
+        )
+        if commit:
+            db.commit()
+            db.refresh(db_income)
     return db_income
 
 def delete_income(db: Session, income_id: int) -> bool:
-    db_income = get_income(db, income_id)
+    db_income = _get_for_write(db, income_id)
     if db_income:
+        rollup.record(db, "incomes", db_income.date, db_income.amount, sign=-1)
+        sync.record_deletes(db, Income, [income_id])
+        search.remove_rows(db, "incomes", [income_id])
         db.delete(db_income)
         db.commit()
         return True
-    return False 
\ No newline at end of file
+    return False
+
+def create_incomes(
+    db: Session,
+    incomes: List[IncomeCreate],
+    import_hashes: Optional[List[str]] = None,
+    commit: bool = True
+) -> List[int]:
+    """Insert the incomes in bulk and return their ids; with ``commit=False`` the caller commits."""
+    ids = bulk.insert_rows(db, Income, [
+        {**income.model_dump(), "import_hash": import_hashes[i] if import_hashes else None}
+        for i, income in enumerate(incomes)
+    ])
+    rollup.record_many(db, "incomes", [(income.date, income.amount, ()) for income in incomes])
+    search.index_rows(db, "incomes", [
+        (income_id, search.document(income.description, income.source)) for income_id, income in zip(ids, incomes)
+    ])
+    if commit:
+        db.commit()
+    return ids
+
+def update_incomes(db: Session, incomes: List[Tuple[int, IncomeCreate]]) -> List[int]:
+    updated = bulk.update_rows(db, update_income, incomes)
+    db.commit()
+    return updated
+
+def delete_incomes(db: Session, income_ids: List[int]) -> List[int]:
+    archive.restore_rows(db, "incomes", income_ids)
+    rows = bulk.delete_rows(db, Income, income_ids, Income.date, Income.amount)
+    rollup.record_many(db, "incomes", [(date, amount, ()) for _, date, amount in rows], sign=-1)
+    search.remove_rows(db, "incomes", [row[0] for row in rows])
+    db.commit()
+    return [row[0] for row in rows]
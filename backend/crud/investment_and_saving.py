@@ -1,8 +1,13 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 from models.investment_and_saving import Saving, Investment
 from schemas.investment_and_saving import SavingCreate, InvestmentCreate
+from crud import rollup
+from crud import pagination
+from crud import bulk
+from crud import sync
+from crud import fast_rows
 
 def get_saving(db: Session, saving_id: int) -> Optional[Saving]:
     return db.query(Saving).filter(Saving.id == saving_id).first()
@@ -13,19 +18,31 @@ def get_savings(
     limit: int = 100,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[tuple] = None,
 ) -> List[Saving]:
-    query = db.query(Saving)
+    """Savings newest first; with ``columns``, plain tuples of those columns instead of models."""
+    query = db.query(*columns) if columns else db.query(Saving)
     
     if start_date:
         query = query.filter(Saving.date >= start_date)
     if end_date:
         query = query.filter(Saving.date <= end_date)
     
-    return query.offset(skip).limit(limit).all()
+    query = pagination.after(query, (Saving.date, Saving.id), after)
+    return query.order_by(Saving.date.desc(), Saving.id.desc()).offset(skip).limit(limit).all()
+
+# Fields of schemas.investment_and_saving.Saving, in order
+SAVING_ROW_COLUMNS = (Saving.amount, Saving.description, Saving.date, Saving.id)
+
+def get_saving_rows(db: Session, **kwargs) -> List[dict]:
+    """get_savings() as plain dicts, for FastJSONResponse"""
+    return fast_rows.as_dicts(SAVING_ROW_COLUMNS, get_savings(db, columns=SAVING_ROW_COLUMNS, **kwargs))
 
 def create_saving(db: Session, saving: SavingCreate) -> Saving:
     db_saving = Saving(**saving.model_dump())
     db.add(db_saving)
+    rollup.record(db, "savings", db_saving.date, db_saving.amount)
     db.commit()
     db.refresh(db_saving)
     return db_saving
@@ -33,17 +50,21 @@ def create_saving(db: Session, saving: SavingCreate) -> Saving:
 def update_saving(
     db: Session,
     saving_id: int,
-    saving: SavingCreate
+    saving: SavingCreate,
+    commit: bool = True
 ) -> Optional[Saving]:
     db_saving = get_saving(db, saving_id)
     if not db_saving:
         return None
     
+    rollup.record(db, "savings", db_saving.date, db_saving.amount, sign=-1)
     for key, value in saving.model_dump(exclude_unset=True).items():
         setattr(db_saving, key, value)
+    rollup.record(db, "savings", db_saving.date, db_saving.amount)
     
-    db.commit()
-    db.refresh(db_saving)
+    if commit:
+        db.commit()
+        db.refresh(db_saving)
     return db_saving
 
 def delete_saving(db: Session, saving_id: int) -> bool:
@@ -51,10 +72,29 @@ def delete_saving(db: Session, saving_id: int) -> bool:
     if not db_saving:
         return False
     
+    rollup.record(db, "savings", db_saving.date, db_saving.amount, sign=-1)
+    sync.record_deletes(db, Saving, [saving_id])
     db.delete(db_saving)
     db.commit()
     return True
 
+def create_savings(db: Session, savings: List[SavingCreate]) -> List[int]:
+    ids = bulk.insert_rows(db, Saving, [saving.model_dump() for saving in savings])
+    rollup.record_many(db, "savings", [(saving.date, saving.amount, ()) for saving in savings])
+    db.commit()
+    return ids
+
+def update_savings(db: Session, savings: List[Tuple[int, SavingCreate]]) -> List[int]:
+    updated = bulk.update_rows(db, update_saving, savings)
+    db.commit()
+    return updated
+
+def delete_savings(db: Session, saving_ids: List[int]) -> List[int]:
+    rows = bulk.delete_rows(db, Saving, saving_ids, Saving.date, Saving.amount)
+    rollup.record_many(db, "savings", [(date, amount, ()) for _, date, amount in rows], sign=-1)
+    db.commit()
+    return [row[0] for row in rows]
+
 # Investment CRUD operations
 
 def get_investment(db: Session, investment_id: int) -> Optional[Investment]:
@@ -66,19 +106,31 @@ def get_investments(
     limit: int = 100,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    columns: Optional[tuple] = None,
 ) -> List[Investment]:
-    query = db.query(Investment)
+    """Investments newest first; with ``columns``, plain tuples of those columns instead of models."""
+    query = db.query(*columns) if columns else db.query(Investment)
     
     if start_date:
         query = query.filter(Investment.date >= start_date)
     if end_date:
         query = query.filter(Investment.date <= end_date)
     
-    return query.offset(skip).limit(limit).all()
+    query = pagination.after(query, (Investment.date, Investment.id), after)
+    return query.order_by(Investment.date.desc(), Investment.id.desc()).offset(skip).limit(limit).all()
+
+# Fields of schemas.investment_and_saving.Investment, in order
+INVESTMENT_ROW_COLUMNS = (Investment.amount, Investment.description, Investment.date, Investment.id)
+
+def get_investment_rows(db: Session, **kwargs) -> List[dict]:
+    """get_investments() as plain dicts, for FastJSONResponse"""
+    return fast_rows.as_dicts(INVESTMENT_ROW_COLUMNS, get_investments(db, columns=INVESTMENT_ROW_COLUMNS, **kwargs))
 
 def create_investment(db: Session, investment: InvestmentCreate) -> Investment:
     db_investment = Investment(**investment.model_dump())
     db.add(db_investment)
+    rollup.record(db, "investments", db_investment.date, db_investment.amount)
     db.commit()
     db.refresh(db_investment)
     return db_investment
@@ -86,17 +138,21 @@ def create_investment(db: Session, investment: InvestmentCreate) -> Investment:
 def update_investment(
     db: Session,
     investment_id: int,
-    investment: InvestmentCreate
+    investment: InvestmentCreate,
+    commit: bool = True
 ) -> Optional[Investment]:
     db_investment = get_investment(db, investment_id)
     if not db_investment:
         return None
         
+    rollup.record(db, "investments", db_investment.date, db_investment.amount, sign=-1)
     for key, value in investment.model_dump(exclude_unset=True).items():
         setattr(db_investment, key, value)
+    rollup.record(db, "investments", db_investment.date, db_investment.amount)
         
-    db.commit()
-    db.refresh(db_investment)
+    if commit:
+        db.commit()
+        db.refresh(db_investment)
     return db_investment
 
 def delete_investment(db: Session, investment_id: int) -> bool:
@@ -104,6 +160,25 @@ def delete_investment(db: Session, investment_id: int) -> bool:
     if not db_investment:
         return False
     
+    rollup.record(db, "investments", db_investment.date, db_investment.amount, sign=-1)
+    sync.record_deletes(db, Investment, [investment_id])
     db.delete(db_investment)
     db.commit()
-    return True 
\ No newline at end of file
+    return True
+
+def create_investments(db: Session, investments: List[InvestmentCreate]) -> List[int]:
+    ids = bulk.insert_rows(db, Investment, [investment.model_dump() for investment in investments])
+    rollup.record_many(db, "investments", [(investment.date, investment.amount, ()) for investment in investments])
+    db.commit()
+    return ids
+
+def update_investments(db: Session, investments: List[Tuple[int, InvestmentCreate]]) -> List[int]:
+    updated = bulk.update_rows(db, update_investment, investments)
+    db.commit()
+    return updated
+
+def delete_investments(db: Session, investment_ids: List[int]) -> List[int]:
+    rows = bulk.delete_rows(db, Investment, investment_ids, Investment.date, Investment.amount)
+    rollup.record_many(db, "investments", [(date, amount, ()) for _, date, amount in rows], sign=-1)
+    db.commit()
+    return [row[0] for row in rows]
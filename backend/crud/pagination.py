@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy import or_, tuple_
+
+# Keyset ("cursor") pagination helpers.
+#
+# List endpoints are ordered newest first by a unique sort key, e.g.
+# (date, id). A cursor is the opaque, URL-safe encoding of the sort key of
+# the last row on a page; the next page is everything strictly after it.
+
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple:
+    """Decode a cursor into a tuple, converting each value with ``types``.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        return tuple(t(v) for t, v in zip(types, payload))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def decode_date_cursor(cursor: str) -> Tuple[datetime, int]:
+    return decode_cursor(cursor, datetime.fromisoformat, int)
+
+def nullable(convert: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """``convert`` for decode_cursor(), letting None through"""
+    return lambda value: None if value is None else convert(value)
+
+def after(query, columns: Sequence, values: Optional[Tuple], nulls_last: bool = False):
+    """Restrict a query ordered by ``columns`` descending to rows after ``values``.
+
+    With ``nulls_last`` the first column may be NULL, and those rows come
+    after all others (ORDER BY ... DESC NULLS LAST).
+    """
+    if values is None:
+        return query
+    if not nulls_last:
+        return query.filter(tuple_(*columns) < tuple_(*values))
+    if values[0] is None:
+        return query.filter(columns[0].is_(None), tuple_(*columns[1:]) < tuple_(*values[1:]))
+    return query.filter(or_(tuple_(*columns) < tuple_(*values), columns[0].is_(None)))
+
+def next_cursor(items: List, limit: int, key: Callable[[Any], Tuple]) -> Optional[str]:
+    """Cursor for the page following ``items``, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(*key(items[-1]))
+
+def date_key(item) -> Tuple[datetime, int]:
+    return (item.date, item.id)
@@ -0,0 +1,186 @@
+import calendar
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from models.recurring import RecurringTransaction
+from schemas.expense import ExpenseCreate
+from schemas.income import IncomeCreate
+from schemas.recurring import RecurringTransactionCreate
+from crud import expense as crud_expense
+from crud import income as crud_income
+from crud import archive
+import tenancy
+
+# Recurring transactions are materialized into the ledgers by
+# materialize_due(), which the scheduler calls periodically. Every
+# occurrence carries an import hash derived from its rule and date, so
+# running it again (or after a crash halfway through a batch) never creates
+# duplicates. After downtime all missed occurrences of a rule are generated
+# at once and inserted with the bulk create functions. A batch is one
+# transaction: the rules stay locked (FOR UPDATE SKIP LOCKED on PostgreSQL,
+# the write lock on SQLite) until its rows and the rules' progress commit
+# together, and the unique (user_id, import_hash) indexes turn any duplicate
+# that still slips through into an error instead of a second row.
+
+# (months, days) per period
+STEPS = {
+    "daily": (0, 1),
+    "weekly": (0, 7),
+    "biweekly": (0, 14),
+    "monthly": (1, 0),
+    "quarterly": (3, 0),
+    "yearly": (12, 0),
+}
+
+def _add_months(date: datetime, months: int) -> datetime:
+    month = date.month - 1 + months
+    year = date.year + month // 12
+    month = month % 12 + 1
+    # The 31st falls on the last day of shorter months
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+def occurrence(rule, index: int) -> datetime:
+    """Date of the rule's ``index``-th occurrence, counting from 0 at start_date."""
+    months, days = STEPS[rule.frequency]
+    if months:
+        return _add_months(rule.start_date, months * rule.interval * index)
+    return rule.start_date + timedelta(days=days * rule.interval * index)
+
+def _last_index_before(rule, now: datetime) -> int:
+    """Index of the last occurrence at or before ``now`` (-1 if none), ignoring end_date and count."""
+    if now < rule.start_date:
+        return -1
+    months, days = STEPS[rule.frequency]
+    if months:
+        index = ((now.year - rule.start_date.year) * 12 + now.month - rule.start_date.month) // (months * rule.interval)
+        return index if occurrence(rule, index) <= now else index - 1
+    return (now - rule.start_date) // timedelta(days=days * rule.interval)
+
+def next_run(rule) -> Optional[datetime]:
+    """Date of the first occurrence not materialized yet; None once the rule is finished."""
+    if rule.count is not None and rule.occurrences >= rule.count:
+        return None
+    date = occurrence(rule, rule.occurrences)
+    if rule.end_date is not None and date > rule.end_date:
+        return None
+    return date
+
+def due_occurrences(rule, now: datetime, limit: int) -> List[Tuple[int, datetime]]:
+    """(index, date) of the occurrences due by ``now`` and not materialized yet, at most ``limit``."""
+    last = _last_index_before(rule, now)
+    if rule.count is not None:
+        last = min(last, rule.count - 1)
+    last = min(last, rule.occurrences + limit - 1)
+    due = []
+    for index in range(rule.occurrences, last + 1):
+        date = occurrence(rule, index)
+        if rule.end_date is not None and date > rule.end_date:
+            break
+        due.append((index, date))
+    return due
+
+def occurrence_hash(rule_id: int, date: datetime) -> str:
+    return f"recurring:{rule_id}:{date.isoformat()}"
+
+def get_recurring(db: Session, recurring_id: int) -> Optional[RecurringTransaction]:
+    return db.query(RecurringTransaction).filter(RecurringTransaction.id == recurring_id).first()
+
+def get_recurrings(db: Session, ledger: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[RecurringTransaction]:
+    query = db.query(RecurringTransaction)
+    if ledger:
+        query = query.filter(RecurringTransaction.ledger == ledger)
+    return query.order_by(RecurringTransaction.id).offset(skip).limit(limit).all()
+
+def create_recurring(db: Session, recurring: RecurringTransactionCreate) -> RecurringTransaction:
+    db_recurring = RecurringTransaction(**recurring.model_dump(), occurrences=0)
+    db_recurring.next_run = next_run(db_recurring)
+    db.add(db_recurring)
+    db.commit()
+    db.refresh(db_recurring)
+    return db_recurring
+
+def update_recurring(
+    db: Session,
+    recurring_id: int,
+    recurring: RecurringTransactionCreate
+) -> Optional[RecurringTransaction]:
+    """Occurrences already materialized are kept; the schedule continues from the next one."""
+    db_recurring = get_recurring(db, recurring_id)
+    if db_recurring:
+        for key, value in recurring.model_dump().items():
+            setattr(db_recurring, key, value)
+        db_recurring.next_run = next_run(db_recurring)
+        db.commit()
+        db.refresh(db_recurring)
+    return db_recurring
+
+def delete_recurring(db: Session, recurring_id: int) -> bool:
+    """Stops the schedule; transactions it already created stay in the ledgers."""
+    db_recurring = get_recurring(db, recurring_id)
+    if db_recurring:
+        db.delete(db_recurring)
+        db.commit()
+        return True
+    return False
+
+def materialize_due(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> dict:
+    """Create the due occurrences of active rules, at most ``batch_size`` of them.
+
+    Returns the number of expenses and incomes created, and ``more`` when
+    occurrences were left for another call.
+    """
+    now = now or datetime.utcnow()
+    rules = db.query(RecurringTransaction).filter(
+        RecurringTransaction.active.is_(True),
+        RecurringTransaction.next_run <= now
+    ).order_by(RecurringTransaction.next_run, RecurringTransaction.id).with_for_update(skip_locked=True).all()
+
+    # The scheduler's session sees every user's rules: entries are grouped by user
+    entries = {}
+    progress = []
+    budget = batch_size
+    for rule in rules:
+        if budget <= 0:
+            break
+        due = due_occurrences(rule, now, budget)
+        budget -= len(due)
+        for _, date in due:
+            if rule.ledger == "expenses":
+                entry = ExpenseCreate(
+                    amount=rule.amount, description=rule.description, date=date, category_ids=rule.category_ids or []
+                )
+            else:
+                entry = IncomeCreate(amount=rule.amount, description=rule.description, date=date, source=rule.source)
+            ledgers = entries.setdefault(rule.user_id, {"expenses": [], "incomes": []})
+            ledgers[rule.ledger].append((occurrence_hash(rule.id, date), entry))
+        if due:
+            progress.append((rule, due[-1][0] + 1))
+
+    created = {"expenses": 0, "incomes": 0}
+    session_user_id = tenancy.current_user_id(db)
+    try:
+        for user_id, ledgers in entries.items():
+            # Rows are created as the rule's owner, which also picks the owner's categorization rules
+            tenancy.scope(db, user_id if user_id is not None else session_user_id)
+            for ledger, create in (
+                ("expenses", crud_expense.create_expenses),
+                ("incomes", crud_income.create_incomes),
+            ):
+                existing = archive.import_hashes(db, ledger, [h for h, _ in ledgers[ledger]])
+                new = [(h, entry) for h, entry in ledgers[ledger] if h not in existing]
+                if new:
+                    create(db, [entry for _, entry in new], import_hashes=[h for h, _ in new], commit=False)
+                created[ledger] += len(new)
+    finally:
+        tenancy.scope(db, session_user_id)
+
+    for rule, occurrences in progress:
+        rule.occurrences = occurrences
+        rule.next_run = next_run(rule)
+    db.flush()
+    more = budget <= 0 and db.query(RecurringTransaction.id).filter(
+        RecurringTransaction.active.is_(True),
+        RecurringTransaction.next_run <= now
+    ).first() is not None
+    db.commit()
+    return {**created, "more": more}
@@ -0,0 +1,163 @@
+from sqlalchemy import delete, extract, func, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Tuple
+from datetime import datetime
+from models.expense import Expense, expense_category
+from models.income import Income
+from models.investment_and_saving import Saving, Investment
+from models.rollup import MonthlyRollup
+from crud import archive
+import tenancy
+
+# Ledger name -> model, in the order the totals are reported
+LEDGERS = {
+    "expenses": Expense,
+    "incomes": Income,
+    "savings": Saving,
+    "investments": Investment,
+}
+
+# category_id used for the ledger-wide total row
+ALL_CATEGORIES = 0
+
+# Rollup rows are written with INSERT ... ON CONFLICT DO UPDATE on their
+# unique key, so two transactions adding the first entry of a month cannot
+# both insert it, and no lookup precedes the write.
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _apply(db: Session, ledger: str, deltas: Dict[Tuple[int, int, int], list]):
+    """Add {(year, month, category_id): [amount, count]} to the ledger's rollup rows."""
+    added = [
+        {"ledger": ledger, "year": year, "month": month, "category_id": category_id, "total": amount, "entry_count": count}
+        for (year, month, category_id), (amount, count) in deltas.items() if count > 0
+    ]
+    if added:
+        statement = _INSERTS[db.get_bind().dialect.name](MonthlyRollup)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "ledger", "year", "month", "category_id"],
+            set_={
+                "total": MonthlyRollup.total + statement.excluded.total,
+                "entry_count": MonthlyRollup.entry_count + statement.excluded.entry_count,
+            }
+        ), tenancy.owned_rows(db, MonthlyRollup, added))
+
+    removed = [(key, delta) for key, delta in deltas.items() if delta[1] <= 0]
+    for (year, month, category_id), (amount, count) in removed:
+        db.execute(update(MonthlyRollup).where(
+            MonthlyRollup.ledger == ledger,
+            MonthlyRollup.year == year,
+            MonthlyRollup.month == month,
+            MonthlyRollup.category_id == category_id
+        ).values(
+            total=MonthlyRollup.total + amount, entry_count=MonthlyRollup.entry_count + count
+        ).execution_options(synchronize_session=False))
+    if removed:
+        db.execute(delete(MonthlyRollup).where(
+            MonthlyRollup.ledger == ledger, MonthlyRollup.entry_count <= 0
+        ).execution_options(synchronize_session=False))
+
+def record(
+    db: Session,
+    ledger: str,
+    date: Optional[datetime],
+    amount: float,
+    category_ids: Iterable[int] = (),
+    sign: int = 1
+):
+    """Add (sign=1) or remove (sign=-1) one entry from the rollups.
+
+    Does not commit; callers apply it in the same transaction as the ledger write.
+    """
+    if date is None or amount is None:
+        return
+    record_many(db, ledger, [(date, amount, category_ids)], sign)
+
+def record_many(
+    db: Session,
+    ledger: str,
+    entries: Iterable[Tuple[Optional[datetime], float, Iterable[int]]],
+    sign: int = 1
+):
+    """Like record() for many (date, amount, category_ids) entries.
+
+    Deltas are summed per rollup row first, so a batch touches each row once
+    and adds to all of them in one upsert.
+    """
+    deltas: Dict[Tuple[int, int, int], list] = {}
+    for date, amount, category_ids in entries:
+        if date is None or amount is None:
+            continue
+        for category_id in (ALL_CATEGORIES, *set(category_ids)):
+            delta = deltas.setdefault((date.year, date.month, category_id), [0, 0])
+            delta[0] += sign * amount
+            delta[1] += sign
+    if deltas:
+        _apply(db, ledger, deltas)
+
+def delete_category(db: Session, category_id: int):
+    db.query(MonthlyRollup).filter(MonthlyRollup.category_id == category_id).delete(synchronize_session=False)
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute every rollup row from the ledger tables and their archive partitions. Returns the number of rows written.
+
+    In a session scoped to a user only that user's rollups are rebuilt.
+    """
+    db.query(MonthlyRollup).delete(synchronize_session=False)
+
+    # Archived and live rows of the same month add up
+    sums: Dict[tuple, list] = {}
+    def add(user_id, ledger, y, m, category_id, total, count):
+        entry = sums.setdefault((user_id, ledger, int(y), int(m), category_id), [0, 0])
+        entry[0] += total or 0
+        entry[1] += count
+
+    for ledger, model in LEDGERS.items():
+        year = extract('year', model.date)
+        month = extract('month', model.date)
+        query = db.query(
+            model.user_id, year, month, func.sum(model.amount), func.count(model.id)
+        ).filter(model.date.isnot(None))
+        for user_id, y, m, total, count in query.group_by(model.user_id, year, month).all():
+            add(user_id, ledger, y, m, ALL_CATEGORIES, total, count)
+        for part in archive.partitions(db, ledger):
+            for user_id, y, m, total, count in archive.grouped_totals(db, part, by_user=True):
+                add(user_id, ledger, y, m, ALL_CATEGORIES, total, count)
+
+    year = extract('year', Expense.date)
+    month = extract('month', Expense.date)
+    query = db.query(
+        Expense.user_id, year, month, expense_category.c.category_id, func.sum(Expense.amount), func.count(Expense.id)
+    ).join(
+        expense_category, expense_category.c.expense_id == Expense.id
+    ).filter(Expense.date.isnot(None), expense_category.c.category_id.isnot(None))
+    for user_id, y, m, category_id, total, count in query.group_by(
+        Expense.user_id, year, month, expense_category.c.category_id
+    ).all():
+        add(user_id, "expenses", y, m, category_id, total, count)
+    for part in archive.partitions(db, "expenses"):
+        for user_id, y, m, category_id, total, count in archive.grouped_totals(db, part, by_category=True, by_user=True):
+            add(user_id, "expenses", y, m, category_id, total, count)
+
+    rows = [
+        {"user_id": user_id, "ledger": ledger, "year": y, "month": m, "category_id": category_id,
+         "total": total, "entry_count": count}
+        for (user_id, ledger, y, m, category_id), (total, count) in sums.items()
+    ]
+    if rows:
+        db.bulk_insert_mappings(MonthlyRollup, rows)
+    db.commit()
+    return len(rows)
+
+def rebuild_if_empty(db: Session) -> int:
+    """Populate the rollups for databases created before they existed."""
+    if db.query(MonthlyRollup.id).first() is not None:
+        return 0
+    return rebuild_rollups(db)
+
+def get_rollups(db: Session, ledger: Optional[str] = None) -> list:
+    query = db.query(MonthlyRollup)
+    if ledger:
+        query = query.filter(MonthlyRollup.ledger == ledger)
+    return query.order_by(MonthlyRollup.year, MonthlyRollup.month).all()
@@ -0,0 +1,172 @@
+import re
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, Text, and_, bindparam, func, literal, literal_column, null, select, union_all
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+from models.expense import Expense, Category, expense_category
+from models.income import Income
+from crud import archive
+
+# Full-text search over expense and income descriptions (and income sources).
+#
+# SQLite keeps them in an FTS5 table, PostgreSQL in a table of tsvectors
+# with a GIN index; both are called search_index and are created by
+# migration 0007. The crud functions call index_rows()/remove_rows() in the
+# same transaction as the ledger write, like the monthly rollups.
+
+# Not part of Base.metadata: the table is dialect specific and created by its migration
+fts5_index = Table(
+    "search_index", MetaData(),
+    Column("ledger", String),
+    Column("row_id", Integer),
+    Column("body", Text),
+)
+tsvector_index = Table(
+    "search_index", MetaData(),
+    Column("ledger", String),
+    Column("row_id", Integer),
+    Column("body", TSVECTOR),
+)
+
+# Text search configuration for PostgreSQL: no stemming, so prefixes of names work
+TS_CONFIG = "simple"
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def _index_table(db: Session) -> Optional[Table]:
+    return {"sqlite": fts5_index, "postgresql": tsvector_index}.get(_dialect(db))
+
+def document(*parts: Optional[str]) -> str:
+    return " ".join(part for part in parts if part)
+
+def remove_rows(db: Session, ledger: str, ids: List[int]):
+    """Drop rows from the index. Does not commit."""
+    table = _index_table(db)
+    if table is None or not ids:
+        return
+    db.execute(table.delete().where(table.c.ledger == ledger, table.c.row_id.in_(ids)))
+
+def index_rows(db: Session, ledger: str, rows: Iterable[Tuple[int, str]], replace: bool = False):
+    """Add (id, text) rows to the index, replacing their old entries if ``replace``. Does not commit."""
+    table = _index_table(db)
+    rows = list(rows)
+    if table is None or not rows:
+        return
+    if replace:
+        remove_rows(db, ledger, [row_id for row_id, _ in rows])
+    rows = [{"ledger": ledger, "row_id": row_id, "body": text} for row_id, text in rows if text]
+    if not rows:
+        return
+    if table is tsvector_index:
+        db.execute(table.insert().values(body=func.to_tsvector(TS_CONFIG, bindparam("text"))), [
+            {"ledger": row["ledger"], "row_id": row["row_id"], "text": row["body"]} for row in rows
+        ])
+    else:
+        db.execute(table.insert(), rows)
+
+def _terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+def _matches(db: Session, terms: List[str]):
+    """(ledger, row_id, score) for rows matching every term as a prefix; higher score ranks first."""
+    if _dialect(db) == "postgresql":
+        ts_query = func.to_tsquery(TS_CONFIG, " & ".join(f"{term}:*" for term in terms))
+        table = tsvector_index
+        return select(
+            table.c.ledger, table.c.row_id, func.ts_rank_cd(table.c.body, ts_query).label("score")
+        ).where(table.c.body.op("@@")(ts_query))
+
+    table = fts5_index
+    # bm25() is lower for better matches
+    return select(
+        table.c.ledger, table.c.row_id, (-func.bm25(literal_column("search_index"))).label("score")
+    ).where(literal_column("search_index").op("MATCH")(" ".join(f'"{term}"*' for term in terms)))
+
+def search(
+    db: Session,
+    query: str,
+    ledger: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category_ids: Optional[List[int]] = None,
+    skip: int = 0,
+    limit: int = 50
+) -> List[dict]:
+    """Expenses and incomes whose text matches every word of ``query`` (as a prefix), best match first.
+
+    Archived rows are searched too. Filtering by category only returns expenses.
+    """
+    terms = _terms(query)
+    if not terms or _index_table(db) is None:
+        return []
+    matches = _matches(db, terms).subquery()
+
+    branches = []
+    for name, model, source in (("expenses", Expense, null()), ("incomes", Income, Income.source)):
+        if ledger and ledger != name:
+            continue
+        if category_ids and model is not Expense:
+            continue
+        branch = select(
+            literal(name).label("ledger"), model.id, model.amount, model.date, model.description,
+            source.label("source"), matches.c.score
+        ).join(matches, and_(matches.c.ledger == name, matches.c.row_id == model.id))
+        if min_amount is not None:
+            branch = branch.where(model.amount >= min_amount)
+        if max_amount is not None:
+            branch = branch.where(model.amount <= max_amount)
+        if start_date:
+            branch = branch.where(model.date >= start_date)
+        if end_date:
+            branch = branch.where(model.date <= end_date)
+        if category_ids:
+            branch = branch.where(Expense.categories.any(Category.id.in_(category_ids)))
+        branches.append(branch)
+
+        for part in archive.partitions(db, name, start_date, end_date):
+            table = part.rows
+            branch = select(
+                literal(name).label("ledger"), table.c.id, table.c.amount, table.c.date, table.c.description,
+                (table.c.source if model is Income else null()).label("source"), matches.c.score
+            ).join(matches, and_(matches.c.ledger == name, matches.c.row_id == table.c.id))
+            if min_amount is not None:
+                branch = branch.where(table.c.amount >= min_amount)
+            if max_amount is not None:
+                branch = branch.where(table.c.amount <= max_amount)
+            if category_ids:
+                branch = branch.where(table.c.id.in_(
+                    select(part.links.c.expense_id).where(part.links.c.category_id.in_(category_ids))
+                ))
+            branches.append(archive.filter_rows(db, branch, table, start_date, end_date))
+    if not branches:
+        return []
+
+    results = union_all(*branches).subquery() if len(branches) > 1 else branches[0].subquery()
+    rows = db.execute(
+        select(results).order_by(results.c.score.desc(), results.c.date.desc(), results.c.id.desc())
+        .offset(skip).limit(limit)
+    ).mappings().all()
+
+    expense_ids = [row["id"] for row in rows if row["ledger"] == "expenses"]
+    categories = {}
+    if expense_ids:
+        links = db.query(expense_category.c.expense_id, Category.id, Category.name, Category.description).join(
+            Category, Category.id == expense_category.c.category_id
+        ).filter(expense_category.c.expense_id.in_(expense_ids)).all()
+        years = {row["date"].year for row in rows if row["ledger"] == "expenses" and row["date"]}
+        parts = [part for part in archive.partitions(db, "expenses") if part.year in years]
+        if parts:
+            links += archive.category_rows(db, parts, expense_ids)
+        for expense_id, category_id, name, description in links:
+            categories.setdefault(expense_id, []).append({"name": name, "description": description, "id": category_id})
+
+    return [
+        {**row, "categories": categories.get(row["id"], []) if row["ledger"] == "expenses" else []}
+        for row in rows
+    ]
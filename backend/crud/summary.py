@@ -0,0 +1,116 @@
+from sqlalchemy import extract, func
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from models.expense import Expense, expense_category
+from models.rollup import MonthlyRollup
+from crud.rollup import LEDGERS, ALL_CATEGORIES
+from crud import archive
+
+def _monthly_totals(
+    db: Session,
+    model,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[Tuple[int, int], float]:
+    year = extract('year', model.date)
+    month = extract('month', model.date)
+    query = db.query(year, month, func.sum(model.amount))
+
+    if start_date:
+        query = query.filter(model.date >= start_date)
+    if end_date:
+        query = query.filter(model.date <= end_date)
+
+    rows = query.group_by(year, month).all()
+    result = {(int(y), int(m)): total or 0 for y, m, total in rows}
+    for part in archive.partitions(db, model.__tablename__, start_date, end_date):
+        for y, m, total, _ in archive.grouped_totals(db, part, start_date, end_date):
+            result[(int(y), int(m))] = result.get((int(y), int(m)), 0) + total
+    return result
+
+def _monthly_category_totals(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Dict[Tuple[int, int], Dict[int, float]]:
+    year = extract('year', Expense.date)
+    month = extract('month', Expense.date)
+    query = db.query(year, month, expense_category.c.category_id, func.sum(Expense.amount)).join(
+        expense_category, expense_category.c.expense_id == Expense.id
+    )
+
+    if start_date:
+        query = query.filter(Expense.date >= start_date)
+    if end_date:
+        query = query.filter(Expense.date <= end_date)
+
+    result: Dict[Tuple[int, int], Dict[int, float]] = {}
+    for y, m, category_id, total in query.group_by(year, month, expense_category.c.category_id).all():
+        result.setdefault((int(y), int(m)), {})[category_id] = total or 0
+    for part in archive.partitions(db, "expenses", start_date, end_date):
+        for y, m, category_id, total, _ in archive.grouped_totals(db, part, start_date, end_date, by_category=True):
+            month_totals = result.setdefault((int(y), int(m)), {})
+            month_totals[category_id] = month_totals.get(category_id, 0) + total
+    return result
+
+def _rollup_totals(db: Session) -> Tuple[Dict[str, Dict[Tuple[int, int], float]], Dict[Tuple[int, int], Dict[int, float]]]:
+    totals: Dict[str, Dict[Tuple[int, int], float]] = {name: {} for name in LEDGERS}
+    category_totals: Dict[Tuple[int, int], Dict[int, float]] = {}
+    rows = db.query(
+        MonthlyRollup.ledger, MonthlyRollup.year, MonthlyRollup.month, MonthlyRollup.category_id, MonthlyRollup.total
+    ).all()
+    for ledger, y, m, category_id, total in rows:
+        if ledger not in totals:
+            continue
+        if category_id == ALL_CATEGORIES:
+            totals[ledger][(y, m)] = total
+        elif ledger == "expenses":
+            category_totals.setdefault((y, m), {})[category_id] = total
+    return totals, category_totals
+
+def get_display_month(months: List[Tuple[int, int]], now: Optional[datetime] = None) -> Tuple[int, int]:
+    """Current month if it has data, otherwise the most recent month with data.
+
+    Falls back to the previous calendar month when there is no data at all.
+    """
+    now = now or datetime.now()
+    current = (now.year, now.month)
+    if not months:
+        return (now.year - 1, 12) if now.month == 1 else (now.year, now.month - 1)
+    if current in months:
+        return current
+    return max(months)
+
+def get_monthly_summary(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> dict:
+    if start_date is None and end_date is None:
+        # Unbounded summaries are served from the materialized rollups
+        totals, category_totals = _rollup_totals(db)
+    else:
+        totals = {
+            name: _monthly_totals(db, model, start_date=start_date, end_date=end_date)
+            for name, model in LEDGERS.items()
+        }
+        category_totals = _monthly_category_totals(db, start_date=start_date, end_date=end_date)
+
+    keys = sorted(set().union(*totals.values()))
+    months = [
+        {
+            "year": y,
+            "month": m,
+            **{name: ledger.get((y, m), 0.0) for name, ledger in totals.items()},
+            "expenses_by_category": category_totals.get((y, m), {}),
+        }
+        for y, m in keys
+    ]
+
+    display_year, display_month = get_display_month(keys)
+    return {
+        "months": months,
+        "display_year": display_year,
+        "display_month": display_month,
+    }
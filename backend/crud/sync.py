@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+from models.expense import Expense, Category
+from models.income import Income
+from models.investment_and_saving import Saving, Investment
+from models.car_loan import CarLoan
+from models.sync import Tombstone
+from crud import archive
+import tenancy
+
+# Delta sync.
+#
+# Every synced row carries updated_at and every delete leaves a tombstone.
+# A sync token is the time the previous sync started; the next sync returns
+# the rows updated and the ids deleted after it. Clients apply the deletions
+# first, then upsert the rows.
+
+# Table name -> model, in the order they are returned
+SYNCED = {
+    "categories": Category,
+    "expenses": Expense,
+    "incomes": Income,
+    "savings": Saving,
+    "investments": Investment,
+    "car_loans": CarLoan,
+}
+
+# updated_at is stamped at flush time, so a transaction still in flight when
+# a sync runs commits rows older than that sync's start. Tokens are moved
+# back by this margin to pick them up next time; rows in the overlap are
+# sent twice, which upserts make harmless.
+#
+# A full sync also returns archived expenses and incomes. Archiving does not
+# change a row, so delta syncs leave them alone.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+def record_deletes(db: Session, model, ids: List[int]):
+    """Leave tombstones for deleted rows. Does not commit."""
+    if not ids:
+        return
+    now = datetime.utcnow()
+    db.execute(insert(Tombstone), tenancy.owned_rows(db, Tombstone, [
+        {"table_name": model.__tablename__, "row_id": row_id, "deleted_at": now}
+        for row_id in ids
+    ]))
+
+def get_changes(db: Session, since: Optional[datetime] = None) -> dict:
+    """Rows changed and ids deleted since ``since`` (everything if None), plus the next token time."""
+    started_at = datetime.utcnow()
+    changes = {"token_time": started_at - SYNC_OVERLAP, "deleted": {}}
+
+    for name, model in SYNCED.items():
+        query = db.query(model)
+        if model is Expense:
+            query = query.options(selectinload(Expense.categories))
+        if since is not None:
+            query = query.filter(model.updated_at > since)
+        changes[name] = query.order_by(model.id).all()
+        if since is None and name in archive.MODELS:
+            changes[name] += archive.get_rows(db, name)
+
+    if since is not None:
+        rows = db.query(Tombstone.table_name, Tombstone.row_id).filter(
+            Tombstone.deleted_at > since
+        ).distinct().all()
+        for table_name, row_id in rows:
+            changes["deleted"].setdefault(table_name, []).append(row_id)
+    return changes
@@ -0,0 +1,39 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from models.user import User
+from schemas.user import UserCreate
+import auth
+import tenancy
+
+def get_user(db: Session, user_id: int) -> Optional[User]:
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email.lower()).first()
+
+def create_user(db: Session, user: UserCreate) -> Optional[User]:
+    """Returns None if the email is taken.
+
+    The first user to register takes over the rows created before there
+    were user accounts.
+    """
+    if get_user_by_email(db, user.email):
+        return None
+    first = db.query(User.id).first() is None
+    db_user = User(email=user.email.lower(), hashed_password=auth.hash_password(user.password))
+    db.add(db_user)
+    db.flush()
+    if first:
+        for model in tenancy.owned_models():
+            db.query(model).filter(model.user_id.is_(None)).update(
+                {model.user_id: db_user.id}, synchronize_session=False
+            )
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+def authenticate(db: Session, email: str, password: str) -> Optional[User]:
+    db_user = get_user_by_email(db, email)
+    if db_user is None or not auth.verify_password(password, db_user.hashed_password):
+        return None
+    return db_user
@@ -1,22 +1,183 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
+import time
 from dotenv import load_dotenv
+import metrics
 
 load_dotenv()
 
 # Get database URL from environment variable or use SQLite as default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./finance_tracker.db")
 
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+# Serve requests from an AsyncSession (asyncpg for PostgreSQL, aiosqlite for SQLite)
+DATABASE_ASYNC = _env_bool("DATABASE_ASYNC", "false")
+
+def _async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith(("postgresql:", "postgresql+psycopg2:", "postgres:")):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# SQLite tuning, on by default for file databases
+SQLITE_PRAGMAS = _env_bool("SQLITE_PRAGMAS", "true")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative: KiB, so 64 MiB
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milliseconds
+# Route API writes through a single writer thread that group-commits them
+SQLITE_WRITE_QUEUE = _env_bool("SQLITE_WRITE_QUEUE", "false")
+
+# SQLite database holding the archived ledger years (crud/archive.py); by
+# default next to the main database file
+def _archive_path(url: str) -> str:
+    database = url.split(":///", 1)[1] if ":///" in url else ""
+    if not database or database == ":memory:":
+        return ":memory:"
+    root, ext = os.path.splitext(database)
+    return f"{root}_archive{ext or '.db'}"
+
+ARCHIVE_DATABASE = os.getenv("ARCHIVE_DATABASE", _archive_path(DATABASE_URL))
+
+# Log statements slower than this, with their parameters and route; 0 disables
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "500"))
+
+logger = logging.getLogger(__name__)
+
+def apply_sqlite_pragmas(engine):
+    """WAL journal, relaxed fsync and a larger cache on every new connection.
+
+    Also takes over transaction handling from pysqlite (emitting BEGIN
+    ourselves) so SAVEPOINTs work, which the write queue relies on, and so
+    writers can take the write lock up front (see begin_write).
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN " + conn.get_execution_options().get("sqlite_begin", "DEFERRED"))
+
+def attach_archive(engine):
+    """Attach the archive database to every new connection as the "archive" schema.
+
+    WAL commits each file on its own, so a transaction writing to both is not
+    atomic; crud/archive.py moves rows between them accordingly.
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_DATABASE,))
+        if SQLITE_PRAGMAS:
+            cursor.execute("PRAGMA archive.journal_mode=WAL")
+        cursor.close()
+
+def instrument_engine(engine):
+    """Time every statement for the request metrics and log the slow ones."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        # BEGIN IMMEDIATE waits for other writers (up to the busy timeout):
+        # that is time spent waiting for the lock, not a slow query
+        if statement.startswith("BEGIN"):
+            metrics.record_query(elapsed, False, "lock")
+            return
+        slow = SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS
+        metrics.record_query(elapsed, slow)
+        if slow:
+            timings = metrics.current()
+            route = f"{timings.method} {timings.route}" if timings else "background"
+            logger.warning(
+                "Slow query (%.0f ms) on %s: %s; parameters: %.500r",
+                elapsed * 1000, route, statement, parameters
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+def begin_write(db):
+    """Start the session's transaction as a write transaction.
+
+    In WAL mode a deferred transaction that reads before it writes fails
+    with "database is locked" (without waiting out the busy timeout) when
+    another writer committed in between. BEGIN IMMEDIATE waits for the lock
+    instead. Must be called before the session runs its first statement.
+    """
+    db.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+
+def _pool_options(url: str) -> dict:
+    """Connection pool settings, overridable through DB_POOL_* environment variables"""
+    options = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    # SQLite connections are local files; pool sizing only matters for server databases
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return options
+
 # Create SQLAlchemy engine
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    **_pool_options(DATABASE_URL)
 )
 
+if DATABASE_URL.startswith("sqlite"):
+    if SQLITE_PRAGMAS:
+        apply_sqlite_pragmas(engine)
+    attach_archive(engine)
+instrument_engine(engine)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        if SQLITE_PRAGMAS:
+            apply_sqlite_pragmas(async_engine.sync_engine)
+        attach_archive(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+
+write_queue = None
+if DATABASE_URL.startswith("sqlite") and SQLITE_WRITE_QUEUE:
+    from write_queue import WriteQueue
+
+    write_queue = WriteQueue(engine)
+
 # Create Base class
 Base = declarative_base()
 
@@ -26,4 +187,11 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session dependency for the API routes: async when DATABASE_ASYNC is set
+get_session = get_async_db if DATABASE_ASYNC else get_db
@@ -0,0 +1,40 @@
+import argparse
+import os
+from database import SessionLocal
+from crud.export import EXPORTS, get_columns, get_column_types, iter_rows
+from exporters.formats import ENCODERS, write_parquet
+import tenancy
+
+# Offline export of the ledgers for backups, one file per ledger.
+# Usage: python export_ledgers.py --format parquet --out backups/ [--ledger expenses] [--user 1]
+
+parser = argparse.ArgumentParser(description="Export ledgers to CSV, NDJSON or Parquet files")
+parser.add_argument("--format", choices=["csv", "ndjson", "parquet"], default="parquet")
+parser.add_argument("--out", default=".")
+parser.add_argument("--ledger", choices=list(EXPORTS), action="append")
+parser.add_argument("--batch-size", type=int, default=10000)
+parser.add_argument("--user", type=int, help="export only this user's rows")
+args = parser.parse_args()
+
+os.makedirs(args.out, exist_ok=True)
+
+with SessionLocal() as db:
+    tenancy.scope(db, args.user)
+    for ledger in args.ledger or EXPORTS:
+        path = os.path.join(args.out, f"{ledger}.{args.format}")
+        batches = iter_rows(db, ledger, batch_size=args.batch_size)
+        if args.format == "parquet":
+            count = write_parquet(batches, get_column_types(ledger), path)
+        else:
+            count = 0
+
+            def counted():
+                global count
+                for rows in batches:
+                    count += len(rows)
+                    yield rows
+
+            with open(path, "w", newline="") as f:
+                for chunk in ENCODERS[args.format](counted(), get_columns(ledger)):
+                    f.write(chunk)
+        print(f"{ledger}: {count} rows -> {path}")
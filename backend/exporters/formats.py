@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List
+
+# Encoders for ledger exports. Each takes the row batches produced by
+# crud.export.iter_rows and yields encoded chunks, one per batch.
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def iter_csv(batches: Iterable[List[Dict]], columns: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        for row in rows:
+            writer.writerow([
+                ";".join(row[c]) if isinstance(row[c], list) else _value(row[c])
+                for c in columns
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty ledger
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson(batches: Iterable[List[Dict]], columns: List[str]) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(
+            json.dumps({c: _value(row[c]) for c in columns}) + "\n"
+            for row in rows
+        )
+
+ENCODERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
+
+def write_parquet(batches: Iterable[List[Dict]], column_types: Dict[str, type], path: str) -> int:
+    """Write batches to a Parquet file one row group at a time. Returns the row count.
+
+    Requires pyarrow, which is not needed by the API itself.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        # Money columns (money.Cents): exact, with two decimal places
+        Decimal: pa.decimal128(18, 2),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+        list: pa.list_(pa.string()),
+    }
+    # Explicit schema, so a batch of all-NULL values does not change a column's type
+    schema = pa.schema([(name, arrow_types[t]) for name, t in column_types.items()])
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            count += len(rows)
+    return count
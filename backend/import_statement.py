@@ -0,0 +1,44 @@
+import argparse
+import os
+from database import SessionLocal, engine
+from migrate import run_migrations
+from schemas.import_job import ImportOptions
+from crud.import_job import create_import_job
+from importers.pipeline import run_import
+
+# Import a bank statement (CSV, OFX/QFX or QIF) into the expense and income ledgers.
+# Usage: python import_statement.py statement.csv [--ledger expenses] [--date-column "Posted Date"]
+
+parser = argparse.ArgumentParser(description="Import a bank statement into the finance tracker")
+parser.add_argument("path")
+parser.add_argument("--format", choices=["csv", "ofx", "qfx", "qif"])
+parser.add_argument("--ledger", choices=["auto", "expenses", "incomes"], default="auto")
+parser.add_argument("--date-column")
+parser.add_argument("--amount-column")
+parser.add_argument("--description-column")
+parser.add_argument("--date-format")
+parser.add_argument("--batch-size", type=int, default=1000)
+args = parser.parse_args()
+
+options = ImportOptions(
+    format=args.format or os.path.splitext(args.path)[1].lstrip(".").lower() or "csv",
+    ledger=args.ledger,
+    date_column=args.date_column,
+    amount_column=args.amount_column,
+    description_column=args.description_column,
+    date_format=args.date_format,
+    batch_size=args.batch_size
+)
+
+run_migrations(engine)
+
+def report(job):
+    percent = 100 * job.bytes_processed / job.total_bytes if job.total_bytes else 100
+    print(f"\r{percent:5.1f}%  {job.rows_processed} rows, {job.rows_imported} imported, "
+          f"{job.rows_skipped} duplicates, {job.rows_failed} failed", end="", flush=True)
+
+with SessionLocal() as db:
+    job = create_import_job(db, filename=os.path.basename(args.path), format=options.format)
+    job = run_import(db, job.id, args.path, options, progress=report)
+    print()
+    print(f"Import {job.status}" + (f": {job.error}" if job.error else ""))
@@ -0,0 +1,152 @@
+import csv
+import math
+import re
+from datetime import datetime
+from typing import Dict, Iterator, Optional, TextIO
+
+# Streaming statement parsers.
+#
+# Each parser reads a text stream incrementally and yields one dict per
+# transaction with "date" (datetime), "amount" (float, negative for money
+# going out), "description" (str) and, when the format has one, "fitid"
+# (the bank's transaction id). Rows that cannot be parsed are yielded as
+# {"error": "..."} so the caller can count them and carry on.
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+DATE_COLUMNS = ("date", "transaction date", "posted date", "posting date", "trans. date")
+AMOUNT_COLUMNS = ("amount", "transaction amount")
+DEBIT_COLUMNS = ("debit", "withdrawal", "withdrawals", "money out")
+CREDIT_COLUMNS = ("credit", "deposit", "deposits", "money in")
+DESCRIPTION_COLUMNS = ("description", "payee", "name", "memo", "details", "narrative")
+
+CHUNK_SIZE = 64 * 1024
+
+def parse_date(value: str, date_format: Optional[str] = None) -> datetime:
+    value = value.strip()
+    if date_format:
+        return datetime.strptime(value, date_format)
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+def parse_amount(value: str) -> float:
+    value = value.strip().replace(",", "").replace("$", "").replace(" ", "")
+    negative = value.startswith("(") and value.endswith(")")
+    amount = float(value.strip("()"))
+    # float() accepts "nan" and "inf", which are not amounts
+    if not math.isfinite(amount):
+        raise ValueError(f"Invalid amount: {value!r}")
+    return -amount if negative else amount
+
+def _find_column(headers, explicit: Optional[str], candidates) -> Optional[str]:
+    if explicit:
+        if explicit not in headers:
+            raise ValueError(f"Column {explicit!r} not found in CSV header")
+        return explicit
+    lowered = {h.strip().lower(): h for h in headers if h}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+def parse_csv(
+    stream: TextIO,
+    date_column: Optional[str] = None,
+    amount_column: Optional[str] = None,
+    description_column: Optional[str] = None,
+    date_format: Optional[str] = None
+) -> Iterator[Dict]:
+    reader = csv.DictReader(stream)
+    headers = reader.fieldnames or []
+    date_col = _find_column(headers, date_column, DATE_COLUMNS)
+    amount_col = _find_column(headers, amount_column, AMOUNT_COLUMNS)
+    debit_col = None if amount_col else _find_column(headers, None, DEBIT_COLUMNS)
+    credit_col = None if amount_col else _find_column(headers, None, CREDIT_COLUMNS)
+    description_col = _find_column(headers, description_column, DESCRIPTION_COLUMNS)
+
+    if date_col is None or not (amount_col or debit_col or credit_col):
+        raise ValueError("Could not detect date and amount columns; pass them explicitly")
+
+    for line, row in enumerate(reader, start=2):
+        try:
+            if amount_col:
+                amount = parse_amount(row[amount_col])
+            else:
+                debit = (row.get(debit_col) or "").strip() if debit_col else ""
+                credit = (row.get(credit_col) or "").strip() if credit_col else ""
+                amount = parse_amount(credit) if credit else -abs(parse_amount(debit))
+            yield {
+                "date": parse_date(row[date_col], date_format),
+                "amount": amount,
+                "description": (row.get(description_col) or "").strip() if description_col else "",
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            yield {"error": f"line {line}: {e}"}
+
+_OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+def parse_ofx(stream: TextIO) -> Iterator[Dict]:
+    """OFX 1.x (SGML) and 2.x (XML); only <STMTTRN> blocks are read."""
+    buffer = ""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buffer += chunk
+        end = 0
+        for match in _OFX_TRANSACTION.finditer(buffer):
+            end = match.end()
+            fields = {tag.upper(): value.strip() for tag, value in _OFX_FIELD.findall(match.group(1))}
+            try:
+                description = fields.get("NAME") or fields.get("PAYEE") or ""
+                memo = fields.get("MEMO")
+                if memo and memo != description:
+                    description = f"{description} {memo}".strip()
+                yield {
+                    "date": datetime.strptime(fields["DTPOSTED"][:8], "%Y%m%d"),
+                    "amount": parse_amount(fields["TRNAMT"]),
+                    "description": description,
+                    "fitid": fields.get("FITID"),
+                }
+            except (KeyError, ValueError) as e:
+                yield {"error": f"transaction {fields.get('FITID', '?')}: {e}"}
+        # Keep only a possibly incomplete trailing transaction
+        buffer = buffer[end:]
+        start = buffer.upper().find("<STMTTRN>")
+        buffer = buffer[start:] if start >= 0 else buffer[-len("<STMTTRN>"):]
+        if not chunk:
+            break
+
+def parse_qif(stream: TextIO, date_format: Optional[str] = None) -> Iterator[Dict]:
+    record: Dict[str, str] = {}
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        if line != "^":
+            record.setdefault(line[0], line[1:])
+            continue
+        try:
+            # Quicken writes two-digit years as 1/5'24
+            date = parse_date(record["D"].replace("'", "/").replace(" ", ""), date_format)
+            description = record.get("P", "")
+            if record.get("M") and record.get("M") != description:
+                description = f"{description} {record['M']}".strip()
+            yield {"date": date, "amount": parse_amount(record["T"]), "description": description}
+        except (KeyError, ValueError) as e:
+            yield {"error": f"record {record!r}: {e}"}
+        record = {}
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+    "qfx": parse_ofx,
+    "qif": parse_qif,
+}
@@ -0,0 +1,178 @@
+import functools
+import hashlib
+import io
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from database import SessionLocal, begin_write
+from cache import cache, SUMMARY
+from schemas.expense import ExpenseCreate
+from schemas.income import IncomeCreate
+from schemas.import_job import ImportOptions
+from crud import expense as crud_expense
+from crud import income as crud_income
+from crud import import_job as crud_import_job
+from crud import archive
+from importers.parsers import PARSERS
+import tenancy
+
+# Statement import pipeline.
+#
+# Rows are streamed from the parser and written in batches of
+# options.batch_size, one transaction per batch, so memory stays flat no
+# matter how large the file is. Each row gets an import hash; rows whose
+# hash already exists are skipped, which makes re-importing a statement (or
+# an overlapping one) safe.
+#
+# Every transaction starts with begin_write(), so on SQLite an import waits
+# for concurrent API writers instead of failing with "database is locked".
+
+def _batches(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+class _Hasher:
+    """Import hashes for parsed rows.
+
+    Identical transactions on the same day (two coffees) are told apart by
+    their occurrence number, counted over the whole file so that statements
+    not ordered by date get the same hashes. The counts are keyed by a
+    16-byte digest of the row, so they take about 100 bytes per distinct
+    (date, amount, description) in the file whatever the descriptions'
+    length: some 100 MB for a million distinct rows.
+    """
+
+    def __init__(self):
+        self.counts: Dict[bytes, int] = {}
+
+    def __call__(self, ledger: str, row: Dict) -> str:
+        if row.get("fitid"):
+            key = (ledger, "fitid", row["fitid"])
+        else:
+            base = (ledger, row["date"].isoformat(), f"{row['amount']:.2f}", row["description"].strip().lower())
+            digest = hashlib.blake2b("|".join(base).encode(), digest_size=16).digest()
+            occurrence = self.counts.get(digest, 0)
+            self.counts[digest] = occurrence + 1
+            key = base + (str(occurrence),)
+        return hashlib.sha1("|".join(key).encode()).hexdigest()
+
+def _import_batch(db: Session, job, batch: List[Dict], options: ImportOptions, hasher: _Hasher):
+    expenses: List[Tuple[str, ExpenseCreate]] = []
+    incomes: List[Tuple[str, IncomeCreate]] = []
+
+    for row in batch:
+        job.rows_processed += 1
+        if "error" in row:
+            job.rows_failed += 1
+            job.error = row["error"]
+            continue
+        amount = row["amount"]
+        if amount == 0:
+            job.rows_failed += 1
+            continue
+        ledger = options.ledger
+        if ledger == "auto":
+            ledger = "expenses" if amount < 0 else "incomes"
+
+        import_hash = hasher(ledger, row)
+        if ledger == "expenses":
+            # No category_ids: create_expenses applies the categorization rules
+            expenses.append((import_hash, ExpenseCreate(
+                amount=abs(amount),
+                date=row["date"],
+                description=row["description"] or None
+            )))
+        else:
+            incomes.append((import_hash, IncomeCreate(
+                amount=abs(amount),
+                date=row["date"],
+                description=row["description"] or None
+            )))
+
+    for ledger, entries, create in (
+        # Statements are also categorized by the category names found in the descriptions
+        ("expenses", expenses, functools.partial(crud_expense.create_expenses, match_category_names=True)),
+        ("incomes", incomes, crud_income.create_incomes),
+    ):
+        # Rows imported before may have been archived since
+        existing = archive.import_hashes(db, ledger, [h for h, _ in entries])
+        new: Dict[str, object] = {}
+        for import_hash, entry in entries:
+            if import_hash in existing or import_hash in new:
+                job.rows_skipped += 1
+            else:
+                new[import_hash] = entry
+        job.rows_imported += len(new)
+        if new:
+            create(db, list(new.values()), import_hashes=list(new.keys()), commit=False)
+    # Both ledgers and the job counters in one transaction
+    db.commit()
+
+def run_import(db: Session, job_id: int, path: str, options: ImportOptions, progress=None):
+    """Import the statement at ``path`` into the ledgers, updating the job as it goes.
+
+    ``progress`` is called with the job after every committed batch.
+    """
+    parser = PARSERS[options.format]
+    if options.format == "csv":
+        kwargs = {
+            "date_column": options.date_column,
+            "amount_column": options.amount_column,
+            "description_column": options.description_column,
+            "date_format": options.date_format,
+        }
+    elif options.format == "qif":
+        kwargs = {"date_format": options.date_format}
+    else:
+        kwargs = {}
+
+    try:
+        # begin_write() must start the transaction: end the one the caller may have left open
+        db.commit()
+        begin_write(db)
+        job = crud_import_job.get_import_job(db, job_id)
+        job.status = "running"
+        job.total_bytes = os.path.getsize(path)
+        db.commit()
+
+        with open(path, "rb") as raw:
+            stream = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+            hasher = _Hasher()
+            for batch in _batches(parser(stream, **kwargs), options.batch_size):
+                begin_write(db)
+                job.bytes_processed = raw.tell()
+                # Commits the rows together with the job counters
+                _import_batch(db, job, batch, options, hasher)
+                cache.invalidate(SUMMARY)
+                if progress:
+                    progress(job)
+                    # End the read transaction the callback may have started
+                    db.commit()
+        begin_write(db)
+        job.bytes_processed = job.total_bytes
+        job.status = "completed"
+    except Exception as e:
+        db.rollback()
+        begin_write(db)
+        job = crud_import_job.get_import_job(db, job_id)
+        job.status = "failed"
+        job.error = str(e)
+    job.finished_at = datetime.utcnow()
+    db.commit()
+    return job
+
+def run_import_file(job_id: int, path: str, options: ImportOptions, user_id: Optional[int] = None):
+    """Background task entry point: own session (scoped to the importing user), and the uploaded file is removed afterwards."""
+    db = SessionLocal()
+    tenancy.scope(db, user_id)
+    try:
+        run_import(db, job_id, path, options)
+    finally:
+        db.close()
+        os.remove(path)
@@ -1,34 +1,75 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, Response, UploadFile, File, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from pydantic import TypeAdapter, ValidationError
+from contextlib import asynccontextmanager
+from typing import Any, List, Literal, Optional
 from datetime import datetime
-
-from database import get_db, engine
-from models import expense as models_expense
-from models import investment_and_saving as models_ias
-from models import income as models_income
-from models import car_loan as models_car_loan
+import os
+import shutil
+import tempfile
+
+from database import get_db, engine, SessionLocal, begin_write
+from auth import create_access_token, get_current_user_id, get_user_db, get_user_session
+import tenancy
+import cache
+import metrics
+from responses import FastJSONResponse
+from migrate import run_migrations
 from schemas import expense as schemas_expense
 from schemas import investment_and_saving as schemas_ias
 from schemas import income as schemas_income
 from schemas import car_loan as schemas_car_loan
-from crud import expense as crud_expense
-from crud import investment_and_saving as crud_ias
-from crud import income as crud_income
+from schemas import summary as schemas_summary
+from schemas import bulk as schemas_bulk
+from schemas import import_job as schemas_import_job
+from schemas import sync as schemas_sync
+from schemas import budget as schemas_budget
+from schemas import search as schemas_search
+from schemas import category_rule as schemas_category_rule
+from schemas import recurring as schemas_recurring
+from schemas import user as schemas_user
 from crud import car_loan as crud_car_loan
-
-# Create database tables
-models_expense.Base.metadata.create_all(bind=engine)
-models_ias.Base.metadata.create_all(bind=engine)
-models_income.Base.metadata.create_all(bind=engine)
-models_car_loan.Base.metadata.create_all(bind=engine)
+from crud import rollup as crud_rollup
+from crud import pagination
+from crud import fast_rows
+from crud import aio
+from crud import import_job as crud_import_job
+from crud import user as crud_user
+from importers import pipeline as import_pipeline
+from crud import export as crud_export
+from exporters import formats as export_formats
+from scheduler import scheduler
+
+# Create or upgrade database tables
+run_migrations(engine)
+
+# Populate monthly rollups for databases created before they existed
+with SessionLocal() as db:
+    crud_rollup.rebuild_if_empty(db)
+
+# Serializers for the cached endpoints, matching their response_model
+_CATEGORY_LIST = TypeAdapter(List[schemas_expense.Category])
+_CAR_LOAN_SUMMARY = TypeAdapter(schemas_car_loan.CarLoanSummary)
+_MONTHLY_SUMMARY = TypeAdapter(schemas_summary.MonthlySummary)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Materializes recurring transactions in the background (RECURRING_INTERVAL=0 disables)
+    scheduler.start()
+    yield
+    scheduler.stop()
 
 app = FastAPI(
     title="Finance Tracker API",
     description="Backend API for the Finance Tracker application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+# Routes note when their endpoint returns, for the serialization timing
+app.router.route_class = metrics.TimedRoute
 
 # Configure CORS
 app.add_middleware(
@@ -37,251 +78,725 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+
+def _decode_cursor(cursor: Optional[str], decode):
+    if cursor is None:
+        return None
+    try:
+        return decode(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _rows_response(rows: List[dict], limit: int, key) -> FastJSONResponse:
+    # Rows are already shaped like the route's response_model, so they are encoded as-is
+    response = FastJSONResponse(rows)
+    # Keyset pagination: pass the header value back as ?cursor= for the next page
+    next_cursor = pagination.next_cursor(rows, limit, key)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+async def _cached_json(request: Request, db, namespace: str, key: str, adapter: TypeAdapter, load) -> Response:
+    """Serve a read endpoint through the response cache.
+
+    The ETag is a hash of the body, so a client sending it back in
+    If-None-Match gets an empty 304 until the data changes. Entries are
+    kept per user; a write invalidates the namespace for everyone.
+    """
+    key = f"{tenancy.current_user_id(db)}:{key}"
+    version = cache.cache.version(namespace)
+    body = cache.cache.get(namespace, version, key)
+    if body is None:
+        body = adapter.dump_json(adapter.validate_python(await load()))
+        cache.cache.set(namespace, version, key, body)
+
+    headers = {"ETag": cache.etag(body), "Cache-Control": "no-cache"}
+    if_none_match = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    if headers["ETag"] in if_none_match or "*" in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _validate_item(schema, item: Any, errors: list):
+    """``schema.model_validate(item)``, or None with the validation errors added to ``errors``"""
+    try:
+        return schema.model_validate(item)
+    except ValidationError as e:
+        errors += e.errors(include_url=False, include_context=False)
+        return None
+
+def _validate_items(schema, items: List[Any], with_id: bool = False) -> tuple:
+    """Validate bulk items one by one: ([(index, item)], [{"index": ..., "errors": [...]}]).
+
+    With ``with_id`` each valid item is an (id, item) pair, for bulk updates.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        item_errors = []
+        value = _validate_item(schema, item, item_errors)
+        if with_id:
+            row = _validate_item(schemas_bulk.BulkRowId, item, item_errors)
+            value = (row and row.id, value)
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            valid.append((index, value))
+    return valid, errors
+
+async def _bulk_create(items: List[Any], schema, create, db) -> dict:
+    valid, errors = _validate_items(schema, items)
+    ids = [None] * len(items)
+    if valid:
+        for (index, _), row_id in zip(valid, await create(db, [item for _, item in valid])):
+            ids[index] = row_id
+    return {"ids": ids, "errors": errors}
+
+async def _bulk_update(items: List[Any], schema, update, db) -> dict:
+    valid, errors = _validate_items(schema, items, with_id=True)
+    updated = list(dict.fromkeys(await update(db, [item for _, item in valid]))) if valid else []
+    found = set(updated)
+    not_found = [row_id for row_id in dict.fromkeys(row_id for _, (row_id, _) in valid) if row_id not in found]
+    return {"updated": updated, "not_found": not_found, "errors": errors}
+
+def _bulk_delete_result(requested: List[int], deleted: List[int]) -> dict:
+    found = set(deleted)
+    return {"deleted": deleted, "not_found": [i for i in dict.fromkeys(requested) if i not in found]}
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Finance Tracker API"}
 
+# Prometheus scrape target; holds no user data, so it needs no token
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Authentication endpoints; every other endpoint needs a bearer token from /auth/token
+@app.post("/auth/register", response_model=schemas_user.User)
+def register(user: schemas_user.UserCreate, db: Session = Depends(get_db)):
+    begin_write(db)
+    db_user = crud_user.create_user(db, user=user)
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return db_user
+
+@app.post("/auth/token", response_model=schemas_user.Token)
+def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    # OAuth2 password flow: the email goes in the username field
+    db_user = crud_user.authenticate(db, email=form.username, password=form.password)
+    if db_user is None:
+        raise HTTPException(
+            status_code=401, detail="Incorrect email or password", headers={"WWW-Authenticate": "Bearer"}
+        )
+    return {"access_token": create_access_token(db_user.id), "token_type": "bearer"}
+
+@app.get("/auth/me", response_model=schemas_user.User)
+def read_current_user(user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    db_user = crud_user.get_user(db, user_id=user_id)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
 # Expense endpoints
 @app.post("/expenses/", response_model=schemas_expense.Expense)
-def create_expense(expense: schemas_expense.ExpenseCreate, db: Session = Depends(get_db)):
-    return crud_expense.create_expense(db=db, expense=expense)
+async def create_expense(expense: schemas_expense.ExpenseCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_expense(db=db, expense=expense)
 
 @app.get("/expenses/", response_model=List[schemas_expense.Expense])
-def read_expenses(
+async def read_expenses(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     category_ids: Optional[List[int]] = None,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    expenses = crud_expense.get_expenses(
+    expenses = await aio.get_expense_rows(
         db,
         skip=skip,
         limit=limit,
         start_date=start_date,
         end_date=end_date,
-        category_ids=category_ids
+        category_ids=category_ids,
+        after=_decode_cursor(cursor, pagination.decode_date_cursor)
     )
-    return expenses
+    return _rows_response(expenses, limit, fast_rows.date_key)
 
 @app.get("/expenses/{expense_id}", response_model=schemas_expense.Expense)
-def read_expense(expense_id: int, db: Session = Depends(get_db)):
-    db_expense = crud_expense.get_expense(db, expense_id=expense_id)
+async def read_expense(expense_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_expense = await aio.get_expense(db, expense_id=expense_id)
     if db_expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
     return db_expense
 
 @app.put("/expenses/{expense_id}", response_model=schemas_expense.Expense)
-def update_expense(
+async def update_expense(
     expense_id: int,
     expense: schemas_expense.ExpenseCreate,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    db_expense = crud_expense.update_expense(db, expense_id=expense_id, expense=expense)
+    db_expense = await aio.update_expense(db, expense_id=expense_id, expense=expense)
     if db_expense is None:
         raise HTTPException(status_code=404, detail="Expense not found")
     return db_expense
 
 @app.delete("/expenses/{expense_id}")
-def delete_expense(expense_id: int, db: Session = Depends(get_db)):
-    success = crud_expense.delete_expense(db, expense_id=expense_id)
+async def delete_expense(expense_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_expense(db, expense_id=expense_id)
     if not success:
         raise HTTPException(status_code=404, detail="Expense not found")
     return {"message": "Expense deleted successfully"}
 
+@app.post("/expenses/bulk", response_model=schemas_bulk.BulkCreateResult)
+async def create_expenses_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_create(items, schemas_expense.ExpenseCreate, aio.create_expenses, db)
+
+@app.post("/expenses/bulk-update", response_model=schemas_bulk.BulkUpdateResult)
+async def update_expenses_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_update(items, schemas_expense.ExpenseCreate, aio.update_expenses, db)
+
+@app.post("/expenses/bulk-delete", response_model=schemas_bulk.BulkDeleteResult)
+async def delete_expenses_bulk(request: schemas_bulk.BulkDeleteRequest, db: aio.DbSession = Depends(get_user_session)):
+    return _bulk_delete_result(request.ids, await aio.delete_expenses(db, request.ids))
+
 # Category endpoints
 @app.post("/categories/", response_model=schemas_expense.Category)
-def create_category(category: schemas_expense.CategoryCreate, db: Session = Depends(get_db)):
-    return crud_expense.create_category(db=db, category=category)
+async def create_category(category: schemas_expense.CategoryCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_category(db=db, category=category)
 
 @app.get("/categories/", response_model=List[schemas_expense.Category])
-def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    categories = crud_expense.get_categories(db, skip=skip, limit=limit)
-    return categories
+async def read_categories(request: Request, skip: int = 0, limit: int = 100, db: aio.DbSession = Depends(get_user_session)):
+    return await _cached_json(
+        request, db, cache.CATEGORIES, f"{skip}:{limit}", _CATEGORY_LIST,
+        lambda: aio.get_categories(db, skip=skip, limit=limit)
+    )
 
 @app.delete("/categories/{category_id}")
-def delete_category(category_id: int, db: Session = Depends(get_db)):
-    success = crud_expense.delete_category(db, category_id=category_id)
+async def delete_category(category_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_category(db, category_id=category_id)
     if not success:
         raise HTTPException(status_code=404, detail="Category not found")
     return {"message": "Category deleted successfully"}
 
+# Categorization rule endpoints
+@app.post("/category-rules/", response_model=schemas_category_rule.CategoryRule)
+async def create_category_rule(rule: schemas_category_rule.CategoryRuleCreate, db: aio.DbSession = Depends(get_user_session)):
+    # New expenses without category_ids get the categories of every matching rule
+    db_rule = await aio.create_category_rule(db, rule=rule)
+    if db_rule is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return db_rule
+
+@app.get("/category-rules/", response_model=List[schemas_category_rule.CategoryRule])
+async def read_category_rules(category_id: Optional[int] = None, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.get_category_rules(db, category_id=category_id)
+
+@app.get("/category-rules/match", response_model=List[int])
+async def match_category_rules(description: str, amount: float, db: aio.DbSession = Depends(get_user_session)):
+    # The category ids a new expense with this description and amount would get
+    return (await aio.categorize(db, [(description, amount)]))[0]
+
+@app.put("/category-rules/{rule_id}", response_model=schemas_category_rule.CategoryRule)
+async def update_category_rule(
+    rule_id: int,
+    rule: schemas_category_rule.CategoryRuleCreate,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    db_rule = await aio.update_category_rule(db, rule_id=rule_id, rule=rule)
+    if db_rule is None:
+        raise HTTPException(status_code=404, detail="Category rule or category not found")
+    return db_rule
+
+@app.delete("/category-rules/{rule_id}")
+async def delete_category_rule(rule_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_category_rule(db, rule_id=rule_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Category rule not found")
+    return {"message": "Category rule deleted successfully"}
+
 # Saving endpoints
 @app.post("/savings/", response_model=schemas_ias.Saving)
-def create_saving(saving: schemas_ias.SavingCreate, db: Session = Depends(get_db)):
-    return crud_ias.create_saving(db=db, saving=saving)
+async def create_saving(saving: schemas_ias.SavingCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_saving(db=db, saving=saving)
 
 @app.get("/savings/", response_model=List[schemas_ias.Saving])
-def read_savings(
+async def read_savings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    return crud_ias.get_savings(db, skip=skip, limit=limit, start_date=start_date, end_date=end_date)
+    savings = await aio.get_saving_rows(
+        db, skip=skip, limit=limit, start_date=start_date, end_date=end_date,
+        after=_decode_cursor(cursor, pagination.decode_date_cursor)
+    )
+    return _rows_response(savings, limit, fast_rows.date_key)
 
 @app.get("/savings/{saving_id}", response_model=schemas_ias.Saving)
-def read_saving(saving_id: int, db: Session = Depends(get_db)):
-    db_saving = crud_ias.get_saving(db, saving_id=saving_id)
+async def read_saving(saving_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_saving = await aio.get_saving(db, saving_id=saving_id)
     if db_saving is None:
         raise HTTPException(status_code=404, detail="Saving entry not found")
     return db_saving
 
 @app.put("/savings/{saving_id}", response_model=schemas_ias.Saving)
-def update_saving(
+async def update_saving(
     saving_id: int,
     saving: schemas_ias.SavingCreate,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    db_saving = crud_ias.update_saving(db, saving_id=saving_id, saving=saving)
+    db_saving = await aio.update_saving(db, saving_id=saving_id, saving=saving)
     if db_saving is None:
         raise HTTPException(status_code=404, detail="Saving entry not found")
     return db_saving
 
 @app.delete("/savings/{saving_id}")
-def delete_saving(saving_id: int, db: Session = Depends(get_db)):
-    success = crud_ias.delete_saving(db, saving_id=saving_id)
+async def delete_saving(saving_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_saving(db, saving_id=saving_id)
     if not success:
         raise HTTPException(status_code=404, detail="Saving entry not found")
     return {"message": "Saving entry deleted successfully"}
 
+@app.post("/savings/bulk", response_model=schemas_bulk.BulkCreateResult)
+async def create_savings_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_create(items, schemas_ias.SavingCreate, aio.create_savings, db)
+
+@app.post("/savings/bulk-update", response_model=schemas_bulk.BulkUpdateResult)
+async def update_savings_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_update(items, schemas_ias.SavingCreate, aio.update_savings, db)
+
+@app.post("/savings/bulk-delete", response_model=schemas_bulk.BulkDeleteResult)
+async def delete_savings_bulk(request: schemas_bulk.BulkDeleteRequest, db: aio.DbSession = Depends(get_user_session)):
+    return _bulk_delete_result(request.ids, await aio.delete_savings(db, request.ids))
+
 # Investment endpoints
 @app.post("/investments/", response_model=schemas_ias.Investment)
-def create_investment(investment: schemas_ias.InvestmentCreate, db: Session = Depends(get_db)):
-    return crud_ias.create_investment(db=db, investment=investment)
+async def create_investment(investment: schemas_ias.InvestmentCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_investment(db=db, investment=investment)
 
 @app.get("/investments/", response_model=List[schemas_ias.Investment])
-def read_investments(
+async def read_investments(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    return crud_ias.get_investments(db, skip=skip, limit=limit, start_date=start_date, end_date=end_date)
+    investments = await aio.get_investment_rows(
+        db, skip=skip, limit=limit, start_date=start_date, end_date=end_date,
+        after=_decode_cursor(cursor, pagination.decode_date_cursor)
+    )
+    return _rows_response(investments, limit, fast_rows.date_key)
 
 @app.get("/investments/{investment_id}", response_model=schemas_ias.Investment)
-def read_investment(investment_id: int, db: Session = Depends(get_db)):
-    db_investment = crud_ias.get_investment(db, investment_id=investment_id)
+async def read_investment(investment_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_investment = await aio.get_investment(db, investment_id=investment_id)
     if db_investment is None:
         raise HTTPException(status_code=404, detail="Investment entry not found")
     return db_investment
 
 @app.put("/investments/{investment_id}", response_model=schemas_ias.Investment)
-def update_investment(
+async def update_investment(
     investment_id: int,
     investment: schemas_ias.InvestmentCreate,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    db_investment = crud_ias.update_investment(db, investment_id=investment_id, investment=investment)
+    db_investment = await aio.update_investment(db, investment_id=investment_id, investment=investment)
     if db_investment is None:
         raise HTTPException(status_code=404, detail="Investment entry not found")
     return db_investment
 
 @app.delete("/investments/{investment_id}")
-def delete_investment(investment_id: int, db: Session = Depends(get_db)):
-    success = crud_ias.delete_investment(db, investment_id=investment_id)
+async def delete_investment(investment_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_investment(db, investment_id=investment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Investment entry not found")
     return {"message": "Investment entry deleted successfully"}
 
+@app.post("/investments/bulk", response_model=schemas_bulk.BulkCreateResult)
+async def create_investments_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_create(items, schemas_ias.InvestmentCreate, aio.create_investments, db)
+
+@app.post("/investments/bulk-update", response_model=schemas_bulk.BulkUpdateResult)
+async def update_investments_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_update(items, schemas_ias.InvestmentCreate, aio.update_investments, db)
+
+@app.post("/investments/bulk-delete", response_model=schemas_bulk.BulkDeleteResult)
+async def delete_investments_bulk(request: schemas_bulk.BulkDeleteRequest, db: aio.DbSession = Depends(get_user_session)):
+    return _bulk_delete_result(request.ids, await aio.delete_investments(db, request.ids))
+
 # Income endpoints
 @app.post("/incomes/", response_model=schemas_income.Income)
-def create_income(income: schemas_income.IncomeCreate, db: Session = Depends(get_db)):
-    return crud_income.create_income(db=db, income=income)
+async def create_income(income: schemas_income.IncomeCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_income(db=db, income=income)
 
 @app.get("/incomes/", response_model=List[schemas_income.Income])
-def read_incomes(
+async def read_incomes(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    return crud_income.get_incomes(db, skip=skip, limit=limit, start_date=start_date, end_date=end_date)
+    incomes = await aio.get_income_rows(
+        db, skip=skip, limit=limit, start_date=start_date, end_date=end_date,
+        after=_decode_cursor(cursor, pagination.decode_date_cursor)
+    )
+    return _rows_response(incomes, limit, fast_rows.date_key)
 
 @app.get("/incomes/{income_id}", response_model=schemas_income.Income)
-def read_income(income_id: int, db: Session = Depends(get_db)):
-    db_income = crud_income.get_income(db, income_id=income_id)
+async def read_income(income_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_income = await aio.get_income(db, income_id=income_id)
     if db_income is None:
         raise HTTPException(status_code=404, detail="Income not found")
     return db_income
 
 @app.put("/incomes/{income_id}", response_model=schemas_income.Income)
-def update_income(
+async def update_income(
     income_id: int,
     income: schemas_income.IncomeCreate,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    db_income = crud_income.update_income(db, income_id=income_id, income=income)
+    db_income = await aio.update_income(db, income_id=income_id, income=income)
     if db_income is None:
         raise HTTPException(status_code=404, detail="Income not found")
     return db_income
 
 @app.delete("/incomes/{income_id}")
-def delete_income(income_id: int, db: Session = Depends(get_db)):
-    success = crud_income.delete_income(db, income_id=income_id)
+async def delete_income(income_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_income(db, income_id=income_id)
     if not success:
         raise HTTPException(status_code=404, detail="Income not found")
     return {"message": "Income deleted successfully"}
 
+@app.post("/incomes/bulk", response_model=schemas_bulk.BulkCreateResult)
+async def create_incomes_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_create(items, schemas_income.IncomeCreate, aio.create_incomes, db)
+
+@app.post("/incomes/bulk-update", response_model=schemas_bulk.BulkUpdateResult)
+async def update_incomes_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_update(items, schemas_income.IncomeCreate, aio.update_incomes, db)
+
+@app.post("/incomes/bulk-delete", response_model=schemas_bulk.BulkDeleteResult)
+async def delete_incomes_bulk(request: schemas_bulk.BulkDeleteRequest, db: aio.DbSession = Depends(get_user_session)):
+    return _bulk_delete_result(request.ids, await aio.delete_incomes(db, request.ids))
+
 # Car Loan endpoints
 @app.post("/car-loans/", response_model=schemas_car_loan.CarLoan)
-def create_car_loan(car_loan: schemas_car_loan.CarLoanCreate, db: Session = Depends(get_db)):
-    return crud_car_loan.create_car_loan(db=db, car_loan=car_loan)
+async def create_car_loan(car_loan: schemas_car_loan.CarLoanCreate, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.create_car_loan(db=db, car_loan=car_loan)
 
 @app.get("/car-loans/", response_model=List[schemas_car_loan.CarLoan])
-def read_car_loans(
+async def read_car_loans(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
+):
+    car_loans = await aio.get_car_loan_rows(
+        db, skip=skip, limit=limit, start_date=start_date, end_date=end_date,
+        after=_decode_cursor(cursor, lambda c: pagination.decode_cursor(c, pagination.nullable(int), int))
+    )
+    return _rows_response(car_loans, limit, crud_car_loan.row_sort_key)
+
+@app.get("/car-loans/projection", response_model=schemas_car_loan.CarLoanProjection)
+async def get_car_loan_projection(
+    annual_rate: Optional[float] = Query(None, ge=0),
+    payment: Optional[float] = Query(None, gt=0),
+    extra_payments: Optional[List[float]] = Query(None),
+    extra_starts: Optional[List[datetime]] = Query(None),
+    schedule: bool = True,
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    return crud_car_loan.get_car_loans(db, skip=skip, limit=limit, start_date=start_date, end_date=end_date)
+    # Payoff of the balance after the latest month; every extra payment is tried from every start month
+    try:
+        projection = await aio.get_car_loan_projection(
+            db,
+            annual_rate=annual_rate,
+            payment=payment,
+            extra_payments=extra_payments,
+            extra_starts=[(start.year, start.month) for start in extra_starts or []],
+            include_schedule=schedule
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if projection is None:
+        raise HTTPException(status_code=404, detail="Car loan entry not found")
+    return projection
 
 @app.get("/car-loans/{car_loan_id}", response_model=schemas_car_loan.CarLoan)
-def read_car_loan(car_loan_id: int, db: Session = Depends(get_db)):
-    db_car_loan = crud_car_loan.get_car_loan(db, car_loan_id=car_loan_id)
+async def read_car_loan(car_loan_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_car_loan = await aio.get_car_loan(db, car_loan_id=car_loan_id)
     if db_car_loan is None:
         raise HTTPException(status_code=404, detail="Car loan entry not found")
     return db_car_loan
 
 @app.put("/car-loans/{car_loan_id}", response_model=schemas_car_loan.CarLoan)
-def update_car_loan(
+async def update_car_loan(
     car_loan_id: int,
     car_loan: schemas_car_loan.CarLoanCreate,
-    db: Session = Depends(get_db)
+    db: aio.DbSession = Depends(get_user_session)
 ):
-    db_car_loan = crud_car_loan.update_car_loan(db, car_loan_id=car_loan_id, car_loan=car_loan)
+    db_car_loan = await aio.update_car_loan(db, car_loan_id=car_loan_id, car_loan=car_loan)
     if db_car_loan is None:
         raise HTTPException(status_code=404, detail="Car loan entry not found")
     return db_car_loan
 
 @app.delete("/car-loans/{car_loan_id}")
-def delete_car_loan(car_loan_id: int, db: Session = Depends(get_db)):
-    success = crud_car_loan.delete_car_loan(db, car_loan_id=car_loan_id)
+async def delete_car_loan(car_loan_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_car_loan(db, car_loan_id=car_loan_id)
     if not success:
         raise HTTPException(status_code=404, detail="Car loan entry not found")
     return {"message": "Car loan entry deleted successfully"}
 
-@app.get("/car-loans/stats/summary")
-def get_car_loan_summary(db: Session = Depends(get_db)):
-    latest_loan = crud_car_loan.get_latest_car_loan(db)
-    total_interest = crud_car_loan.get_total_interest_paid(db)
-    total_principal = crud_car_loan.get_total_principal_paid(db)
-    total_payments = crud_car_loan.get_total_payments(db)
-    
-    return {
-        "latest_balance": latest_loan.ending_balance if latest_loan else 0,
-        "total_interest_paid": total_interest,
-        "total_principal_paid": total_principal,
-        "total_payments": total_payments
-    }
+@app.post("/car-loans/bulk", response_model=schemas_bulk.BulkCreateResult)
+async def create_car_loans_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_create(items, schemas_car_loan.CarLoanCreate, aio.create_car_loans, db)
+
+@app.post("/car-loans/bulk-update", response_model=schemas_bulk.BulkUpdateResult)
+async def update_car_loans_bulk(items: List[Any] = Body(...), db: aio.DbSession = Depends(get_user_session)):
+    return await _bulk_update(items, schemas_car_loan.CarLoanCreate, aio.update_car_loans, db)
+
+@app.post("/car-loans/bulk-delete", response_model=schemas_bulk.BulkDeleteResult)
+async def delete_car_loans_bulk(request: schemas_bulk.BulkDeleteRequest, db: aio.DbSession = Depends(get_user_session)):
+    return _bulk_delete_result(request.ids, await aio.delete_car_loans(db, request.ids))
+
+@app.get("/car-loans/stats/summary", response_model=schemas_car_loan.CarLoanSummary)
+async def get_car_loan_summary(request: Request, db: aio.DbSession = Depends(get_user_session)):
+    return await _cached_json(request, db, cache.CAR_LOANS, "stats", _CAR_LOAN_SUMMARY, lambda: aio.get_car_loan_stats(db))
+
+# Summary endpoints
+@app.get("/summary/monthly", response_model=schemas_summary.MonthlySummary)
+async def get_monthly_summary(
+    request: Request,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    return await _cached_json(
+        request, db, cache.SUMMARY, f"{start_date}:{end_date}", _MONTHLY_SUMMARY,
+        lambda: aio.get_monthly_summary(db, start_date=start_date, end_date=end_date)
+    )
+
+# Budget endpoints
+@app.post("/budgets/", response_model=schemas_budget.Budget)
+async def set_budget(budget: schemas_budget.BudgetCreate, db: aio.DbSession = Depends(get_user_session)):
+    # One budget per category and month: posting again replaces the amount
+    db_budget = await aio.set_budget(db, budget=budget)
+    if db_budget is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return db_budget
+
+@app.get("/budgets/", response_model=List[schemas_budget.Budget])
+async def read_budgets(
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    return await aio.get_budgets(db, year=year, month=month, category_id=category_id)
+
+@app.get("/budgets/status", response_model=List[schemas_budget.BudgetStatus])
+async def get_budget_status(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    # Months from start_date to end_date; each defaults to the current month
+    now = datetime.now()
+    start = start_date or now
+    end = end_date or now
+    return await aio.get_budget_status(db, start=(start.year, start.month), end=(end.year, end.month), now=now)
+
+@app.delete("/budgets/{budget_id}")
+async def delete_budget(budget_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_budget(db, budget_id=budget_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget not found")
+    return {"message": "Budget deleted successfully"}
+
+# Recurring transaction endpoints
+@app.post("/recurring/", response_model=schemas_recurring.RecurringTransaction)
+async def create_recurring(
+    recurring: schemas_recurring.RecurringTransactionCreate,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    # Occurrences already due are created on the scheduler's next run (or POST /recurring/run)
+    return await aio.create_recurring(db, recurring=recurring)
+
+@app.get("/recurring/", response_model=List[schemas_recurring.RecurringTransaction])
+async def read_recurrings(
+    ledger: Optional[Literal["expenses", "incomes"]] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    return await aio.get_recurrings(db, ledger=ledger, skip=skip, limit=limit)
+
+@app.post("/recurring/run", response_model=schemas_recurring.RecurringRunResult)
+async def run_recurring(db: aio.DbSession = Depends(get_user_session)):
+    # Create every due occurrence now instead of waiting for the scheduler
+    totals = {"expenses": 0, "incomes": 0}
+    while True:
+        result = await aio.materialize_due(db)
+        totals["expenses"] += result["expenses"]
+        totals["incomes"] += result["incomes"]
+        if not result["more"]:
+            return totals
+
+@app.get("/recurring/{recurring_id}", response_model=schemas_recurring.RecurringTransaction)
+async def read_recurring(recurring_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_recurring = await aio.get_recurring(db, recurring_id=recurring_id)
+    if db_recurring is None:
+        raise HTTPException(status_code=404, detail="Recurring transaction not found")
+    return db_recurring
+
+@app.put("/recurring/{recurring_id}", response_model=schemas_recurring.RecurringTransaction)
+async def update_recurring(
+    recurring_id: int,
+    recurring: schemas_recurring.RecurringTransactionCreate,
+    db: aio.DbSession = Depends(get_user_session)
+):
+    db_recurring = await aio.update_recurring(db, recurring_id=recurring_id, recurring=recurring)
+    if db_recurring is None:
+        raise HTTPException(status_code=404, detail="Recurring transaction not found")
+    return db_recurring
+
+@app.delete("/recurring/{recurring_id}")
+async def delete_recurring(recurring_id: int, db: aio.DbSession = Depends(get_user_session)):
+    success = await aio.delete_recurring(db, recurring_id=recurring_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Recurring transaction not found")
+    return {"message": "Recurring transaction deleted successfully"}
+
+# Search endpoint
+@app.get("/search", response_model=List[schemas_search.SearchResult])
+async def search(
+    q: str = Query(..., min_length=1),
+    ledger: Optional[Literal["expenses", "incomes"]] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category_ids: Optional[List[int]] = Query(None),
+    skip: int = 0,
+    limit: int = Query(50, le=200),
+    db: aio.DbSession = Depends(get_user_session)
+):
+    # Every word of q must match the start of a word in the description (or income source)
+    return await aio.search(
+        db,
+        query=q,
+        ledger=ledger,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        start_date=start_date,
+        end_date=end_date,
+        category_ids=category_ids,
+        skip=skip,
+        limit=limit
+    )
+
+# Delta sync endpoint
+@app.get("/sync", response_model=schemas_sync.SyncChanges)
+async def sync_changes(since: Optional[str] = None, db: aio.DbSession = Depends(get_user_session)):
+    # Without a token everything is returned; afterwards only rows changed or deleted since then
+    try:
+        since_time = pagination.decode_cursor(since, datetime.fromisoformat)[0] if since else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    changes = await aio.get_changes(db, since=since_time)
+    changes["token"] = pagination.encode_cursor(changes.pop("token_time"))
+    return changes
+
+# Statement import endpoints
+@app.post("/imports/", response_model=schemas_import_job.ImportJob, status_code=202)
+def create_import(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    ledger: str = "auto",
+    date_column: Optional[str] = None,
+    amount_column: Optional[str] = None,
+    description_column: Optional[str] = None,
+    date_format: Optional[str] = None,
+    batch_size: int = 1000,
+    db: Session = Depends(get_user_db)
+):
+    extension = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+    try:
+        options = schemas_import_job.ImportOptions(
+            format=(format or extension or "csv").lower(),
+            ledger=ledger,
+            date_column=date_column,
+            amount_column=amount_column,
+            description_column=description_column,
+            date_format=date_format,
+            batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # Spool the upload to disk in chunks; the import runs after the response is sent
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{options.format}") as tmp:
+        shutil.copyfileobj(file.file, tmp, 1024 * 1024)
+    job = crud_import_job.create_import_job(
+        db, filename=file.filename, format=options.format, total_bytes=os.path.getsize(tmp.name)
+    )
+    background_tasks.add_task(
+        import_pipeline.run_import_file, job.id, tmp.name, options, tenancy.current_user_id(db)
+    )
+    return job
+
+@app.get("/imports/", response_model=List[schemas_import_job.ImportJob])
+async def read_imports(skip: int = 0, limit: int = 100, db: aio.DbSession = Depends(get_user_session)):
+    return await aio.get_import_jobs(db, skip=skip, limit=limit)
+
+@app.get("/imports/{job_id}", response_model=schemas_import_job.ImportJob)
+async def read_import(job_id: int, db: aio.DbSession = Depends(get_user_session)):
+    db_job = await aio.get_import_job(db, job_id=job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return db_job
+
+# Export endpoints
+@app.get("/export/{ledger}")
+def export_ledger(
+    ledger: str,
+    format: str = "csv",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    if ledger not in crud_export.EXPORTS:
+        raise HTTPException(status_code=404, detail="Ledger not found")
+    if format not in export_formats.ENCODERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+    def stream():
+        # The response outlives the request's dependencies, so use a dedicated session
+        db = SessionLocal()
+        tenancy.scope(db, user_id)
+        try:
+            batches = crud_export.iter_rows(db, ledger, start_date=start_date, end_date=end_date)
+            yield from export_formats.ENCODERS[format](batches, crud_export.get_columns(ledger))
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=export_formats.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{ledger}.{format}"'}
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,218 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from fastapi.routing import APIRoute
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-request performance instrumentation.
+#
+# MetricsMiddleware starts a RequestTimings for every HTTP request and keeps
+# it in a context variable, which follows the request into the threadpool,
+# AsyncSession.run_sync and (via crud.aio) the write queue. Time is split by
+# phase:
+#
+#   db         SQL execution, from the engine hooks in database.py
+#   lock       waiting in BEGIN for the database's write lock (SQLite)
+#   orm        the rest of the CRUD call: ORM hydration, schema conversion
+#   serialize  response validation and JSON encoding
+#   app        everything else (routing, request parsing, dependencies)
+#
+# The split is sent back in a Server-Timing header and aggregated per route
+# into the Prometheus metrics served at /metrics. Metrics are kept per
+# process; with several workers each one reports its own.
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+# Histogram buckets in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("db", "lock", "orm", "serialize")
+
+class RequestTimings:
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.slow_queries = 0
+        self.returned: Optional[float] = None  # when the endpoint function returned
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, so metrics are not split per id."""
+        route = self.scope.get("route")
+        return getattr(route, "path", "unmatched")
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def current() -> Optional[RequestTimings]:
+    return _current.get()
+
+def record_query(elapsed: float, slow: bool, phase: str = "db"):
+    timings = _current.get()
+    if timings is not None:
+        timings.phases[phase] += elapsed
+        timings.queries += 1
+        timings.slow_queries += slow
+
+@contextmanager
+def phase(name: str):
+    """Add the time spent in the block to ``name``, minus any SQL run (or lock waited for) inside it."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started, db_before = time.perf_counter(), timings.phases["db"] + timings.phases["lock"]
+    try:
+        yield
+    finally:
+        db_time = timings.phases["db"] + timings.phases["lock"] - db_before
+        elapsed = time.perf_counter() - started - db_time
+        timings.phases[name] += max(elapsed, 0.0)
+
+def _mark_returned():
+    timings = _current.get()
+    if timings is not None:
+        timings.returned = time.perf_counter()
+
+def _timed_endpoint(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_returned()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _mark_returned()
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """Route class that notes when the endpoint returns; what follows is response serialization."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{{{_labels(self.labels, labels)}}} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._values: Dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: tuple, value: float):
+        series = self._values.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._values.items()):
+            label_text = _labels(self.labels, labels)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {series[-1]}")
+        return lines
+
+def _labels(names: tuple, values: tuple) -> str:
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+_lock = threading.Lock()
+requests_total = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+request_duration = Histogram("http_request_duration_seconds", "Request duration.", ("method", "route"))
+phase_duration = Histogram("http_request_phase_seconds", "Request time by phase.", ("method", "route", "phase"))
+queries_total = Counter("db_queries_total", "SQL statements executed for requests.", ("method", "route"))
+slow_queries_total = Counter("db_slow_queries_total", "SQL statements over SLOW_QUERY_MS.", ("method", "route"))
+
+def _observe(timings: RequestTimings, status: int, total: float):
+    key = (timings.method, timings.route)
+    with _lock:
+        requests_total.inc((*key, str(status)))
+        request_duration.observe(key, total)
+        for name, value in timings.phases.items():
+            phase_duration.observe((*key, name), value)
+        queries_total.inc(key, timings.queries)
+        if timings.slow_queries:
+            slow_queries_total.inc(key, timings.slow_queries)
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        lines = []
+        for metric in (requests_total, request_duration, phase_duration, queries_total, slow_queries_total):
+            lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+def _server_timing(timings: RequestTimings, now: float) -> bytes:
+    if timings.returned is not None:
+        timings.phases["serialize"] += now - timings.returned
+    total = now - timings.started
+    app = max(total - sum(timings.phases.values()), 0.0)
+    parts = [f'db;dur={timings.phases["db"] * 1000:.2f};desc="{timings.queries} queries"']
+    parts += [f"{name};dur={timings.phases[name] * 1000:.2f}" for name in ("lock", "orm", "serialize")]
+    parts += [f"app;dur={app * 1000:.2f}", f"total;dur={total * 1000:.2f}"]
+    return ", ".join(parts).encode()
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request (see the module comment)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+        status = 500
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    header = _server_timing(timings, time.perf_counter())
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _current.reset(token)
+            # Streamed bodies are included in the duration, not in the header
+            _observe(timings, status, time.perf_counter() - timings.started)
@@ -0,0 +1,66 @@
+import importlib
+import os
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Versioned schema migrations.
+#
+# Each file in migrations/ is named NNNN_description.py and defines
+# upgrade(conn). Applied versions are recorded in schema_migrations and every
+# pending migration runs in its own transaction, in version order.
+#
+# 0001 creates tables from the current models, so on a fresh database later
+# migrations may find their changes already present: write them to be
+# idempotent (CREATE INDEX IF NOT EXISTS, add_column, ...).
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def _discover():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if filename.endswith(".py") and filename[:4].isdigit():
+            module = importlib.import_module(f"migrations.{filename[:-3]}")
+            migrations.append((int(filename[:4]), module))
+    return migrations
+
+def has_column(conn: Connection, table: str, column: str, schema: Optional[str] = None) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table, schema=schema))
+
+def add_column(conn: Connection, table: str, column: str, ddl_type: str, schema: Optional[str] = None):
+    if not has_column(conn, table, column, schema):
+        name = f"{schema}.{table}" if schema else table
+        conn.execute(text(f"ALTER TABLE {name} ADD COLUMN {column} {ddl_type}"))
+
+def run_migrations(engine: Engine) -> list:
+    """Apply pending migrations and return the versions that were applied."""
+    with engine.begin() as conn:
+        schema_migrations.create(bind=conn, checkfirst=True)
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, module in _discover():
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+        newly_applied.append(version)
+    return newly_applied
+
+if __name__ == "__main__":
+    from database import engine
+
+    versions = run_migrations(engine)
+    if versions:
+        print(f"Applied migrations: {', '.join(f'{v:04d}' for v in versions)}")
+    else:
+        print("Database is up to date")
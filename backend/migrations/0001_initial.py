@@ -0,0 +1,7 @@
+"""Initial schema: the tables previously created with create_all at startup."""
+from database import Base
+from models import car_loan, expense, income, investment_and_saving, rollup, import_job, sync, budget, category_rule, recurring, user, archive
+
+def upgrade(conn):
+    Base.metadata.create_all(bind=conn)
+    car_loan.Base.metadata.create_all(bind=conn)
@@ -0,0 +1,44 @@
+"""Indexes for date-range queries, the expense/category association and car loan ordering."""
+from sqlalchemy import inspect, text
+from migrate import add_column
+
+MONTH_NUMBER = " ".join(
+    f"WHEN '{name}' THEN {number}"
+    for number, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+         'August', 'September', 'October', 'November', 'December'],
+        start=1
+    )
+)
+
+def upgrade(conn):
+    for table in ("expenses", "incomes", "savings", "investments"):
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_date ON {table} (date)"))
+
+    # expense_category was created without a primary key: rebuild it with a
+    # composite (expense_id, category_id) key, dropping duplicate links
+    if not inspect(conn).get_pk_constraint("expense_category")["constrained_columns"]:
+        conn.execute(text(
+            "CREATE TABLE expense_category_new ("
+            "expense_id INTEGER NOT NULL REFERENCES expenses (id), "
+            "category_id INTEGER NOT NULL REFERENCES categories (id), "
+            "PRIMARY KEY (expense_id, category_id))"
+        ))
+        conn.execute(text(
+            "INSERT INTO expense_category_new (expense_id, category_id) "
+            "SELECT DISTINCT expense_id, category_id FROM expense_category "
+            "WHERE expense_id IS NOT NULL AND category_id IS NOT NULL"
+        ))
+        conn.execute(text("DROP TABLE expense_category"))
+        conn.execute(text("ALTER TABLE expense_category_new RENAME TO expense_category"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_expense_category_category_id ON expense_category (category_id, expense_id)"
+    ))
+
+    add_column(conn, "car_loans", "month_number", "INTEGER")
+    conn.execute(text(
+        f"UPDATE car_loans SET month_number = CASE month {MONTH_NUMBER} END WHERE month_number IS NULL"
+    ))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_car_loans_year_month_number ON car_loans (year, month_number)"
+    ))
@@ -0,0 +1,11 @@
+"""Sortable integer period for car loans, replacing CASE ordering on month names."""
+from sqlalchemy import text
+from migrate import add_column
+
+def upgrade(conn):
+    add_column(conn, "car_loans", "period", "INTEGER")
+    conn.execute(text(
+        "UPDATE car_loans SET period = year * 12 + month_number - 1 "
+        "WHERE period IS NULL AND month_number IS NOT NULL"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_car_loans_period ON car_loans (period)"))
@@ -0,0 +1,10 @@
+"""Statement import jobs and import hashes used to skip already-imported transactions."""
+from sqlalchemy import text
+from migrate import add_column
+from models.import_job import ImportJob
+
+def upgrade(conn):
+    ImportJob.__table__.create(bind=conn, checkfirst=True)
+    for table in ("expenses", "incomes"):
+        add_column(conn, table, "import_hash", "VARCHAR")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_import_hash ON {table} (import_hash)"))
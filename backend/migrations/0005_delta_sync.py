@@ -0,0 +1,15 @@
+"""updated_at on the synced tables and tombstones for deleted rows, for GET /sync."""
+from datetime import datetime
+from sqlalchemy import text
+from migrate import add_column
+from models.sync import Tombstone
+
+TABLES = ("categories", "expenses", "incomes", "savings", "investments", "car_loans")
+
+def upgrade(conn):
+    Tombstone.__table__.create(bind=conn, checkfirst=True)
+    now = datetime.utcnow()
+    for table in TABLES:
+        add_column(conn, table, "updated_at", "TIMESTAMP")
+        conn.execute(text(f"UPDATE {table} SET updated_at = :now WHERE updated_at IS NULL"), {"now": now})
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)"))
@@ -0,0 +1,5 @@
+"""Monthly budgets per category."""
+from models.budget import Budget
+
+def upgrade(conn):
+    Budget.__table__.create(bind=conn, checkfirst=True)
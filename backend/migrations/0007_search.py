@@ -0,0 +1,32 @@
+"""Full-text search index over expense and income descriptions, for GET /search."""
+from sqlalchemy import inspect, text
+from crud import search
+
+def upgrade(conn):
+    dialect = conn.dialect.name
+    if dialect not in ("sqlite", "postgresql") or inspect(conn).has_table("search_index"):
+        return
+    if dialect == "sqlite":
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "ledger UNINDEXED, row_id UNINDEXED, body, "
+            "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        ))
+        body = "{text}"
+    else:
+        conn.execute(text("CREATE TABLE search_index (ledger VARCHAR NOT NULL, row_id INTEGER NOT NULL, body TSVECTOR)"))
+        conn.execute(text("CREATE INDEX ix_search_index_body ON search_index USING GIN (body)"))
+        conn.execute(text("CREATE INDEX ix_search_index_ledger_row_id ON search_index (ledger, row_id)"))
+        body = f"to_tsvector('{search.TS_CONFIG}', {{text}})"
+
+    # Backfill the existing rows
+    conn.execute(text(
+        "INSERT INTO search_index (ledger, row_id, body) "
+        f"SELECT 'expenses', id, {body.format(text='description')} FROM expenses WHERE description IS NOT NULL"
+    ))
+    income_text = "TRIM(COALESCE(description, '') || ' ' || COALESCE(source, ''))"
+    conn.execute(text(
+        "INSERT INTO search_index (ledger, row_id, body) "
+        f"SELECT 'incomes', id, {body.format(text=income_text)} FROM incomes "
+        "WHERE description IS NOT NULL OR source IS NOT NULL"
+    ))
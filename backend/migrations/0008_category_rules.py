@@ -0,0 +1,5 @@
+"""Auto-categorization rules for new expenses."""
+from models.category_rule import CategoryRule
+
+def upgrade(conn):
+    CategoryRule.__table__.create(bind=conn, checkfirst=True)
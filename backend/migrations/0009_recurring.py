@@ -0,0 +1,5 @@
+"""Recurring transactions, materialized into the ledgers by the scheduler."""
+from models.recurring import RecurringTransaction
+
+def upgrade(conn):
+    RecurringTransaction.__table__.create(bind=conn, checkfirst=True)
@@ -0,0 +1,42 @@
+"""User accounts, and a user_id on every table holding a user's data."""
+from sqlalchemy import inspect, text
+from migrate import add_column
+from models.user import User
+from models.rollup import MonthlyRollup
+
+# Tables with a (user_id, <column>) index for per-user range queries
+RANGE_INDEXES = {
+    "expenses": "date",
+    "incomes": "date",
+    "savings": "date",
+    "investments": "date",
+    "car_loans": "period",
+}
+OTHER_TABLES = ("categories", "budgets", "category_rules", "recurring_transactions", "import_jobs", "sync_tombstones")
+
+def upgrade(conn):
+    User.__table__.create(bind=conn, checkfirst=True)
+
+    for table, column in RANGE_INDEXES.items():
+        # car_loans has its own metadata without users, so no foreign key there either
+        add_column(conn, table, "user_id", "INTEGER" if table == "car_loans" else "INTEGER REFERENCES users (id)")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id_{column} ON {table} (user_id, {column})"))
+    for table in OTHER_TABLES:
+        add_column(conn, table, "user_id", "INTEGER REFERENCES users (id)")
+        if table != "categories":
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_user_id ON {table} (user_id)"))
+
+    # Category names were unique across the database; now they are per user
+    name_index = next((i for i in inspect(conn).get_indexes("categories") if i["column_names"] == ["name"]), None)
+    if name_index is not None and name_index["unique"]:
+        conn.execute(text(f"DROP INDEX {name_index['name']}"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_categories_name ON categories (name)"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_categories_user_id_name ON categories (user_id, name)"
+    ))
+
+    # The rollup key gains user_id. Rollups are derived data: recreate the
+    # table and let rebuild_if_empty() repopulate it at startup.
+    if not any(c["name"] == "user_id" for c in inspect(conn).get_columns("monthly_rollups")):
+        MonthlyRollup.__table__.drop(bind=conn)
+        MonthlyRollup.__table__.create(bind=conn)
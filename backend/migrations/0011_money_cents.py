@@ -0,0 +1,66 @@
+"""Money columns as integer cents instead of floats (see money.py)."""
+import re
+from sqlalchemy import Numeric, inspect, text
+
+MONEY_COLUMNS = {
+    "expenses": ("amount",),
+    "incomes": ("amount",),
+    "savings": ("amount",),
+    "investments": ("amount",),
+    "budgets": ("amount",),
+    "recurring_transactions": ("amount",),
+    "category_rules": ("min_amount", "max_amount"),
+    "monthly_rollups": ("total",),
+    "car_loans": (
+        "principal_balance", "payoff_balance", "amount_paid", "principal", "finance", "ending_balance", "interest_ytd"
+    ),
+}
+
+def _cents(column: str) -> str:
+    return f'CAST(ROUND("{column}" * 100) AS BIGINT)'
+
+def _rebuild_sqlite(conn, table: str, money: tuple, columns: list):
+    """SQLite cannot change a column's type: copy into a new table and swap it in.
+
+    The new table's DDL is the old one with BIGINT for the money columns, so
+    constraints are kept; the old table's indexes are recreated afterwards.
+    """
+    create_sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+    ).scalar()
+    index_sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+        {"name": table}
+    ).scalars().all()
+
+    create_sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_new", create_sql, count=1)
+    for column in money:
+        create_sql = re.sub(
+            rf'((?:^|[(,])\s*"?{column}"?\s+)\w+(?:\s*\([^)]*\))?', r"\1BIGINT", create_sql, count=1, flags=re.M
+        )
+    conn.execute(text(create_sql))
+
+    names = ", ".join(f'"{column}"' for column in columns)
+    values = ", ".join(_cents(column) if column in money else f'"{column}"' for column in columns)
+    conn.execute(text(f"INSERT INTO {table}_new ({names}) SELECT {values} FROM {table}"))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
+    for sql in index_sql:
+        conn.execute(text(sql))
+
+def upgrade(conn):
+    for table, money in MONEY_COLUMNS.items():
+        columns = inspect(conn).get_columns(table)
+        if not any(c["name"] in money and isinstance(c["type"], Numeric) for c in columns):
+            continue  # already cents (created from the current models)
+        if conn.dialect.name == "sqlite":
+            _rebuild_sqlite(conn, table, money, [c["name"] for c in columns])
+        else:
+            for column in money:
+                conn.execute(text(
+                    f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE BIGINT USING {_cents(column)}'
+                ))
+        if table == "monthly_rollups":
+            # Rounded float totals can be off from the sum of the rounded
+            # amounts: let rebuild_if_empty() recompute them at startup
+            conn.execute(text("DELETE FROM monthly_rollups"))
@@ -0,0 +1,10 @@
+"""Registry of archived ledger years and, on PostgreSQL, the partitioned archive tables (see crud/archive.py)."""
+from models.archive import ArchivedYear
+from crud import archive
+
+def upgrade(conn):
+    ArchivedYear.__table__.create(bind=conn, checkfirst=True)
+    # SQLite partitions are created in the attached archive database when a year is archived
+    if conn.dialect.name == "postgresql":
+        for table in archive.parent_tables():
+            table.create(bind=conn, checkfirst=True)
@@ -0,0 +1,44 @@
+"""AUTOINCREMENT ids for expenses and incomes on SQLite, so ids of archived rows are never reused."""
+import re
+from sqlalchemy import func, select, text
+from crud import archive
+
+def _rebuild(conn, table: str):
+    """Recreate the table from its own DDL with an AUTOINCREMENT primary key, like migration 0011."""
+    create_sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+    ).scalar()
+    if "AUTOINCREMENT" in create_sql.upper():
+        return False  # created from the current models
+    index_sql = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"),
+        {"name": table}
+    ).scalars().all()
+
+    create_sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_new", create_sql, count=1)
+    create_sql = re.sub(r',\s*PRIMARY KEY\s*\(\s*"?id"?\s*\)', "", create_sql, count=1)
+    create_sql = re.sub(
+        r'((?:^|[(,])\s*"?id"?\s+INTEGER)(\s+NOT NULL)?', r"\1 NOT NULL PRIMARY KEY AUTOINCREMENT",
+        create_sql, count=1, flags=re.M
+    )
+    conn.execute(text(create_sql))
+    conn.execute(text(f"INSERT INTO {table}_new SELECT * FROM {table}"))
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
+    for sql in index_sql:
+        conn.execute(text(sql))
+    return True
+
+def upgrade(conn):
+    if conn.dialect.name != "sqlite":
+        return  # PostgreSQL sequences never hand out an id twice
+    for ledger, model in archive.MODELS.items():
+        if not _rebuild(conn, ledger):
+            continue
+        # Start after the highest id ever used, including ids that only live on in the archive
+        highest = conn.execute(select(func.max(model.id))).scalar() or 0
+        for (year,) in conn.execute(text("SELECT year FROM archived_years WHERE ledger = :ledger"), {"ledger": ledger}):
+            archived = conn.execute(text(f"SELECT MAX(id) FROM {archive.SCHEMA}.{ledger}_archive_{year}")).scalar()
+            highest = max(highest, archived or 0)
+        conn.execute(text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": ledger})
+        conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"), {"name": ledger, "seq": highest})
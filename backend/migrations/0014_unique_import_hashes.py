@@ -0,0 +1,14 @@
+"""Unique (user_id, import_hash) indexes on expenses and incomes."""
+from sqlalchemy import text
+
+def upgrade(conn):
+    for table in ("expenses", "incomes"):
+        # Rows duplicated by concurrent imports or recurring runs keep their
+        # data; only the first of each keeps the hash
+        conn.execute(text(
+            f"UPDATE {table} SET import_hash = NULL WHERE import_hash IS NOT NULL AND id NOT IN ("
+            f"SELECT MIN(id) FROM {table} WHERE import_hash IS NOT NULL GROUP BY user_id, import_hash)"
+        ))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_user_id_import_hash ON {table} (user_id, import_hash)"
+        ))
@@ -0,0 +1,24 @@
+"""import_hash and updated_at on the archive partitions, so re-imports skip archived rows (see crud/archive.py)."""
+from sqlalchemy import select, text
+from migrate import add_column
+from models.archive import ArchivedYear
+from crud import archive
+
+def upgrade(conn):
+    if conn.dialect.name == "postgresql":
+        # Columns and indexes added to the parents reach every partition
+        for ledger in archive.MODELS:
+            add_column(conn, f"{ledger}_archive", "import_hash", "VARCHAR")
+            add_column(conn, f"{ledger}_archive", "updated_at", "TIMESTAMP")
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{ledger}_archive_user_id_import_hash "
+                f"ON {ledger}_archive (user_id, import_hash)"
+            ))
+        return
+    for ledger, year in conn.execute(select(ArchivedYear.ledger, ArchivedYear.year)):
+        name = f"{ledger}_archive_{year}"
+        add_column(conn, name, "import_hash", "VARCHAR", schema=archive.SCHEMA)
+        add_column(conn, name, "updated_at", "DATETIME", schema=archive.SCHEMA)
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {archive.SCHEMA}.ix_{name}_user_id_import_hash ON {name} (user_id, import_hash)"
+        ))
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from database import Base
+
+class ArchivedYear(Base):
+    """A year of a ledger whose rows were moved to an archive partition (see crud/archive.py)."""
+    __tablename__ = "archived_years"
+    __table_args__ = (
+        UniqueConstraint('ledger', 'year', name='uq_archived_years_ledger_year'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ledger = Column(String, nullable=False)  # "expenses" or "incomes"
+    year = Column(Integer, nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
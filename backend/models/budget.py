@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint, Index
+from database import Base
+from tenancy import UserOwned
+from money import Cents
+
+class Budget(UserOwned, Base):
+    """Spending limit for one category in one month."""
+    __tablename__ = "budgets"
+    __table_args__ = (
+        UniqueConstraint('category_id', 'year', 'month', name='uq_budgets_category_month'),
+        # Status queries select a range of months across all categories
+        Index('ix_budgets_year_month', 'year', 'month'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    category_id = Column(Integer, ForeignKey('categories.id'), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)  # 1-12
+    amount = Column(Cents, nullable=False)
@@ -1,21 +1,32 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime
+from tenancy import UserOwned
+from money import Cents
 
 Base = declarative_base()
 
-class CarLoan(Base):
+class CarLoan(UserOwned, Base):
     __tablename__ = "car_loans"
+    __table_args__ = (
+        Index('ix_car_loans_year_month_number', 'year', 'month_number'),
+        Index('ix_car_loans_user_id_period', 'user_id', 'period'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=True)  # users.id; this model has its own metadata, so no foreign key
     month = Column(String, nullable=False)
+    month_number = Column(Integer, nullable=True)  # 1-12, derived from month
+    period = Column(Integer, nullable=True, index=True)  # year * 12 + month_number - 1
     year = Column(Integer, nullable=False)
-    principal_balance = Column(Float, nullable=False)
-    payoff_balance = Column(Float, nullable=False)
-    amount_paid = Column(Float, nullable=False)
-    principal = Column(Float, nullable=False)
-    finance = Column(Float, nullable=False)  # Interest portion
-    ending_balance = Column(Float, nullable=False)
-    interest_ytd = Column(Float, nullable=True)
+    principal_balance = Column(Cents, nullable=False)
+    payoff_balance = Column(Cents, nullable=False)
+    amount_paid = Column(Cents, nullable=False)
+    principal = Column(Cents, nullable=False)
+    finance = Column(Cents, nullable=False)  # Interest portion
+    ending_balance = Column(Cents, nullable=False)
+    interest_ytd = Column(Cents, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
     
     def __repr__(self):
         return f"<CarLoan(id={self.id}, month={self.month} {self.year}, amount_paid={self.amount_paid}, principal={self.principal}, interest={self.finance})>" 
\ No newline at end of file
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from database import Base
+from tenancy import UserOwned
+from money import Cents
+
+class CategoryRule(UserOwned, Base):
+    """Assigns a category to new expenses whose description and amount match."""
+    __tablename__ = "category_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    category_id = Column(Integer, ForeignKey('categories.id'), nullable=False, index=True)
+    kind = Column(String, nullable=False, default="contains")  # "contains", "merchant" or "regex"
+    pattern = Column(String, nullable=True)  # no pattern: the amount range alone decides
+    min_amount = Column(Cents, nullable=True)
+    max_amount = Column(Cents, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # tells the cached matcher to rebuild
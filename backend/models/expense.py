@@ -1,30 +1,48 @@
 from datetime import datetime
 from typing import List
-from sqlalchemy import Column, Integer, Float, DateTime, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from tenancy import UserOwned
+from money import Cents
 
 # Association table for expense categories
 expense_category = Table(
     'expense_category',
     Base.metadata,
-    Column('expense_id', Integer, ForeignKey('expenses.id')),
-    Column('category_id', Integer, ForeignKey('categories.id'))
+    Column('expense_id', Integer, ForeignKey('expenses.id'), primary_key=True),
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # The primary key covers expense -> categories; this covers category -> expenses
+    Index('ix_expense_category_category_id', 'category_id', 'expense_id')
 )
 
-class Category(Base):
+class Category(UserOwned, Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Names are unique per user
+        Index('uq_categories_user_id_name', 'user_id', 'name', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, unique=True, index=True)
+    name = Column(String, index=True)
     description = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
     expenses = relationship("Expense", secondary=expense_category, back_populates="categories")
 
-class Expense(Base):
+class Expense(UserOwned, Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index('ix_expenses_user_id_date', 'user_id', 'date'),
+        # One row per import hash: recurring occurrences and imported lines are never inserted twice
+        Index('uq_expenses_user_id_import_hash', 'user_id', 'import_hash', unique=True),
+        # Never reuse ids on SQLite: archived rows keep theirs (crud/archive.py)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
+    amount = Column(Cents, nullable=False)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     description = Column(String, nullable=True)
+    import_hash = Column(String, nullable=True, index=True)  # set for rows created by statement imports
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
     categories = relationship("Category", secondary=expense_category, back_populates="expenses") 
\ No newline at end of file
@@ -0,0 +1,22 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from database import Base
+from tenancy import UserOwned
+
+class ImportJob(UserOwned, Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    filename = Column(String, nullable=True)
+    format = Column(String, nullable=False)  # csv, ofx or qif
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    total_bytes = Column(Integer, nullable=True)
+    bytes_processed = Column(Integer, nullable=False, default=0)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0)  # duplicates of existing rows
+    rows_failed = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,13 +1,24 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from tenancy import UserOwned
 from datetime import datetime
+from money import Cents
 
-class Income(Base):
+class Income(UserOwned, Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        Index('ix_incomes_user_id_date', 'user_id', 'date'),
+        # One row per import hash: recurring occurrences and imported lines are never inserted twice
+        Index('uq_incomes_user_id_import_hash', 'user_id', 'import_hash', unique=True),
+        # Never reuse ids on SQLite: archived rows keep theirs (crud/archive.py)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
+    amount = Column(Cents, nullable=False)
     description = Column(String, nullable=True)
-    date = Column(DateTime, default=datetime.utcnow)
-    source = Column(String, nullable=True)  # e.g., "Salary", "Freelance", "Investment Returns" 
\ No newline at end of file
+    date = Column(DateTime, default=datetime.utcnow, index=True)
+    source = Column(String, nullable=True)  # e.g., "Salary", "Freelance", "Investment Returns"
+    import_hash = Column(String, nullable=True, index=True)  # set for rows created by statement imports
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
@@ -1,21 +1,31 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from tenancy import UserOwned
 from datetime import datetime
+from money import Cents
 
-class Saving(Base):
+class Saving(UserOwned, Base):
     __tablename__ = "savings"
+    __table_args__ = (
+        Index('ix_savings_user_id_date', 'user_id', 'date'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
+    amount = Column(Cents, nullable=False)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     description = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
 
-class Investment(Base):
+class Investment(UserOwned, Base):
     __tablename__ = "investments"
+    __table_args__ = (
+        Index('ix_investments_user_id_date', 'user_id', 'date'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    date = Column(DateTime, default=datetime.utcnow)
+    amount = Column(Cents, nullable=False)
+    date = Column(DateTime, default=datetime.utcnow, index=True)
     description = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # for delta sync
     # You might want to add fields here later like investment type, ticker, etc. 
\ No newline at end of file
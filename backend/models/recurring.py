@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey
+from database import Base
+from tenancy import UserOwned
+from money import Cents
+
+class RecurringTransaction(UserOwned, Base):
+    """Template for an expense or income that repeats on a schedule (salary, rent, subscriptions)."""
+    __tablename__ = "recurring_transactions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    ledger = Column(String, nullable=False)  # "expenses" or "incomes"
+    amount = Column(Cents, nullable=False)
+    description = Column(String, nullable=True)
+    source = Column(String, nullable=True)  # incomes only
+    category_ids = Column(JSON, nullable=False, default=list)  # expenses only
+    frequency = Column(String, nullable=False)  # daily, weekly, biweekly, monthly, quarterly, yearly
+    interval = Column(Integer, nullable=False, default=1)  # every `interval` periods
+    start_date = Column(DateTime, nullable=False)  # first occurrence
+    end_date = Column(DateTime, nullable=True)  # no occurrences after this
+    count = Column(Integer, nullable=True)  # stop after this many occurrences
+    active = Column(Boolean, nullable=False, default=True)
+    occurrences = Column(Integer, nullable=False, default=0)  # materialized so far
+    next_run = Column(DateTime, nullable=True, index=True)  # next occurrence to materialize; None once finished
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from database import Base
+from tenancy import UserOwned
+from money import Cents
+
+class MonthlyRollup(UserOwned, Base):
+    """Materialized per-month totals for a ledger.
+
+    ``category_id`` is 0 for the ledger-wide total; expenses additionally get
+    one row per category they are tagged with.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'ledger', 'year', 'month', 'category_id', name='uq_monthly_rollups_key'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    ledger = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    category_id = Column(Integer, nullable=False, default=0)
+    total = Column(Cents, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
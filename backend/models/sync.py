@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index, ForeignKey
+from database import Base
+from tenancy import UserOwned
+
+class Tombstone(UserOwned, Base):
+    """Record of a deleted row, so delta sync can tell clients to drop it."""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index('ix_sync_tombstones_deleted_at', 'deleted_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True)
+    table_name = Column(String, nullable=False)  # e.g. "expenses", "categories"
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
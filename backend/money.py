@@ -0,0 +1,57 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, Union
+from pydantic import AfterValidator, PlainSerializer
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# Money amounts are stored as integer cents (migration 0011).
+#
+# Float columns made every SUM and every Python-side total drift by
+# fractions of a cent. Integers add up exactly, in the database and in
+# Python, and are smaller to store and index. The Cents column type converts
+# at the edge: Python code sees Decimal amounts with two places and SQL sees
+# integers, so func.sum() over a Cents column is an integer SUM whose result
+# comes back as a Decimal again.
+#
+# The API keeps accepting and returning plain JSON numbers: the Amount schema
+# type rounds what it is given to the cent and serializes back to a float.
+
+CENT = Decimal("0.01")
+
+def to_decimal(value: Union[Decimal, float, int, str]) -> Decimal:
+    """``value`` rounded half up to the cent; floats go through their shortest repr, so 0.1 is 0.10"""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def to_cents(value: Union[Decimal, float, int, str]) -> int:
+    return int(to_decimal(value).scaleb(2))
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+class Cents(TypeDecorator):
+    """Column type for money: BIGINT cents in the database, Decimal in Python."""
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return Decimal
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
+
+def _positive(value: Decimal) -> Decimal:
+    if value <= 0:
+        raise ValueError("must be at least 0.01")
+    return value
+
+# Schema field type for amounts
+Amount = Annotated[Decimal, AfterValidator(to_decimal), PlainSerializer(float, return_type=float, when_used="json")]
+
+# Amounts that must be positive: checked after rounding, so 0.001 is rejected rather than stored as 0.00
+PositiveAmount = Annotated[Amount, AfterValidator(_positive)]
@@ -0,0 +1,14 @@
+from database import SessionLocal, engine
+from migrate import run_migrations
+from crud.rollup import rebuild_rollups
+from cache import cache, SUMMARY
+
+# Recompute the materialized monthly rollups from the ledger tables.
+# Run after editing the database by hand or restoring a backup.
+run_migrations(engine)
+
+with SessionLocal() as db:
+    count = rebuild_rollups(db)
+    # Only reaches the API's cache when it is shared (CACHE_URL=redis://...)
+    cache.invalidate(SUMMARY)
+    print(f"Rebuilt {count} monthly rollup rows")
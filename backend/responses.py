@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import Response
+import metrics
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already plain dicts, lists and scalars.
+
+    Returning a Response skips FastAPI's response_model validation, while the
+    route's response_model still documents the shape in the OpenAPI schema.
+    Encoded with orjson when available. Decimal amounts become JSON numbers.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with metrics.phase("serialize"):
+            return self._encode(content)
+
+    @staticmethod
+    def _encode(content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, separators=(",", ":")).encode()
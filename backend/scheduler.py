@@ -0,0 +1,68 @@
+import logging
+import os
+import threading
+from database import SessionLocal, begin_write, write_queue
+from cache import cache, SUMMARY
+from crud import recurring as crud_recurring
+
+logger = logging.getLogger(__name__)
+
+# Seconds between runs of the recurring transaction scheduler; 0 disables it
+RECURRING_INTERVAL = int(os.getenv("RECURRING_INTERVAL", "300"))
+RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", "1000"))
+
+def _run_batch() -> dict:
+    def job(db):
+        return crud_recurring.materialize_due(db, batch_size=RECURRING_BATCH_SIZE)
+
+    if write_queue is not None:
+        return write_queue.run(job)
+    with SessionLocal() as db:
+        begin_write(db)
+        return job(db)
+
+def run_recurring() -> dict:
+    """Materialize every due occurrence, one transaction per batch. Returns the totals created."""
+    totals = {"expenses": 0, "incomes": 0}
+    while True:
+        result = _run_batch()
+        totals["expenses"] += result["expenses"]
+        totals["incomes"] += result["incomes"]
+        if not result["more"]:
+            break
+    if totals["expenses"] or totals["incomes"]:
+        cache.invalidate(SUMMARY)
+    return totals
+
+class RecurringScheduler:
+    """Background thread that runs run_recurring() on start and then every ``interval`` seconds."""
+
+    def __init__(self, interval: int = RECURRING_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._work, name="recurring-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                totals = run_recurring()
+                if totals["expenses"] or totals["incomes"]:
+                    logger.info("Recurring transactions created: %s", totals)
+            except Exception:
+                logger.exception("Recurring transaction run failed")
+            self._stop.wait(self.interval)
+
+scheduler = RecurringScheduler()
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from money import PositiveAmount
+
+class BudgetBase(BaseModel):
+    category_id: int
+    year: int
+    month: int = Field(..., ge=1, le=12)
+    amount: PositiveAmount
+
+class BudgetCreate(BudgetBase):
+    pass
+
+class Budget(BudgetBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+class BudgetStatus(BaseModel):
+    budget_id: int
+    category_id: int
+    category_name: Optional[str] = None
+    year: int
+    month: int
+    budget: float
+    spent: float
+    remaining: float
+    percent_used: float
+    days_elapsed: int
+    days_in_month: int
+    # Average spend per elapsed day, and the month-end total at that pace
+    burn_rate: float
+    projected: float
+    projected_overspend: float
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+# Bulk create and update validate each item on its own: invalid items are
+# reported by index and the valid ones are still written.
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[dict]  # pydantic error details, as in a 422 response
+
+class BulkCreateResult(BaseModel):
+    ids: List[Optional[int]]  # one per item, None where the item was invalid
+    errors: List[BulkItemError] = []
+
+class BulkRowId(BaseModel):
+    """The id every bulk update item carries next to the ledger's fields"""
+    id: int
+
+class BulkUpdateResult(BaseModel):
+    updated: List[int]
+    not_found: List[int] = []
+    errors: List[BulkItemError] = []
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
+class BulkDeleteResult(BaseModel):
+    deleted: List[int]
+    not_found: List[int] = []
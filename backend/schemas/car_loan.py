@@ -1,23 +1,78 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
+from money import Amount
 
 class CarLoanBase(BaseModel):
     month: str
     year: int
-    principal_balance: float
-    payoff_balance: float
-    amount_paid: float
-    principal: float
-    finance: float
-    ending_balance: float
-    interest_ytd: Optional[float] = None
+    principal_balance: Amount
+    payoff_balance: Amount
+    amount_paid: Amount
+    principal: Amount
+    finance: Amount
+    ending_balance: Amount
+    interest_ytd: Optional[Amount] = None
+
+Month = Literal[
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
 
 class CarLoanCreate(CarLoanBase):
-    pass
+    # Stored rows may predate this check, so only input is restricted
+    month: Month
 
 class CarLoan(CarLoanBase):
     id: int
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class CarLoanYearStats(BaseModel):
+    year: int
+    interest_paid: float
+    principal_paid: float
+    total_payments: float
+    payment_count: int
+    average_payment: float
+
+class CarLoanSummary(BaseModel):
+    latest_balance: float
+    total_interest_paid: float
+    total_principal_paid: float
+    total_payments: float
+    payment_count: int
+    average_payment: float
+    years: List[CarLoanYearStats] = []
+
+class CarLoanScheduleRow(BaseModel):
+    year: int
+    month: int  # 1-12
+    payment: float
+    interest: float
+    principal: float
+    balance: float  # after this payment
+
+class CarLoanScenario(BaseModel):
+    # extra_payment is added to every payment from start_year/start_month on
+    extra_payment: float
+    start_year: int
+    start_month: int
+    months: int
+    payoff_year: int
+    payoff_month: int
+    total_interest: float
+    interest_saved: float
+    months_saved: int
+
+class CarLoanProjection(BaseModel):
+    balance: float
+    annual_rate: float  # percent
+    payment: float
+    months: int
+    payoff_year: int
+    payoff_month: int
+    total_interest: float
+    schedule: List[CarLoanScheduleRow] = []
+    scenarios: List[CarLoanScenario] = []
@@ -0,0 +1,36 @@
+import re
+from pydantic import BaseModel, model_validator
+from typing import Literal, Optional
+from money import Amount
+
+class CategoryRuleBase(BaseModel):
+    category_id: int
+    # contains: case-insensitive substring of the description
+    # merchant: alias matched on whole words, ignoring case, digits and punctuation
+    # regex: Python regular expression searched in the description, ignoring case
+    kind: Literal["contains", "merchant", "regex"] = "contains"
+    pattern: Optional[str] = None
+    min_amount: Optional[Amount] = None
+    max_amount: Optional[Amount] = None
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if not self.pattern and self.min_amount is None and self.max_amount is None:
+            raise ValueError("A rule needs a pattern or an amount range")
+        if self.min_amount is not None and self.max_amount is not None and self.min_amount > self.max_amount:
+            raise ValueError("min_amount is greater than max_amount")
+        if self.kind == "regex" and self.pattern:
+            try:
+                re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}")
+        return self
+
+class CategoryRuleCreate(CategoryRuleBase):
+    pass
+
+class CategoryRule(CategoryRuleBase):
+    id: int
+
+    class Config:
+        from_attributes = True
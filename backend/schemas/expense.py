@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
+from money import PositiveAmount
 
 class CategoryBase(BaseModel):
     name: str
@@ -16,7 +17,7 @@ class Category(CategoryBase):
         from_attributes = True
 
 class ExpenseBase(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: PositiveAmount
     description: Optional[str] = None
     date: datetime = Field(default_factory=datetime.utcnow)
     category_ids: List[int] = []
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from datetime import datetime
+
+class ImportOptions(BaseModel):
+    format: Literal["csv", "ofx", "qfx", "qif"] = "csv"
+    # auto: negative amounts become expenses, positive amounts incomes
+    ledger: Literal["auto", "expenses", "incomes"] = "auto"
+    date_column: Optional[str] = None
+    amount_column: Optional[str] = None
+    description_column: Optional[str] = None
+    date_format: Optional[str] = None
+    batch_size: int = Field(1000, gt=0, le=50000)
+
+class ImportJob(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    format: str
+    status: str
+    total_bytes: Optional[int] = None
+    bytes_processed: int = 0
+    rows_processed: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    rows_failed: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
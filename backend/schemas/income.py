@@ -1,9 +1,10 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
+from money import Amount
 
 class IncomeBase(BaseModel):
-    amount: float
+    amount: Amount
     description: Optional[str] = None
     date: datetime
     source: Optional[str] = None
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
+from money import PositiveAmount
 
 class SavingBase(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: PositiveAmount
     description: Optional[str] = None
     date: datetime = Field(default_factory=datetime.utcnow)
 
@@ -17,7 +18,7 @@ class Saving(SavingBase):
         from_attributes = True
 
 class InvestmentBase(BaseModel):
-    amount: float = Field(..., gt=0)
+    amount: PositiveAmount
     description: Optional[str] = None
     date: datetime = Field(default_factory=datetime.utcnow)
 
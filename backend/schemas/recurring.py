@@ -0,0 +1,38 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
+from money import PositiveAmount
+
+class RecurringTransactionBase(BaseModel):
+    ledger: Literal["expenses", "incomes"]
+    amount: PositiveAmount
+    description: Optional[str] = None
+    source: Optional[str] = None
+    category_ids: List[int] = []
+    frequency: Literal["daily", "weekly", "biweekly", "monthly", "quarterly", "yearly"]
+    interval: int = Field(1, ge=1)
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    count: Optional[int] = Field(None, ge=1)
+    active: bool = True
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date is not None and self.end_date < self.start_date:
+            raise ValueError("end_date is before start_date")
+        return self
+
+class RecurringTransactionCreate(RecurringTransactionBase):
+    pass
+
+class RecurringTransaction(RecurringTransactionBase):
+    id: int
+    occurrences: int
+    next_run: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RecurringRunResult(BaseModel):
+    expenses: int
+    incomes: int
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from schemas.expense import Category
+
+class SearchResult(BaseModel):
+    # "expenses" or "incomes"; id is the row's id in that ledger
+    ledger: str
+    id: int
+    amount: float
+    date: datetime
+    description: Optional[str] = None
+    source: Optional[str] = None
+    categories: List[Category] = []
+    # Relevance, higher is better; only comparable within one search
+    score: float
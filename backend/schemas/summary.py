@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+class MonthTotals(BaseModel):
+    year: int
+    month: int
+    expenses: float = 0.0
+    incomes: float = 0.0
+    savings: float = 0.0
+    investments: float = 0.0
+    expenses_by_category: Dict[int, float] = {}
+
+class MonthlySummary(BaseModel):
+    months: List[MonthTotals] = []
+    display_year: int
+    display_month: int
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from schemas.expense import Expense, Category
+from schemas.income import Income
+from schemas.investment_and_saving import Saving, Investment
+from schemas.car_loan import CarLoan
+
+class SyncChanges(BaseModel):
+    # Pass back as ?since= on the next sync
+    token: str
+    categories: List[Category] = []
+    expenses: List[Expense] = []
+    incomes: List[Income] = []
+    savings: List[Saving] = []
+    investments: List[Investment] = []
+    car_loans: List[CarLoan] = []
+    # Table name -> ids deleted since the token; apply these before the rows above
+    deleted: Dict[str, List[int]] = {}
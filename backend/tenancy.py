@@ -0,0 +1,59 @@
+from sqlalchemy import Column, ForeignKey, Integer, event
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+from typing import List, Optional
+
+# Per-user data isolation.
+#
+# Every model holding a user's data inherits UserOwned and has a user_id
+# column. In a session scoped to a user (scope(), done for each request by
+# auth.get_user_session) every ORM SELECT, UPDATE and DELETE involving those
+# models gets "user_id = :id" added, and rows added through the session are
+# stamped with the id at flush. Core inserts of model rows go through
+# owned_rows(). Unscoped sessions (scripts, the recurring scheduler) see
+# every user's rows.
+
+class UserOwned:
+    """Mixin for models whose rows belong to a user.
+
+    Models may redeclare user_id, e.g. to index it on its own.
+    """
+
+    @declared_attr
+    def user_id(cls):
+        return Column(Integer, ForeignKey("users.id"), nullable=True)
+
+def scope(db, user_id: Optional[int]):
+    """Scope the session (or AsyncSession) to ``user_id``; None removes the scope."""
+    db.info["user_id"] = user_id
+
+def current_user_id(db) -> Optional[int]:
+    return db.info.get("user_id")
+
+def owned_models() -> list:
+    return UserOwned.__subclasses__()
+
+def owned_rows(db, model, rows: List[dict]) -> List[dict]:
+    """``rows`` for a Core insert into ``model``, stamped with the session's user."""
+    user_id = current_user_id(db)
+    if user_id is None or not issubclass(model, UserOwned):
+        return rows
+    return [{**row, "user_id": user_id} for row in rows]
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_statement(state):
+    user_id = state.session.info.get("user_id")
+    if user_id is None or state.is_column_load or state.is_relationship_load:
+        return
+    if state.is_select or state.is_update or state.is_delete:
+        state.statement = state.statement.options(
+            with_loader_criteria(UserOwned, lambda cls: cls.user_id == user_id, include_aliases=True)
+        )
+
+@event.listens_for(Session, "before_flush")
+def _stamp_new_rows(session, flush_context, instances):
+    user_id = session.info.get("user_id")
+    if user_id is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, UserOwned) and obj.user_id is None:
+            obj.user_id = user_id
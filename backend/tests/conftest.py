@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+# The app reads its settings at import time: point it at a throwaway database first
+_tmp = tempfile.mkdtemp(prefix="finance_tracker_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("SLOW_QUERY_MS", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import main
+from database import engine
+
+_emails = itertools.count()
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(main.app) as client:
+        yield client
+
+@pytest.fixture
+def client(app_client):
+    """A client logged in as a fresh user, so every test starts with empty ledgers."""
+    email = f"user{next(_emails)}@example.com"
+    app_client.post("/auth/register", json={"email": email, "password": "password1"})
+    token = app_client.post("/auth/token", data={"username": email, "password": "password1"}).json()["access_token"]
+    app_client.headers["Authorization"] = f"Bearer {token}"
+    return app_client
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@pytest.fixture
+def queries():
+    """SQL statements sent to the database while the test runs"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
@@ -0,0 +1,75 @@
+from database import SessionLocal, begin_write
+from crud import archive
+from models.archive import ArchivedYear
+import tenancy
+
+def _archive(year):
+    with SessionLocal() as db:
+        begin_write(db)
+        archive.archive_year(db, "expenses", year)
+
+def _create(client, dates):
+    return [
+        client.post("/expenses/", json={"amount": 1, "date": f"{date}T00:00:00", "description": f"archived {i}"}).json()["id"]
+        for i, date in enumerate(dates)
+    ]
+
+def test_archived_ids_are_not_reused(client):
+    old = _create(client, ["2001-01-01", "2001-02-01", "2001-03-01"])
+    new = _create(client, ["2024-01-01", "2024-02-01"])
+    _archive(2001)
+    for expense_id in new:
+        assert client.delete(f"/expenses/{expense_id}").status_code == 200
+    created = client.post("/expenses/", json={"amount": 1, "date": "2024-03-01T00:00:00"}).json()["id"]
+    assert created > max(old + new)
+    assert sorted(expense["id"] for expense in client.get("/expenses/").json()) == sorted(old + [created])
+
+def test_archived_rows_can_be_changed(client):
+    first, second = _create(client, ["2002-01-01", "2002-02-01"])
+    _archive(2002)
+    assert client.get(f"/expenses/{first}").json()["amount"] == 1
+
+    response = client.put(f"/expenses/{first}", json={"amount": 5, "date": "2002-01-01T00:00:00", "category_ids": []})
+    assert response.status_code == 200
+    assert client.get(f"/expenses/{first}").json()["amount"] == 5
+    assert client.delete(f"/expenses/{second}").status_code == 200
+    assert client.get(f"/expenses/{second}").status_code == 404
+
+    months = client.get("/summary/monthly").json()["months"]
+    assert [(m["year"], m["month"], m["expenses"]) for m in months] == [(2002, 1, 5)]
+
+def test_archived_rows_are_searched_and_synced(client):
+    ids = _create(client, ["2003-01-01", "2003-02-01"])
+    _archive(2003)
+    assert sorted(row["id"] for row in client.get("/search", params={"q": "archived"}).json()) == ids
+    assert sorted(row["id"] for row in client.get("/sync").json()["expenses"]) == ids
+
+def test_interrupted_archive_run_is_finished_by_the_next(client, monkeypatch):
+    first, second = _create(client, ["2004-01-01", "2004-02-01"])
+
+    def interrupt(db):
+        raise RuntimeError("interrupted")
+    monkeypatch.setattr(archive, "begin_write", interrupt)
+    try:
+        _archive(2004)
+    except RuntimeError:
+        pass
+    # Copied but not yet deleted: the live rows are served, once each
+    assert sorted(expense["id"] for expense in client.get("/expenses/").json()) == [first, second]
+
+    # A row changed between the copy and the delete stays live
+    def change_first(db):
+        client.put(f"/expenses/{first}", json={"amount": 7, "date": "2004-01-01T00:00:00"})
+        begin_write(db)
+    monkeypatch.setattr(archive, "begin_write", change_first)
+    _archive(2004)
+    monkeypatch.undo()
+    assert sorted(expense["id"] for expense in client.get("/expenses/").json()) == [first, second]
+    assert client.get(f"/expenses/{first}").json()["amount"] == 7
+
+    _archive(2004)
+    assert sorted(expense["id"] for expense in client.get("/expenses/").json()) == [first, second]
+    with SessionLocal() as db:
+        tenancy.scope(db, client.get("/auth/me").json()["id"])
+        assert archive.live_years(db, "expenses") == []
+        assert db.query(ArchivedYear.row_count).filter(ArchivedYear.year == 2004).scalar() == 2
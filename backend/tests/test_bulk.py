@@ -0,0 +1,51 @@
+def _expense(amount, day=1, **fields):
+    return {"amount": amount, "date": f"2024-02-{day:02d}T00:00:00", **fields}
+
+def test_bulk_create_reports_invalid_items(client):
+    result = client.post("/expenses/bulk", json=[_expense(1), {"amount": "lots"}, _expense(3, day=3)]).json()
+    assert result["ids"][1] is None and None not in (result["ids"][0], result["ids"][2])
+    assert [error["index"] for error in result["errors"]] == [1]
+    assert [error["loc"] for error in result["errors"][0]["errors"]] == [["amount"]]
+    assert sorted(e["amount"] for e in client.get("/expenses/").json()) == [1, 3]
+
+def test_amounts_rounding_to_zero_are_rejected(client):
+    assert client.post("/expenses/", json=_expense(0.001)).status_code == 422
+    assert client.post("/expenses/", json=_expense(0.005)).json()["amount"] == 0.01
+    result = client.post("/expenses/bulk", json=[_expense(0.004), _expense(2)]).json()
+    assert [error["index"] for error in result["errors"]] == [0]
+    assert sorted(e["amount"] for e in client.get("/expenses/").json()) == [0.01, 2]
+
+def test_bulk_update(client):
+    food = client.post("/categories/", json={"name": "food"}).json()["id"]
+    ids = client.post("/expenses/bulk", json=[_expense(1), _expense(2)]).json()["ids"]
+    result = client.post("/expenses/bulk-update", json=[
+        {"id": ids[0], **_expense(10, description="lunch", category_ids=[food])},
+        {"id": 999999, **_expense(5)},
+        {**_expense(7)},
+        {"id": ids[1], "amount": -1},
+    ]).json()
+    assert result["updated"] == [ids[0]]
+    assert result["not_found"] == [999999]
+    assert [error["index"] for error in result["errors"]] == [2, 3]
+
+    updated = client.get(f"/expenses/{ids[0]}").json()
+    assert (updated["amount"], updated["description"], [c["id"] for c in updated["categories"]]) == (10, "lunch", [food])
+    assert client.get(f"/expenses/{ids[1]}").json()["amount"] == 2
+    summary = client.get("/summary/monthly", params={"start_date": "2024-01-01T00:00:00"}).json()
+    assert summary["months"][0]["expenses"] == 12
+
+def test_bulk_update_every_ledger(client):
+    for prefix, item in (
+        ("/incomes", _expense(1, source="job")),
+        ("/savings", _expense(1)),
+        ("/investments", _expense(1)),
+        ("/car-loans", {
+            "month": "May", "year": 2024, "principal_balance": 1, "payoff_balance": 1, "amount_paid": 1,
+            "principal": 1, "finance": 0, "ending_balance": 0
+        }),
+    ):
+        row_id = client.post(f"{prefix}/bulk", json=[item]).json()["ids"][0]
+        field = "principal_balance" if prefix == "/car-loans" else "amount"
+        result = client.post(f"{prefix}/bulk-update", json=[{**item, field: 42, "id": row_id}]).json()
+        assert result == {"updated": [row_id], "not_found": [], "errors": []}
+        assert client.get(f"{prefix}/{row_id}").json()[field] == 42
@@ -0,0 +1,33 @@
+from database import SessionLocal
+from models.car_loan import CarLoan
+import tenancy
+
+def _loan(month, year):
+    return {
+        "month": month, "year": year, "principal_balance": 1000, "payoff_balance": 1000, "amount_paid": 100,
+        "principal": 90, "finance": 10, "ending_balance": 910,
+    }
+
+def test_month_must_be_a_month_name(client):
+    assert client.post("/car-loans/", json=_loan("Sept", 2024)).status_code == 422
+    result = client.post("/car-loans/bulk", json=[_loan("March", 2024), _loan("sept", 2024)]).json()
+    assert result["ids"][1] is None and [error["index"] for error in result["errors"]] == [1]
+
+def test_pages_reach_rows_without_a_period(client):
+    client.post("/car-loans/bulk", json=[_loan("January", 2024), _loan("February", 2024), _loan("March", 2024)])
+    # Rows stored before months were validated have no period
+    with SessionLocal() as db:
+        tenancy.scope(db, client.get("/auth/me").json()["id"])
+        db.add_all([CarLoan(**_loan("Sept", 2023)), CarLoan(**_loan("Oct.", 2023))])
+        db.commit()
+
+    months, cursor = [], None
+    while True:
+        response = client.get("/car-loans/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        months += [loan["month"] for loan in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert months == ["March", "February", "January", "Oct.", "Sept"]
+    assert client.get("/car-loans/stats/summary").json()["latest_balance"] == 910
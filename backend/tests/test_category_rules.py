@@ -0,0 +1,24 @@
+from categorizer import required_literal
+
+def test_category_names_only_categorize_imports(client):
+    gas = client.post("/categories/", json={"name": "Gas"}).json()["id"]
+    hotels = client.post("/categories/", json={"name": "Hotels"}).json()["id"]
+    client.post("/category-rules/", json={"category_id": hotels, "kind": "contains", "pattern": "hotel"})
+
+    expense = client.post("/expenses/", json={"amount": 120, "description": "Las Vegas hotel"}).json()
+    assert [category["id"] for category in expense["categories"]] == [hotels]
+
+    client.post("/imports/", files={"file": ("s.csv", b"Date,Description,Amount\n2024-01-05,Shell gas,-40\n", "text/csv")})
+    imported = client.get("/expenses/", params={"start_date": "2024-01-05T00:00:00", "end_date": "2024-01-05T00:00:00"}).json()
+    assert [category["id"] for category in imported[0]["categories"]] == [gas]
+
+def test_required_literal():
+    assert required_literal("Starbucks") == "starbucks"
+    assert required_literal(r"amzn\s+mktp") == "amzn"
+    assert required_literal(r"netflix\.com") == "netflix.com"
+    assert required_literal(r"\d+ walmart #\d+") == " walmart #"
+    assert required_literal("uber(eats)?") == "uber"
+    assert required_literal("[a-z]+shell") == "shell"
+    assert required_literal("shell|bp") is None
+    assert required_literal("(?x) gas station") is None
+    assert required_literal("[") is None
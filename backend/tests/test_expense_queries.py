@@ -0,0 +1,41 @@
+# GET /expenses/ and GET /expenses/{id} load categories in a fixed number of
+# statements, however many expenses and categories there are (no N+1).
+# Lists are limited to 2024, so years archived by other tests add no queries.
+
+RECENT = {"start_date": "2024-01-01T00:00:00"}
+
+def _create(client, count, prefix="c"):
+    categories = [client.post("/categories/", json={"name": f"{prefix}{i}"}).json()["id"] for i in range(3)]
+    return [
+        client.post("/expenses/", json={
+            "amount": i + 1, "date": f"2024-01-{i % 28 + 1:02d}T00:00:00", "category_ids": categories[:i % 3 + 1]
+        }).json()["id"]
+        for i in range(count)
+    ]
+
+def _count(client, queries, path, **params):
+    queries.statements.clear()
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return len(queries.statements), response.json()
+
+def test_list_query_count(client, queries):
+    _create(client, 30)
+    count, expenses = _count(client, queries, "/expenses/", **RECENT)
+    assert len(expenses) == 30
+    assert all(expense["categories"] for expense in expenses)
+    assert count <= 4, queries.statements
+
+def test_list_query_count_does_not_grow_with_rows(client, queries):
+    _create(client, 2)
+    small, _ = _count(client, queries, "/expenses/", **RECENT)
+    _create(client, 40, prefix="d")
+    large, expenses = _count(client, queries, "/expenses/", **RECENT)
+    assert len(expenses) == 42
+    assert large == small
+
+def test_get_query_count(client, queries):
+    expense_id = _create(client, 3)[-1]
+    count, expense = _count(client, queries, f"/expenses/{expense_id}")
+    assert len(expense["categories"]) == 3
+    assert count <= 3, queries.statements
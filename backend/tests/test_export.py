@@ -0,0 +1,29 @@
+from decimal import Decimal
+import pytest
+from database import SessionLocal
+from crud.export import EXPORTS, get_column_types, iter_rows
+from exporters.formats import write_parquet
+import tenancy
+
+# pyarrow is only needed by export_ledgers.py, not by the API
+pq = pytest.importorskip("pyarrow.parquet")
+
+def _user_id(client):
+    return client.get("/auth/me").json()["id"]
+
+def test_parquet_export(client, tmp_path):
+    food = client.post("/categories/", json={"name": "food"}).json()["id"]
+    client.post("/expenses/", json={"amount": 12.34, "date": "2024-01-05T00:00:00", "category_ids": [food]})
+    client.post("/incomes/", json={"amount": 1000.1, "date": "2024-01-01T00:00:00", "source": "job"})
+
+    with SessionLocal() as db:
+        tenancy.scope(db, _user_id(client))
+        for ledger in EXPORTS:
+            path = tmp_path / f"{ledger}.parquet"
+            count = write_parquet(iter_rows(db, ledger), get_column_types(ledger), str(path))
+            assert pq.read_table(path).num_rows == count
+
+    expenses = pq.read_table(tmp_path / "expenses.parquet").to_pylist()
+    assert expenses[0]["amount"] == Decimal("12.34")
+    assert expenses[0]["categories"] == ["food"]
+    assert pq.read_table(tmp_path / "incomes.parquet").to_pylist()[0]["amount"] == Decimal("1000.10")
@@ -0,0 +1,56 @@
+from database import SessionLocal, begin_write
+from datetime import datetime
+from crud import archive
+from importers.pipeline import _Hasher
+
+# Statement imports through POST /imports/; TestClient runs the background task before returning
+
+def _import(client, csv_text):
+    response = client.post("/imports/", files={"file": ("statement.csv", csv_text.encode(), "text/csv")})
+    assert response.status_code == 202, response.text
+    return client.get(f"/imports/{response.json()['id']}").json()
+
+UNSORTED = """Date,Description,Amount
+2024-01-05,Coffee,-3.50
+2024-01-06,Lunch,-12.00
+2024-01-05,Coffee,-3.50
+"""
+
+def test_identical_rows_in_unsorted_statement(client):
+    job = _import(client, UNSORTED)
+    assert job["status"] == "completed"
+    assert (job["rows_imported"], job["rows_skipped"]) == (3, 0)
+    # Re-importing the same statement adds nothing
+    job = _import(client, UNSORTED)
+    assert (job["rows_imported"], job["rows_skipped"]) == (0, 3)
+
+def test_non_finite_amounts_fail_per_row(client):
+    job = _import(client, "Date,Description,Amount\n2024-01-05,Bad,nan\n2024-01-06,Worse,-inf\n2024-01-07,Rent,-900\n")
+    assert job["status"] == "completed"
+    assert (job["rows_imported"], job["rows_failed"]) == (1, 2)
+    assert [expense["description"] for expense in client.get("/expenses/").json()] == ["Rent"]
+
+def test_reimport_skips_archived_rows(client):
+    statement = "Date,Description,Amount\n2010-03-01,Rent,-900\n2010-04-01,Rent,-900\n"
+    assert _import(client, statement)["rows_imported"] == 2
+    with SessionLocal() as db:
+        begin_write(db)
+        archive.archive_year(db, "expenses", 2010)
+    job = _import(client, statement)
+    assert (job["rows_imported"], job["rows_skipped"]) == (0, 2)
+    assert len(client.get("/expenses/").json()) == 2
+    assert [m["expenses"] for m in client.get("/summary/monthly").json()["months"]] == [900, 900]
+
+    # A restored row keeps its hash
+    expense_id = client.get("/expenses/").json()[0]["id"]
+    assert client.put(f"/expenses/{expense_id}", json={"amount": 900, "date": "2010-04-01T00:00:00"}).status_code == 200
+    assert _import(client, statement)["rows_skipped"] == 2
+
+def test_hasher_keeps_a_fixed_size_key_per_distinct_row():
+    hasher = _Hasher()
+    coffee = {"date": datetime(2024, 1, 5), "amount": -3.5, "description": "Coffee " * 1000}
+    lunch = {"date": datetime(2024, 1, 6), "amount": -12, "description": "Lunch"}
+    hashes = [hasher("expenses", row) for row in (coffee, lunch, coffee)]
+    assert len(set(hashes)) == 3
+    assert sorted(hasher.counts.values()) == [1, 2]
+    assert {len(key) for key in hasher.counts} == {16}
@@ -0,0 +1,31 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+import database
+
+def _server_timing(response) -> dict:
+    return {name: float(ms) for name, ms in re.findall(r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"])}
+
+def test_lock_waits_are_not_slow_queries(client, monkeypatch, caplog):
+    monkeypatch.setattr(database, "SLOW_QUERY_MS", 100)
+    # Another process holds the write lock for a while
+    other = sqlite3.connect(database.engine.url.database, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    released = threading.Timer(0.3, other.execute, ("COMMIT",))
+    released.start()
+    try:
+        with caplog.at_level(logging.WARNING, logger="database"):
+            started = time.perf_counter()
+            response = client.post("/expenses/", json={"amount": 1, "date": "2024-01-01T00:00:00"})
+            assert time.perf_counter() - started >= 0.25
+    finally:
+        released.join()
+        other.close()
+
+    assert response.status_code == 200
+    if database.write_queue is None:
+        # Queued writes wait on the writer thread, outside the request's timings
+        assert _server_timing(response)["lock"] >= 250
+    assert not [record for record in caplog.records if "Slow query" in record.getMessage()]
@@ -0,0 +1,37 @@
+from decimal import Decimal
+from database import SessionLocal
+from crud import rollup
+import tenancy
+
+def _rollups(client):
+    with SessionLocal() as db:
+        tenancy.scope(db, client.get("/auth/me").json()["id"])
+        return {
+            (row.ledger, row.year, row.month, row.category_id): (row.total, row.entry_count)
+            for row in rollup.get_rollups(db)
+        }
+
+def _rebuilt(client):
+    with SessionLocal() as db:
+        tenancy.scope(db, client.get("/auth/me").json()["id"])
+        rollup.rebuild_rollups(db)
+    return _rollups(client)
+
+def test_rollups_follow_writes(client):
+    food = client.post("/categories/", json={"name": "food"}).json()["id"]
+    first = client.post("/expenses/", json={"amount": 10.25, "date": "2024-03-01T00:00:00", "category_ids": [food]})
+    client.post("/expenses/", json={"amount": 5, "date": "2024-03-02T00:00:00", "category_ids": [food]})
+    client.post("/expenses/bulk", json=[
+        {"amount": 1, "date": "2024-03-03T00:00:00"}, {"amount": 2, "date": "2024-04-03T00:00:00"}
+    ])
+    assert _rollups(client)[("expenses", 2024, 3, food)] == (Decimal("15.25"), 2)
+    assert _rollups(client)[("expenses", 2024, 3, rollup.ALL_CATEGORIES)] == (Decimal("16.25"), 3)
+
+    # Moving the only April expense away empties the month: its row goes
+    april = [e["id"] for e in client.get("/expenses/").json() if e["date"].startswith("2024-04")]
+    client.put(f"/expenses/{april[0]}", json={"amount": 2, "date": "2024-05-03T00:00:00"})
+    client.delete(f"/expenses/{first.json()['id']}")
+    rollups = _rollups(client)
+    assert ("expenses", 2024, 4, rollup.ALL_CATEGORIES) not in rollups
+    assert rollups[("expenses", 2024, 3, food)] == (Decimal("5.00"), 1)
+    assert rollups == _rebuilt(client)
@@ -0,0 +1,78 @@
+import queue
+import threading
+from concurrent.futures import Future
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+class WriteQueue:
+    """Single-writer queue with group commit.
+
+    Write jobs (callables taking a Session) run one at a time on a dedicated
+    thread and connection. Jobs that arrive while a batch is running are
+    committed together, so concurrent requests share one fsync instead of
+    queueing on SQLite's write lock. Each job runs in its own SAVEPOINT:
+    its session.commit() only releases the savepoint and a failing job rolls
+    back alone.
+
+    Job results outlive the session, so jobs must return plain data (e.g.
+    response schemas), not ORM objects.
+    """
+
+    def __init__(self, engine: Engine, max_batch: int = 64):
+        self.engine = engine
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, job) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def run(self, job):
+        return self.submit(job).result()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            jobs = [self._queue.get()]
+            while len(jobs) < self.max_batch:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(jobs)
+
+    def _run_batch(self, jobs):
+        outcomes = []
+        try:
+            # Take the write lock up front, like begin_write(): a deferred batch
+            # that reads first fails at once if another process writes meanwhile
+            with self.engine.connect().execution_options(sqlite_begin="IMMEDIATE") as conn, conn.begin():
+                for job, future in jobs:
+                    session = Session(bind=conn, join_transaction_mode="create_savepoint", autoflush=False)
+                    try:
+                        outcomes.append((future, job(session), None))
+                    except Exception as e:
+                        session.rollback()
+                        outcomes.append((future, None, e))
+                    finally:
+                        session.close()
+        except Exception as e:
+            # The batch commit itself failed: nothing was written
+            for _, future in jobs:
+                future.set_exception(e)
+            return
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,35 @@
+import 'dart:convert';
+import 'package:http/http.dart' as http;
+
+export 'package:http/http.dart' show Response;
+
+// Drop-in for the package:http top-level functions that adds the signed-in
+// user's bearer token. Services import this file as `http` instead of
+// package:http, so every request is authenticated.
+class ApiClient {
+  static String? token;
+}
+
+Map<String, String>? _withAuth(Map<String, String>? headers) {
+  final token = ApiClient.token;
+  if (token == null) {
+    return headers;
+  }
+  return <String, String>{...?headers, 'Authorization': 'Bearer $token'};
+}
+
+Future<http.Response> get(Uri url, {Map<String, String>? headers}) =>
+    http.get(url, headers: _withAuth(headers));
+
+Future<http.Response> post(Uri url,
+        {Map<String, String>? headers, Object? body, Encoding? encoding}) =>
+    http.post(url, headers: _withAuth(headers), body: body, encoding: encoding);
+
+Future<http.Response> put(Uri url,
+        {Map<String, String>? headers, Object? body, Encoding? encoding}) =>
+    http.put(url, headers: _withAuth(headers), body: body, encoding: encoding);
+
+Future<http.Response> delete(Uri url,
+        {Map<String, String>? headers, Object? body, Encoding? encoding}) =>
+    http.delete(url,
+        headers: _withAuth(headers), body: body, encoding: encoding);
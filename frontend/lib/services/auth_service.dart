@@ -0,0 +1,54 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+import 'etag_cache.dart';
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+// Accounts and sign-in. login() stores the token in ApiClient, after which
+// every service sends it with its requests.
+class AuthService {
+  Future<Map<String, dynamic>> register(String email, String password) async {
+    final response = await http.post(
+      Uri.parse('$baseUrl/auth/register'),
+      headers: <String, String>{'Content-Type': 'application/json'},
+      body: jsonEncode({'email': email, 'password': password}),
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to register: ${response.statusCode} - ${response.body}');
+    }
+  }
+
+  Future<void> login(String email, String password) async {
+    // OAuth2 password flow: form-encoded, with the email as the username
+    final response = await http.post(
+      Uri.parse('$baseUrl/auth/token'),
+      body: {'username': email, 'password': password},
+    );
+
+    if (response.statusCode == 200) {
+      http.ApiClient.token = json.decode(response.body)['access_token'];
+      EtagCache.clear();
+    } else {
+      throw Exception('Failed to sign in: ${response.statusCode}');
+    }
+  }
+
+  void logout() {
+    http.ApiClient.token = null;
+    EtagCache.clear();
+  }
+
+  Future<Map<String, dynamic>> fetchCurrentUser() async {
+    final response = await http.get(Uri.parse('$baseUrl/auth/me'));
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception('Failed to load user: ${response.statusCode}');
+    }
+  }
+}
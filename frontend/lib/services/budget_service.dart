@@ -0,0 +1,55 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+class BudgetService {
+  // Set a category's budget for a month (replaces an existing one)
+  Future<Map<String, dynamic>> setBudget(
+      int categoryId, int year, int month, double amount) async {
+    final response = await http.post(
+      Uri.parse('$baseUrl/budgets/'),
+      headers: <String, String>{'Content-Type': 'application/json'},
+      body: jsonEncode({
+        'category_id': categoryId,
+        'year': year,
+        'month': month,
+        'amount': amount,
+      }),
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to set budget: ${response.statusCode} - ${response.body}');
+    }
+  }
+
+  // Actual vs budget, burn rate and projected overspend per category.
+  // Defaults to the current month.
+  Future<List<Map<String, dynamic>>> fetchBudgetStatus(
+      {DateTime? startDate, DateTime? endDate}) async {
+    final uri = Uri.parse('$baseUrl/budgets/status').replace(queryParameters: {
+      if (startDate != null) 'start_date': startDate.toIso8601String(),
+      if (endDate != null) 'end_date': endDate.toIso8601String(),
+    });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      List jsonResponse = json.decode(response.body);
+      return jsonResponse.cast<Map<String, dynamic>>();
+    } else {
+      throw Exception('Failed to load budget status: ${response.statusCode}');
+    }
+  }
+
+  // Delete a budget
+  Future<void> deleteBudget(int id) async {
+    final response = await http.delete(Uri.parse('$baseUrl/budgets/$id'));
+
+    if (response.statusCode != 200 && response.statusCode != 204) {
+      throw Exception('Failed to delete budget: ${response.statusCode}');
+    }
+  }
+}
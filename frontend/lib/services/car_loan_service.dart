@@ -1,6 +1,7 @@
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import 'api_client.dart' as http;
 import '../models/car_loan_models.dart';
+import 'etag_cache.dart';
 
 const String baseUrl = 'http://127.0.0.1:8000';
 
@@ -20,7 +21,7 @@ class CarLoanService {
   // Fetch car loan summary statistics
   Future<CarLoanSummary> fetchCarLoanSummary() async {
     final response =
-        await http.get(Uri.parse('$baseUrl/car-loans/stats/summary'));
+        await EtagCache.get(Uri.parse('$baseUrl/car-loans/stats/summary'));
 
     if (response.statusCode == 200) {
       return CarLoanSummary.fromJson(json.decode(response.body));
@@ -30,6 +31,35 @@ class CarLoanService {
     }
   }
 
+  // Payoff projection from the latest month, plus one scenario per extra
+  // payment amount and start month
+  Future<Map<String, dynamic>> fetchCarLoanProjection({
+    double? annualRate,
+    double? payment,
+    List<double> extraPayments = const [],
+    List<DateTime> extraStarts = const [],
+    bool schedule = true,
+  }) async {
+    final uri =
+        Uri.parse('$baseUrl/car-loans/projection').replace(queryParameters: {
+      if (annualRate != null) 'annual_rate': annualRate.toString(),
+      if (payment != null) 'payment': payment.toString(),
+      if (extraPayments.isNotEmpty)
+        'extra_payments': extraPayments.map((e) => e.toString()).toList(),
+      if (extraStarts.isNotEmpty)
+        'extra_starts': extraStarts.map((d) => d.toIso8601String()).toList(),
+      'schedule': schedule.toString(),
+    });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to load car loan projection: ${response.statusCode}');
+    }
+  }
+
   // Create a new car loan payment
   Future<CarLoan> createCarLoan(Map<String, dynamic> carLoanData) async {
     final response = await http.post(
@@ -0,0 +1,76 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+// Rules that pick categories for expenses created without any.
+// kind is 'contains', 'merchant' or 'regex'; a rule without a pattern
+// matches on its amount range alone.
+class CategoryRuleService {
+  Future<Map<String, dynamic>> createRule(
+    int categoryId, {
+    String kind = 'contains',
+    String? pattern,
+    double? minAmount,
+    double? maxAmount,
+  }) async {
+    final response = await http.post(
+      Uri.parse('$baseUrl/category-rules/'),
+      headers: <String, String>{'Content-Type': 'application/json'},
+      body: jsonEncode({
+        'category_id': categoryId,
+        'kind': kind,
+        'pattern': pattern,
+        'min_amount': minAmount,
+        'max_amount': maxAmount,
+      }),
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to create rule: ${response.statusCode} - ${response.body}');
+    }
+  }
+
+  Future<List<Map<String, dynamic>>> fetchRules({int? categoryId}) async {
+    final uri = Uri.parse('$baseUrl/category-rules/').replace(queryParameters: {
+      if (categoryId != null) 'category_id': categoryId.toString(),
+    });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      List jsonResponse = json.decode(response.body);
+      return jsonResponse.cast<Map<String, dynamic>>();
+    } else {
+      throw Exception('Failed to load rules: ${response.statusCode}');
+    }
+  }
+
+  // The category ids an expense with this description and amount would get
+  Future<List<int>> matchCategories(String description, double amount) async {
+    final uri = Uri.parse('$baseUrl/category-rules/match').replace(
+        queryParameters: {
+          'description': description,
+          'amount': amount.toString()
+        });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      List jsonResponse = json.decode(response.body);
+      return jsonResponse.cast<int>();
+    } else {
+      throw Exception('Failed to match categories: ${response.statusCode}');
+    }
+  }
+
+  Future<void> deleteRule(int id) async {
+    final response =
+        await http.delete(Uri.parse('$baseUrl/category-rules/$id'));
+
+    if (response.statusCode != 200 && response.statusCode != 204) {
+      throw Exception('Failed to delete rule: ${response.statusCode}');
+    }
+  }
+}
@@ -0,0 +1,30 @@
+import 'api_client.dart' as http;
+
+// Conditional GETs for endpoints that send an ETag (categories, car loan
+// summary, monthly summary). The last response is kept per URL and reused
+// when the backend answers 304 Not Modified.
+class EtagCache {
+  static final Map<Uri, http.Response> _responses = {};
+
+  static Future<http.Response> get(Uri url) async {
+    final cached = _responses[url];
+    final etag = cached?.headers['etag'];
+    final response = await http.get(
+      url,
+      headers: etag != null ? <String, String>{'If-None-Match': etag} : null,
+    );
+
+    if (response.statusCode == 304 && cached != null) {
+      return cached;
+    }
+    if (response.statusCode == 200 && response.headers.containsKey('etag')) {
+      _responses[url] = response;
+    }
+    return response;
+  }
+
+  // Cached responses belong to the signed-in user
+  static void clear() {
+    _responses.clear();
+  }
+}
@@ -1,6 +1,7 @@
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import 'api_client.dart' as http;
 import '../models/entry_models.dart';
+import 'etag_cache.dart';
 
 // Assuming your backend is running on http://localhost:8000
 const String baseUrl = 'http://127.0.0.1:8000';
@@ -9,7 +10,7 @@ class ExpenseService {
   // Fetch all categories
   Future<List<Category>> fetchCategories() async {
     print('Making request to: $baseUrl/categories/');
-    final response = await http.get(Uri.parse('$baseUrl/categories/'));
+    final response = await EtagCache.get(Uri.parse('$baseUrl/categories/'));
     print('Categories response status: ${response.statusCode}');
     print('Categories response body: ${response.body}');
 
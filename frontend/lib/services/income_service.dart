@@ -1,5 +1,5 @@
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import 'api_client.dart' as http;
 import '../models/entry_models.dart';
 
 // Assuming your backend is running on http://localhost:8000
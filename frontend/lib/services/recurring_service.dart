@@ -0,0 +1,78 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+// Recurring expenses and incomes (salary, rent, subscriptions). The backend
+// creates each occurrence in the ledger when it falls due.
+class RecurringService {
+  // rule: ledger ('expenses' or 'incomes'), amount, description, source,
+  // category_ids, frequency ('daily', 'weekly', 'biweekly', 'monthly',
+  // 'quarterly', 'yearly'), interval, start_date, end_date, count, active
+  Future<Map<String, dynamic>> createRecurring(Map<String, dynamic> rule) async {
+    final response = await http.post(
+      Uri.parse('$baseUrl/recurring/'),
+      headers: <String, String>{'Content-Type': 'application/json'},
+      body: jsonEncode(rule),
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to create recurring transaction: ${response.statusCode} - ${response.body}');
+    }
+  }
+
+  Future<List<Map<String, dynamic>>> fetchRecurring({String? ledger}) async {
+    final uri = Uri.parse('$baseUrl/recurring/').replace(queryParameters: {
+      if (ledger != null) 'ledger': ledger,
+    });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      List jsonResponse = json.decode(response.body);
+      return jsonResponse.cast<Map<String, dynamic>>();
+    } else {
+      throw Exception(
+          'Failed to load recurring transactions: ${response.statusCode}');
+    }
+  }
+
+  Future<Map<String, dynamic>> updateRecurring(
+      int id, Map<String, dynamic> rule) async {
+    final response = await http.put(
+      Uri.parse('$baseUrl/recurring/$id'),
+      headers: <String, String>{'Content-Type': 'application/json'},
+      body: jsonEncode(rule),
+    );
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to update recurring transaction: ${response.statusCode}');
+    }
+  }
+
+  // Create the due occurrences now; returns how many expenses and incomes
+  Future<Map<String, dynamic>> runNow() async {
+    final response = await http.post(Uri.parse('$baseUrl/recurring/run'));
+
+    if (response.statusCode == 200) {
+      return json.decode(response.body);
+    } else {
+      throw Exception(
+          'Failed to run recurring transactions: ${response.statusCode}');
+    }
+  }
+
+  Future<void> deleteRecurring(int id) async {
+    final response = await http.delete(Uri.parse('$baseUrl/recurring/$id'));
+
+    if (response.statusCode != 200 && response.statusCode != 204) {
+      throw Exception(
+          'Failed to delete recurring transaction: ${response.statusCode}');
+    }
+  }
+}
@@ -0,0 +1,41 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+class SearchService {
+  // Expenses and incomes matching every word of the query (as a prefix),
+  // best match first. Each result has a 'ledger' of 'expenses' or 'incomes'.
+  Future<List<Map<String, dynamic>>> search(
+    String query, {
+    String? ledger,
+    double? minAmount,
+    double? maxAmount,
+    DateTime? startDate,
+    DateTime? endDate,
+    List<int>? categoryIds,
+    int skip = 0,
+    int limit = 50,
+  }) async {
+    final uri = Uri.parse('$baseUrl/search').replace(queryParameters: {
+      'q': query,
+      if (ledger != null) 'ledger': ledger,
+      if (minAmount != null) 'min_amount': minAmount.toString(),
+      if (maxAmount != null) 'max_amount': maxAmount.toString(),
+      if (startDate != null) 'start_date': startDate.toIso8601String(),
+      if (endDate != null) 'end_date': endDate.toIso8601String(),
+      if (categoryIds != null && categoryIds.isNotEmpty)
+        'category_ids': categoryIds.map((id) => id.toString()).toList(),
+      'skip': skip.toString(),
+      'limit': limit.toString(),
+    });
+    final response = await http.get(uri);
+
+    if (response.statusCode == 200) {
+      List jsonResponse = json.decode(response.body);
+      return jsonResponse.cast<Map<String, dynamic>>();
+    } else {
+      throw Exception('Failed to search: ${response.statusCode}');
+    }
+  }
+}
@@ -0,0 +1,66 @@
+import 'dart:convert';
+import 'api_client.dart' as http;
+
+const String baseUrl = 'http://127.0.0.1:8000';
+
+// Keeps a local copy of every ledger up to date through GET /sync.
+// The first call downloads everything; later calls only fetch the rows
+// created, modified or deleted since the previous sync.
+class SyncService {
+  static const List<String> tables = [
+    'categories',
+    'expenses',
+    'incomes',
+    'savings',
+    'investments',
+    'car_loans',
+  ];
+
+  String? _token;
+  final Map<String, Map<int, Map<String, dynamic>>> _rows = {
+    for (final table in tables) table: <int, Map<String, dynamic>>{},
+  };
+
+  // Sync with the backend and return the rows of each table, keyed by id
+  Future<Map<String, Map<int, Map<String, dynamic>>>> sync() async {
+    final uri = Uri.parse('$baseUrl/sync').replace(
+      queryParameters: _token != null ? {'since': _token} : null,
+    );
+    final response = await http.get(uri);
+
+    if (response.statusCode == 400 && _token != null) {
+      // Token no longer accepted: start over with a full sync
+      reset();
+      return sync();
+    }
+    if (response.statusCode != 200) {
+      throw Exception('Failed to sync: ${response.statusCode}');
+    }
+
+    final Map<String, dynamic> changes = json.decode(response.body);
+    // Deletions first, then upserts
+    final Map<String, dynamic> deleted = changes['deleted'];
+    deleted.forEach((table, ids) {
+      for (final id in ids) {
+        _rows[table]?.remove(id);
+      }
+    });
+    for (final table in tables) {
+      for (final row in changes[table] as List) {
+        _rows[table]![row['id'] as int] = row as Map<String, dynamic>;
+      }
+    }
+    _token = changes['token'];
+    return _rows;
+  }
+
+  List<Map<String, dynamic>> rows(String table) =>
+      _rows[table]!.values.toList();
+
+  void reset() {
+    _token = null;
+    for (final table in tables) {
+      _rows[table]!.clear();
+    }
+  }
+}